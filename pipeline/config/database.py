@@ -1,9 +1,129 @@
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING
 from config.settings import settings
+from utils.logger import logger
+from utils.metrics import instrument_supabase
 
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
 
-def get_supabase() -> Client:
-    return create_client(settings.supabase_url, settings.supabase_service_key)
 
+class PoolStats:
+    """Request and connection counters for the shared Supabase HTTP pool."""
 
-db = get_supabase()
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def on_request(self, request):
+        with self._lock:
+            self.requests += 1
+        # httpcore reports every new TCP connection through the trace extension
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests, opened = self.requests, self.connections_opened
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "reuse_rate": round(1 - opened / requests, 3) if requests else None,
+        }
+
+
+_pool_counter = PoolStats()
+
+
+def _http_client() -> "httpx.Client":
+    import httpx
+
+    http2 = settings.supabase_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("SUPABASE_HTTP2 is set but the h2 package is missing — using HTTP/1.1")
+            http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        timeout=settings.supabase_timeout_seconds,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_pool_size,
+            max_keepalive_connections=settings.supabase_pool_size,
+            keepalive_expiry=settings.supabase_keepalive_seconds,
+        ),
+        event_hooks={"request": [_pool_counter.on_request]},
+    )
+
+
+def get_supabase() -> "Client":
+    from supabase import create_client, ClientOptions
+    if not settings.supabase_url or not settings.supabase_service_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY are required (or set STORAGE_BACKEND=sqlite)")
+    client = create_client(
+        settings.supabase_url,
+        settings.supabase_service_key,
+        options=ClientOptions(httpx_client=_http_client()),
+    )
+    # postgrest is built on first access; build it here, under the LazyClient lock
+    instrument_supabase(client)
+    return client
+
+
+def get_storage():
+    """The configured backend; both expose the same table()/rpc() query builder."""
+    if settings.storage_backend == "sqlite":
+        from storage.sqlite_db import SQLiteDB
+        logger.info(f"Storage: local SQLite at {settings.sqlite_path}")
+        return SQLiteDB(settings.sqlite_path)
+    if settings.storage_backend != "supabase":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.storage_backend}")
+    return get_supabase()
+
+
+class LazyClient:
+    """Storage client created on first use, so importing a module never opens a connection."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self) -> "Client":
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+_shared = LazyClient(get_storage)
+db = _shared
+
+
+def pool_stats() -> dict:
+    """Shared pool configuration and usage (connections currently open/idle, reuse rate)."""
+    stats = {
+        "pool_size": settings.supabase_pool_size,
+        "keepalive_seconds": settings.supabase_keepalive_seconds,
+        "http2": settings.supabase_http2,
+        **_pool_counter.snapshot(),
+    }
+    if _shared._client is not None and hasattr(_shared._client, "postgrest"):
+        pool = getattr(_shared._client.postgrest.session._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        stats["open"] = len(connections)
+        stats["idle"] = sum(1 for c in connections if c.is_idle())
+    return stats
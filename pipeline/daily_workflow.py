@@ -8,9 +8,14 @@ Usage:
     python daily_workflow.py --scrape-only      # Scrape only
     python daily_workflow.py --target 50        # Override daily target
     python daily_workflow.py --dry-run          # Log but don't save
+    python daily_workflow.py --streaming        # Overlap stages via bounded queues
+    python daily_workflow.py --markets          # All markets from pipeline_settings
+    python daily_workflow.py --markets-file markets.json --market-workers 4
+    python daily_workflow.py --reanalyze-profiles  # Recompute Instagram figures from stored posts
 """
 
 import sys
+import signal
 import argparse
 from config.settings import settings
 from orchestrator.main_orchestrator import MainOrchestrator
@@ -24,8 +29,22 @@ def main():
     parser.add_argument("--location", type=str, help="Override target location (e.g. 'Munich, Germany')")
     parser.add_argument("--scrape-only", action="store_true", help="Only run scraping step")
     parser.add_argument("--dry-run", action="store_true", help="Log actions but don't execute")
+    parser.add_argument("--streaming", action="store_true", help="Run stages concurrently via bounded queues")
+    parser.add_argument("--metrics-out", type=str, help="Write run metrics to a .json or .prom file")
+    parser.add_argument("--markets", action="store_true", help="Run every market listed in pipeline_settings")
+    parser.add_argument("--markets-file", type=str, help="Run every market listed in a JSON file")
+    parser.add_argument("--market-workers", type=int, help="Processes for multi-market runs")
+    parser.add_argument("--reanalyze-profiles", action="store_true",
+                        help="Recompute Instagram engagement/posting figures from stored posts, then exit")
     args = parser.parse_args()
 
+    # SIGTERM (cron/systemd stop) exits normally so buffered lead writes get flushed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
+
+    # Dashboard settings first, so command-line overrides win. A dry run stays
+    # offline: no database client, no network call
+    if not args.dry_run:
+        settings.load_remote_settings()
     if args.target:
         settings.daily_scrape_target = args.target
     if args.category:
@@ -33,6 +52,10 @@ def main():
     if args.location:
         settings.target_location = args.location
         settings.target_city = args.location
+    if args.streaming:
+        settings.pipeline_mode = "streaming"
+    if args.metrics_out:
+        settings.metrics_export_path = args.metrics_out
 
     location = getattr(settings, 'target_location', None) or settings.target_city
     logger.info("=" * 60)
@@ -40,12 +63,32 @@ def main():
     logger.info(f"Target: {settings.target_category} in {location}")
     logger.info(f"Daily target: {settings.daily_scrape_target}")
     logger.info(f"Learning mode: {settings.learning_mode}")
+    logger.info(f"Pipeline mode: {settings.pipeline_mode}")
     logger.info("=" * 60)
 
     if args.dry_run:
         logger.info("DRY RUN — no data will be saved")
         return 0
 
+    if args.reanalyze_profiles:
+        from utils.profile_analytics import reanalyze_stored_profiles
+        try:
+            updated = reanalyze_stored_profiles()
+        except Exception as e:
+            logger.error(f"FATAL ERROR: {e}", exc_info=True)
+            return 1
+        logger.info(f"Re-analysis complete: {updated} profiles")
+        return 0
+
+    if args.markets or args.markets_file:
+        from orchestrator.markets import load_markets, run_markets
+        try:
+            market_results = run_markets(load_markets(args.markets_file), workers=args.market_workers)
+        except Exception as e:
+            logger.error(f"FATAL ERROR: {e}", exc_info=True)
+            return 1
+        return 1 if any(r.get("errors") for r in market_results) else 0
+
     try:
         orchestrator = MainOrchestrator()
 
@@ -56,7 +99,7 @@ def main():
             logger.info(f"Scrape complete: {result}")
             return 0
 
-        results = orchestrator.run_daily_workflow()
+        results = orchestrator.run_daily_workflow(reload_settings=False)
 
         if results.get("errors"):
             logger.warning(f"Completed with {len(results['errors'])} errors")
@@ -9,6 +9,8 @@ from config.settings import settings
 from config.database import db
 from utils.logger import logger
 from utils.helpers import retry
+from utils.leases import leases
+from utils.llm_scheduler import llm_scheduler, estimate_tokens
 
 
 class EmailGenerator:
@@ -30,13 +32,17 @@ class EmailGenerator:
         system_prompt = self._build_system_prompt()
         user_prompt = self._build_user_prompt(lead_data, social_data, insights, competitors)
 
-        response = self.client.chat.completions.create(
-            model=settings.ai_model,
-            max_tokens=3000,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        response = llm_scheduler.call(
+            lambda: self.client.chat.completions.create(
+                model=settings.ai_model,
+                max_tokens=3000,
+                messages=messages,
+            ),
+            est_tokens=estimate_tokens(messages, 3000),
         )
 
         text = response.choices[0].message.content
@@ -265,9 +271,9 @@ Return ONLY a JSON array of 4 email objects. Each must have:
                 logger.error(f"Failed to save email {e.get('email_number')} for lead {lead_id}: {ex}")
 
         try:
-            db.table("outreach_leads").update({
+            leases.advance(lead_id, "insights_generated", {
                 "pipeline_status": "emails_generated"
-            }).eq("id", lead_id).execute()
+            })
         except Exception:
             pass
 
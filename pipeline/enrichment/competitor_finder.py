@@ -10,6 +10,7 @@ from config.database import db
 from scrapers.instagram_scraper import InstagramScraper
 from utils.logger import logger
 from utils.helpers import extract_instagram_username, retry
+from utils.response_cache import google_maps_search
 
 
 class CompetitorFinder:
@@ -29,8 +30,10 @@ class CompetitorFinder:
         logger.info(f"Finding competitors for '{business_name}' via '{query}'")
 
         try:
-            results = self.outscraper.google_maps_search(
-                query, limit=limit + 5, language="en"
+            # Same query for every lead in this category and city — served from the cache after the first
+            results = google_maps_search(
+                self.outscraper, query, limit=limit + 5, language="en",
+                ttl_hours=settings.outscraper_cache_competitor_ttl_hours,
             )
         except Exception as e:
             logger.error(f"Outscraper competitor search failed: {e}")
@@ -88,7 +91,10 @@ class CompetitorFinder:
 
             if ig_username:
                 try:
-                    comp_ig = self.ig_scraper.scrape_profile(ig_username)
+                    # Popular competitors repeat across leads; a week-old profile is good enough here
+                    comp_ig = self.ig_scraper.scrape_profile(
+                        ig_username, fresh_hours=settings.instagram_competitor_fresh_hours
+                    )
                 except Exception as e:
                     logger.warning(f"Failed to scrape competitor IG @{ig_username}: {e}")
 
@@ -9,6 +9,9 @@ from bs4 import BeautifulSoup
 from config.database import db
 from utils.logger import logger
 from utils.helpers import retry, clean_email
+from utils.concurrency import destination_slot
+from utils.metrics import metrics
+from utils.write_buffer import write_buffer
 
 
 HEADERS = {
@@ -25,7 +28,8 @@ class MultiPlatformEnricher:
 
         logger.info(f"Scraping Yelp: {yelp_url}")
         try:
-            resp = requests.get(yelp_url, headers=HEADERS, timeout=15)
+            with destination_slot("yelp"), metrics.call("yelp") as call:
+                resp = call.response(requests.get(yelp_url, headers=HEADERS, timeout=15))
             if resp.status_code != 200:
                 return None
 
@@ -75,7 +79,8 @@ class MultiPlatformEnricher:
 
         logger.info(f"Analyzing website: {website}")
         try:
-            resp = requests.get(website, headers=HEADERS, timeout=15, allow_redirects=True)
+            with destination_slot("website"), metrics.call("website") as call:
+                resp = call.response(requests.get(website, headers=HEADERS, timeout=15, allow_redirects=True))
             if resp.status_code != 200:
                 return None
 
@@ -193,7 +198,7 @@ class MultiPlatformEnricher:
 
         if updates:
             try:
-                db.table("outreach_leads").update(updates).eq("id", lead_id).execute()
+                write_buffer.update(lead_id, updates)
                 logger.info(f"Website enrichment for {lead_id}: {list(updates.keys())}")
             except Exception as e:
                 logger.error(f"Failed to update lead {lead_id} from website: {e}")
@@ -0,0 +1,249 @@
+"""
+Offline end-to-end pipeline benchmark.
+Runs MainOrchestrator.run_daily_workflow against the in-memory stand-in
+database and the record/replay layer, and reports leads/second per stage for
+each lead count. Politeness delays (rate_limit/retry sleeps, Instagram limiter
+pacing) are skipped by default so the numbers reflect pipeline work plus the
+simulated latency.
+
+Usage (from pipeline/):
+    python -m harness.benchmark                                   # 100, 1k, 10k leads
+    python -m harness.benchmark --sizes 1000 --latency-scale 0.05 --mode streaming
+    python -m harness.benchmark --fixtures fixtures/munich.jsonl --error-rate 0.02
+    python -m harness.benchmark --sizes 1000 --storage sqlite     # real SQL (WAL) instead of the stand-in
+    python -m harness.benchmark --sizes 300 --proxies 4 --pacing-scale 0.01   # Instagram paced per proxy
+    python -m harness.benchmark --out bench.json                  # save a baseline
+    python -m harness.benchmark --baseline bench.json --tolerance 0.2   # exit 1 on regression
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import importlib
+import argparse
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "local.harness.key")
+
+from config.settings import settings
+import config.database
+from orchestrator.main_orchestrator import MainOrchestrator, _Component
+from utils.metrics import metrics
+from utils.response_cache import outscraper_cache
+from utils.profile_cache import profile_cache
+from utils.adaptive_limiter import instagram_limiter
+from utils.proxy_pool import proxy_pool
+from harness.memory_db import MemoryDB
+from storage.sqlite_db import SQLiteDB
+from harness.replay import ReplayLayer, FixtureStore
+
+# stage name (utils.metrics) → results key
+STAGES = {
+    "scrape": "scraped",
+    "enrich": "enriched",
+    "score": "scored",
+    "insights": "insights_generated",
+    "emails": "emails_generated",
+    "upload": "uploaded",
+}
+
+# Modules whose time.sleep() is pacing for real APIs rather than pipeline work
+PACED_MODULES = ("utils.helpers", "scrapers.fresh_sources", "utils.adaptive_limiter")
+
+
+class _PacedTime:
+    """Stand-in for the `time` module with sleeps scaled by `scale`."""
+
+    def __init__(self, scale: float):
+        self.scale = scale
+
+    def sleep(self, seconds: float):
+        if self.scale > 0:
+            time.sleep(seconds * self.scale)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _load_components():
+    """Import the lazily loaded pipeline components so the db/time swaps below reach them."""
+    for attr in vars(MainOrchestrator).values():
+        if isinstance(attr, _Component):
+            importlib.import_module(attr.module)
+    for name in PACED_MODULES:
+        importlib.import_module(name)
+
+
+def _swap_module_attr(name: str, current, replacement) -> list:
+    """Point every loaded module's `name` global from `current` to `replacement`."""
+    swapped = []
+    for module in list(sys.modules.values()):
+        if getattr(module, name, None) is current:
+            setattr(module, name, replacement)
+            swapped.append(module)
+    return swapped
+
+
+def _configure(size: int, args):
+    settings.pipeline_enabled = True
+    settings.daily_scrape_target = size
+    settings.target_category = args.category
+    settings.target_location = args.location
+    settings.target_city = args.location
+    settings.pipeline_mode = args.mode
+    settings.write_behind = args.write_behind
+    settings.lead_leases = False
+    settings.lead_dedup_key = True  # the stand-in schema includes the dedup_key migration
+    settings.social_proxy = settings.social_proxy or "http://replay.invalid:1"
+    settings.social_proxies = ",".join(f"http://replay-{i}.invalid:1" for i in range(1, args.proxies))
+    settings.outscraper_api_key = settings.outscraper_api_key or "replay"
+    settings.openrouter_api_key = settings.openrouter_api_key or "replay"
+    settings.instantly_api_key = settings.instantly_api_key or "replay"
+    # The benchmark measures the pipeline, not the provider's rate limits
+    settings.claude_requests_per_minute = 10**6
+    settings.claude_tokens_per_minute = 10**9
+    if not args.pacing_scale:
+        settings.instagram_rate_per_min = settings.instagram_max_rate_per_min = 10**6
+    instagram_limiter.configure()
+
+
+def run_size(size: int, fixtures: FixtureStore, args) -> dict:
+    _configure(size, args)
+    layer = ReplayLayer(
+        fixtures=fixtures,
+        latency_scale=args.latency_scale,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    if args.storage == "sqlite":
+        store = SQLiteDB(os.path.join(tempfile.mkdtemp(prefix="geospark-bench-"), f"bench-{size}.db"))
+    else:
+        store = MemoryDB(latency=layer.latency_ms["supabase"] * args.latency_scale / 1000)
+    # Fresh response cache per size: repeat searches within a run hit, earlier runs don't leak in
+    cache_dir = tempfile.mkdtemp(prefix="geospark-cache-")
+    outscraper_cache.configure(os.path.join(cache_dir, "outscraper.db"))
+    profile_cache.configure(os.path.join(cache_dir, "instagram.db"))
+    _load_components()
+    real_db = config.database.db
+    db_modules = _swap_module_attr("db", real_db, store)
+    paced = [sys.modules[n] for n in PACED_MODULES]
+    for module in paced:
+        module.time = _PacedTime(args.pacing_scale)
+
+    try:
+        with layer:
+            start = time.perf_counter()
+            results = MainOrchestrator().run_daily_workflow(reload_settings=False)
+            wall = time.perf_counter() - start
+    finally:
+        for module in db_modules:
+            module.db = real_db
+        for module in paced:
+            module.time = time
+
+    stage_metrics = metrics.summary()["stages"]
+    stages = {}
+    for stage, key in STAGES.items():
+        seconds = stage_metrics.get(stage, {}).get("total_seconds", 0.0)
+        count = results.get(key, 0)
+        stages[stage] = {
+            "leads": count,
+            "seconds": round(seconds, 3),
+            "leads_per_sec": round(count / seconds, 2) if seconds > 0 else None,
+        }
+
+    return {
+        "size": size,
+        "mode": args.mode,
+        "wall_seconds": round(wall, 2),
+        "end_to_end_leads_per_sec": round(results.get("scraped", 0) / wall, 2) if wall > 0 else None,
+        "stages": stages,
+        "storage": args.storage,
+        "db_calls": store.calls,
+        "errors": len(results.get("errors", [])),
+        "replay": layer.summary(),
+        "outscraper_cache": outscraper_cache.summary(),
+        "instagram_cache": profile_cache.summary(),
+        "instagram_limiter": instagram_limiter.summary(),
+        "proxy_pool": proxy_pool.summary(),
+    }
+
+
+def print_report(report: dict):
+    print(f"\n── {report['size']} leads ({report['mode']}) — {report['wall_seconds']}s wall, "
+          f"{report['end_to_end_leads_per_sec']} leads/s end-to-end, {report['db_calls']} DB calls, "
+          f"{report['errors']} step errors")
+    print(f"{'stage':<10}{'leads':>8}{'seconds':>10}{'leads/s':>10}")
+    for stage, s in report["stages"].items():
+        rate = "-" if s["leads_per_sec"] is None else s["leads_per_sec"]
+        print(f"{stage:<10}{s['leads']:>8}{s['seconds']:>10}{rate:>10}")
+
+
+def check_regressions(reports: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["size"]: r for r in json.load(f)["runs"]}
+    failures = []
+    for report in reports:
+        base = baseline.get(report["size"])
+        if not base:
+            continue
+        for stage, s in report["stages"].items():
+            before = base["stages"].get(stage, {}).get("leads_per_sec")
+            now = s["leads_per_sec"]
+            if before and now is not None and now < before * (1 - tolerance):
+                failures.append(f"{report['size']} leads / {stage}: {now} leads/s vs baseline {before}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--mode", choices=["batch", "streaming"], default="batch")
+    parser.add_argument("--fixtures", type=str, help="Recorded JSONL fixtures (default: synthetic only)")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="Multiplier on typical dependency latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of external calls that fail")
+    parser.add_argument("--pacing-scale", type=float, default=0.0, help="Multiplier on rate-limit/retry sleeps")
+    parser.add_argument("--proxies", type=int, default=1, help="Instagram proxies in the pool")
+    parser.add_argument("--write-behind", action="store_true", help="Enable the outreach_leads write-behind buffer")
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory",
+                        help="In-memory stand-in or a temporary SQLite file built from the migrations")
+    parser.add_argument("--category", type=str, default="Hair Salon")
+    parser.add_argument("--location", type=str, default="Munich, Germany")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, help="Write the report as JSON")
+    parser.add_argument("--baseline", type=str, help="Compare against a previous --out report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed leads/s drop vs baseline")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("geospark").setLevel(logging.WARNING)
+
+    fixtures = FixtureStore(args.fixtures)
+    reports = []
+    for size in args.sizes:
+        report = run_size(size, fixtures, args)
+        print_report(report)
+        reports.append(report)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"runs": reports, "args": vars(args)}, f, indent=2)
+        print(f"\nReport written to {args.out}")
+
+    if args.baseline:
+        failures = check_regressions(reports, args.baseline, args.tolerance)
+        if failures:
+            print("\nREGRESSION:")
+            for line in failures:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Engagement commenter qualification benchmark.
+Runs EngagementScraper._filter_business_accounts over synthetic commenters of
+a few creator posts, with instaloader.Profile.from_username replaced by a
+simulated Instagram: each profile load goes through the proxy's (or the
+direct) limiter and takes --latency seconds. It compares the previous loop,
+which loaded profiles one after another on a single loader, with the
+concurrent stream, for 1 and --proxies exit IPs.
+
+Instagram time is scaled by --time-scale (limiter rates up, latency down) so
+a run takes seconds. The reported figures are converted back to real time:
+prospects per hour, and profile requests spent per prospect.
+
+Usage (from pipeline/):
+    python -m harness.engagement                       # 1 vs 4 proxies
+    python -m harness.engagement --proxies 8 --posts 6 --business-share 0.05
+"""
+
+import os
+import sys
+import time
+import zlib
+import random
+import argparse
+import threading
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "local.harness.key")
+
+import instaloader
+from config.settings import settings
+from utils import concurrency
+from utils.adaptive_limiter import instagram_limiter, CoolingDown
+from utils.proxy_pool import proxy_pool
+from scrapers.engagement_scraper import EngagementScraper, BUSINESS_SIGNALS, _instagram_call
+
+CATEGORY = "Hair Salon"
+CITY = "Munich, Germany"
+
+
+class SimulatedProfile:
+    """What Profile.from_username returns, decided by the username (same answer every run)."""
+
+    def __init__(self, username: str, business_share: float):
+        rng = random.Random(zlib.crc32(username.encode()))
+        self.username = username
+        self.is_private = rng.random() < 0.15
+        self.is_business_account = rng.random() < 0.4
+        business = rng.random() < business_share
+        self.biography = f"{rng.choice(BUSINESS_SIGNALS)} hair salon in munich" if business else "coffee, travel, dogs"
+        self.full_name = username.replace("_", " ").title()
+        self.followers = rng.randint(100, 20_000)
+        self.followees = rng.randint(100, 2_000)
+        self.mediacount = rng.randint(10, 900)
+        self.external_url = None
+
+
+class SimulatedInstagram:
+    def __init__(self, latency: float, business_share: float):
+        self.latency = latency
+        self.business_share = business_share
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def from_username(self, context, username: str) -> SimulatedProfile:
+        # The pacing Instaloader's rate controller would apply (our limiter part of it)
+        limiter = context._rate_controller.limiter
+        if not limiter.acquire(max_wait=settings.instagram_max_wait_seconds):
+            raise CoolingDown(f"Instagram cooling down for {limiter.resume_in():.0f}s")
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        return SimulatedProfile(username, self.business_share)
+
+
+def make_posts(count: int, commenters: int, repeat_share: float, seed: int) -> list[list[dict]]:
+    """Commenters per post; some comment on several posts."""
+    rng = random.Random(seed)
+    regulars = [f"regular_{i}" for i in range(commenters)]
+    return [
+        [
+            {"username": rng.choice(regulars) if rng.random() < repeat_share else f"user_{p}_{i}",
+             "comment_text": "love this!", "comment_date": None}
+            for i in range(commenters)
+        ]
+        for p in range(count)
+    ]
+
+
+def legacy_filter(scraper: EngagementScraper, commenters: list[dict]) -> list[dict]:
+    """The previous loop: one profile at a time on the scraper's loader, 10 per post."""
+    city_name = CITY.split(",")[0].strip().lower()
+    keywords = scraper._get_category_keywords(CATEGORY)
+    found = []
+    for commenter in commenters:
+        username = commenter.get("username", "")
+        if not username or username.startswith("__") or len(username) < 3:
+            continue
+        try:
+            profile = _instagram_call(scraper.target, instaloader.Profile.from_username, scraper.loader.context, username)
+        except CoolingDown:
+            break
+        except Exception:
+            continue
+        if profile.is_private:
+            continue
+        bio = (profile.biography or "").lower()
+        if (profile.is_business_account or any(s in bio for s in BUSINESS_SIGNALS)) and (
+            any(kw in bio for kw in keywords) or city_name in bio
+        ):
+            found.append(commenter)
+            if len(found) >= 10:
+                break
+    return found
+
+
+def configure(proxies: int, scale: float):
+    settings.social_proxy = "http://sim-0.invalid:1"
+    settings.social_proxies = ",".join(f"http://sim-{i}.invalid:1" for i in range(1, proxies))
+    settings.instagram_rate_per_min = 6.0 / scale
+    settings.instagram_max_rate_per_min = 30.0 / scale
+    settings.instagram_rate_increase = 0.25 / scale
+    concurrency.configure()  # the Instagram cap follows the proxy count
+    instagram_limiter.configure()
+    proxy_pool.configure()
+
+
+def run(name: str, posts: list[list[dict]], instagram: SimulatedInstagram, proxies: int, scale: float, concurrent: bool):
+    configure(proxies, scale)
+    scraper = EngagementScraper()
+    instagram.requests = 0
+    checked: set[str] = set()
+    prospects: set[str] = set()  # distinct accounts; the scan drops repeats before saving
+    start = time.perf_counter()
+    for commenters in posts:
+        if concurrent:
+            qualified = scraper._filter_business_accounts(commenters, CATEGORY, CITY, 10, checked)
+        else:
+            qualified = legacy_filter(scraper, commenters)
+        prospects.update(c["username"] for c in qualified)
+    hours = (time.perf_counter() - start) / scale / 3600
+    found = len(prospects)
+    per_prospect = instagram.requests / found if found else float("nan")
+    print(f"{name:<28} {proxies:>7} {found:>9} {instagram.requests:>9} {per_prospect:>12.1f} "
+          f"{found / hours:>14.0f}")
+    return found / hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent engagement commenter qualification")
+    parser.add_argument("--proxies", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=4)
+    parser.add_argument("--commenters", type=int, default=100, help="commenters per post")
+    parser.add_argument("--business-share", type=float, default=0.15, help="commenters with a salon bio")
+    parser.add_argument("--repeat-share", type=float, default=0.2, help="comments by accounts seen on other posts")
+    parser.add_argument("--latency", type=float, default=1.5, help="seconds per profile load")
+    parser.add_argument("--time-scale", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts, args.commenters, args.repeat_share, args.seed)
+    instagram = SimulatedInstagram(args.latency * args.time_scale, args.business_share)
+    real_from_username = instaloader.Profile.from_username
+    instaloader.Profile.from_username = instagram.from_username
+    try:
+        print(f"{'qualification':<28} {'proxies':>7} {'prospects':>9} {'requests':>9} "
+              f"{'req/prospect':>12} {'prospects/hour':>14}")
+        baseline = run("sequential (previous)", posts, instagram, 1, args.time_scale, concurrent=False)
+        run("concurrent", posts, instagram, 1, args.time_scale, concurrent=True)
+        if args.proxies > 1:
+            run("sequential (previous)", posts, instagram, args.proxies, args.time_scale, concurrent=False)
+            best = run("concurrent", posts, instagram, args.proxies, args.time_scale, concurrent=True)
+            print(f"\n{args.proxies} proxies, concurrent vs previous on 1: {best / baseline:.1f}x prospects/hour")
+    finally:
+        instaloader.Profile.from_username = real_from_username
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Keyword matching benchmark.
+Times the caption classifiers (content classes, tool detection, the
+engagement scanner's marketing check) on synthetic captions: the
+one-substring-scan-per-keyword code they replaced against the shared
+KeywordMatcher. It checks that both give the same answers, then repeats the
+"any keyword" check with more keywords and longer texts to show how each
+approach scales.
+
+Usage (from pipeline/):
+    python -m harness.keywords                        # 100k captions
+    python -m harness.keywords --captions 20000 --seed 3
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "local.harness.key")
+
+from utils.keyword_matcher import KeywordMatcher
+from scrapers.instagram_scraper import CONTENT_MATCHER, TOOL_MATCHER
+from scrapers.engagement_scraper import MARKETING_KEYWORDS, MARKETING_MATCHER
+
+FILLER = (
+    "the new salon hair color today we love our you your and for with this is at beautiful "
+    "style cut balayage blonde look fresh week summer weekend open studio team vibes"
+).split()
+
+
+# ── The per-keyword scans KeywordMatcher replaced ──
+
+def legacy_classify(caption: str) -> str:
+    promo_kw = ["book now", "appointment", "sale", "discount", "offer", "deal", "% off", "link in bio", "shop", "buy"]
+    edu_kw = ["tip", "how to", "guide", "learn", "did you know", "tutorial", "steps"]
+    bts_kw = ["behind the scenes", "bts", "day in the life", "team", "process", "making of"]
+    ba_kw = ["before and after", "before/after", "transformation", "results", "glow up"]
+    test_kw = ["review", "testimonial", "client", "customer", "thank you", "amazing experience"]
+    caption = caption.lower()
+    if any(kw in caption for kw in ba_kw):
+        return "before_after"
+    elif any(kw in caption for kw in test_kw):
+        return "testimonial"
+    elif any(kw in caption for kw in bts_kw):
+        return "behind_the_scenes"
+    elif any(kw in caption for kw in edu_kw):
+        return "educational"
+    elif any(kw in caption for kw in promo_kw):
+        return "promotional"
+    return "other"
+
+
+def legacy_tools(text: str) -> list[str]:
+    text = text.lower()
+    tool_patterns = {
+        "linktree": ["linktr.ee", "linktree"], "canva": ["canva.com", "made with canva"],
+        "milkshake": ["milkshake.app"], "later": ["later.com", "linkin.bio"],
+        "planoly": ["planoly"], "vagaro": ["vagaro"], "mindbody": ["mindbody"],
+        "square": ["square.site", "squareup"], "schedulicity": ["schedulicity"],
+        "fresha": ["fresha"], "booksy": ["booksy"], "glossgenius": ["glossgenius"],
+    }
+    return [tool for tool, pats in tool_patterns.items() if any(p in text for p in pats)]
+
+
+def legacy_marketing(caption: str) -> bool:
+    caption = caption.lower()
+    return sum(1 for kw in MARKETING_KEYWORDS if kw in caption) >= 2
+
+
+def matcher_tools(text: str) -> list[str]:
+    found = TOOL_MATCHER.categories(text)
+    return [tool for tool in TOOL_MATCHER.order if tool in found]
+
+
+# ── Workload ──
+
+def make_captions(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary = CONTENT_MATCHER.vocabulary + MARKETING_KEYWORDS
+    tools = TOOL_MATCHER.vocabulary
+    captions = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 40))]
+        for _ in range(rng.choice((0, 0, 1, 1, 2, 3))):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(vocabulary))
+        if rng.random() < 0.1:
+            words.append(rng.choice(tools))
+        captions.append(" ".join(words).capitalize())
+    return captions
+
+
+def _time(fn, items) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return time.perf_counter() - start, results
+
+
+def compare(name: str, legacy, matcher, items) -> bool:
+    before, expected = _time(legacy, items)
+    after, actual = _time(matcher, items)
+    same = expected == actual
+    print(f"{name:<24} {len(items):>8} {before:>9.3f}s {after:>9.3f}s {before / after:>8.2f}x  "
+          f"{'same' if same else 'DIFFERENT'}")
+    return same
+
+
+def scaling(captions: list[str], seed: int):
+    """'Any keyword present' with k keywords over texts of growing length."""
+    rng = random.Random(seed)
+    sample = captions[:2000]
+    print(f"\n{'keywords':>8} {'text x':>7} {'per-keyword':>12} {'matcher':>9}")
+    for k in (25, 100, 400):
+        keywords = [
+            "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+            for _ in range(k)
+        ]
+        matcher = KeywordMatcher(keywords)
+        for factor in (1, 8):
+            texts = [" ".join([c] * factor).lower() for c in sample]
+            before, _ = _time(lambda t: any(kw in t for kw in keywords), texts)
+            after, _ = _time(lambda t: bool(matcher.hits(t)), texts)
+            print(f"{k:>8} {factor:>7} {before:>11.3f}s {after:>8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-keyword substring scans vs KeywordMatcher")
+    parser.add_argument("--captions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    captions = make_captions(args.captions, args.seed)
+    # Tool detection runs on a profile's bio plus its captions joined together
+    profiles = [" ".join(captions[i:i + 12]) for i in range(0, len(captions), 12)]
+
+    print(f"KeywordMatcher engine: {CONTENT_MATCHER.engine}\n")
+    print(f"{'classifier':<24} {'texts':>8} {'per-keyword':>10} {'matcher':>10} {'speedup':>9}")
+    ok = all([
+        compare("content class", legacy_classify, lambda c: CONTENT_MATCHER.top(c) or "other", captions),
+        compare("marketing (2+ keywords)", legacy_marketing,
+                lambda c: len(MARKETING_MATCHER.keywords(c)) >= 2, captions),
+        compare("tools (per profile)", legacy_tools,
+                matcher_tools, profiles),
+    ])
+    scaling(captions, args.seed)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
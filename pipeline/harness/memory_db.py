@@ -0,0 +1,362 @@
+"""
+In-memory stand-in for the Supabase client.
+Implements the subset of the PostgREST query builder the pipeline uses
+(select/insert/update/upsert/delete with eq/neq/in_/is_/not_/gt/lt/order/limit/range/single)
+plus the pipeline RPCs (claim_pipeline_leads, apply_lead_patches), so workers and
+benchmarks can run without a network. Equality lookups on INDEXED_COLUMNS use hash
+indexes so 10k-lead benchmarks don't degrade into full scans.
+"""
+
+import copy
+import time
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Columns with a hash index (equality / IN lookups skip the full scan)
+INDEXED_COLUMNS = ("id", "lead_id", "social_profile_id", "business_name", "dedup_key", "instagram_url")
+
+
+class MemoryResult:
+    def __init__(self, data):
+        self.data = data
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _public(row: dict) -> dict:
+    return {k: copy.deepcopy(v) for k, v in row.items() if k != "_seq"}
+
+
+def _parse_ts(value) -> datetime | None:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class _Negate:
+    def __init__(self, query: "MemoryQuery"):
+        self._query = query
+
+    def __getattr__(self, name):
+        def apply(*args):
+            self._query._negate_next = True
+            return getattr(self._query, name)(*args)
+        return apply
+
+
+class MemoryQuery:
+    def __init__(self, store: "MemoryDB", table: str):
+        self._store = store
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._filters: list = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single = False
+        self._negate_next = False
+        self._lookup: tuple[str, list] | None = None  # (indexed column, values) narrowing the scan
+
+    # ── Operations ──
+
+    def select(self, columns: str = "*", **kwargs):
+        self._op, self._columns = "select", columns
+        return self
+
+    def insert(self, rows, **kwargs):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def update(self, values: dict, **kwargs):
+        self._op, self._payload = "update", values
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", ignore_duplicates: bool = False, **kwargs):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # ── Filters ──
+
+    def _filter(self, fn):
+        negate, self._negate_next = self._negate_next, False
+        self._filters.append((lambda row: not fn(row)) if negate else fn)
+        return self
+
+    @property
+    def not_(self):
+        return _Negate(self)
+
+    def _narrow(self, col, values: list):
+        if col in INDEXED_COLUMNS and not self._negate_next and self._lookup is None:
+            self._lookup = (col, values)
+
+    def eq(self, col, value):
+        self._narrow(col, [value])
+        return self._filter(lambda r: r.get(col) == value)
+
+    def neq(self, col, value):
+        return self._filter(lambda r: r.get(col) != value)
+
+    def in_(self, col, values):
+        values = set(values)
+        self._narrow(col, list(values))
+        return self._filter(lambda r: r.get(col) in values)
+
+    def is_(self, col, value):
+        target = None if value in (None, "null") else value
+        return self._filter(lambda r: r.get(col) is target)
+
+    def gt(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r.get(col) > value)
+
+    def gte(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r.get(col) >= value)
+
+    def lt(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r.get(col) < value)
+
+    def lte(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r.get(col) <= value)
+
+    def order(self, col, desc: bool = False, **kwargs):
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n: int, **kwargs):
+        self._limit = n
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    # ── Execution ──
+
+    def _matches(self, row: dict) -> bool:
+        return all(f(row) for f in self._filters)
+
+    def _project(self, row: dict) -> dict:
+        if self._columns.strip() == "*":
+            return _public(row)
+        cols = [c.strip() for c in self._columns.split(",")]
+        return {c: copy.deepcopy(row.get(c)) for c in cols}
+
+    def _candidates(self, rows: list[dict]) -> list[dict]:
+        if self._lookup is None:
+            return rows
+        col, values = self._lookup
+        index = self._store.indexes.get(self._table, {}).get(col, {})
+        found = {id(r): r for v in values for r in index.get(v, ())}
+        # Keep table (insertion) order so results match a full scan
+        return sorted(found.values(), key=lambda r: r["_seq"]) if len(found) > 1 else list(found.values())
+
+    def execute(self) -> MemoryResult:
+        self._store.wait()
+        with self._store.lock:
+            self._store.calls += 1
+            rows = self._store.tables.setdefault(self._table, [])
+            if self._op == "select":
+                data = [r for r in self._candidates(rows) if self._matches(r)]
+                for col, desc in reversed(self._order):
+                    data.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+                if self._offset or self._limit is not None:
+                    end = None if self._limit is None else self._offset + self._limit
+                    data = data[self._offset:end]
+                data = [self._project(r) for r in data]
+                if self._single:
+                    if len(data) != 1:
+                        raise ValueError(f"single() expected 1 row from {self._table}, got {len(data)}")
+                    return MemoryResult(data[0])
+                return MemoryResult(data)
+            if self._op == "insert":
+                return MemoryResult([self._store._insert(self._table, r) for r in self._as_list()])
+            if self._op == "upsert":
+                data = [self._upsert_one(rows, r) for r in self._as_list()]
+                return MemoryResult([r for r in data if r is not None])
+            if self._op == "update":
+                data = []
+                for r in self._candidates(rows):
+                    if self._matches(r):
+                        self._store._update(self._table, r, self._payload)
+                        data.append(self._project(r))
+                return MemoryResult(data)
+            if self._op == "delete":
+                doomed = [r for r in self._candidates(rows) if self._matches(r)]
+                for r in doomed:
+                    self._store._delete(self._table, r)
+                return MemoryResult([self._project(r) for r in doomed])
+        raise ValueError(f"Unsupported operation {self._op}")
+
+    def _as_list(self) -> list[dict]:
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def _upsert_one(self, rows: list[dict], new: dict) -> dict:
+        keys = [k.strip() for k in (self._on_conflict or "id").split(",")]
+        indexed = next((k for k in keys if k in INDEXED_COLUMNS), None)
+        if indexed is not None:
+            rows = self._store.indexes.get(self._table, {}).get(indexed, {}).get(new.get(indexed), [])
+        for r in list(rows):
+            if all(r.get(k) == new.get(k) for k in keys):
+                if self._ignore_duplicates:
+                    return None  # ON CONFLICT DO NOTHING returns only inserted rows
+                self._store._update(self._table, r, new)
+                return self._project(r)
+        return self._store._insert(self._table, new)
+
+
+class MemoryRpc:
+    def __init__(self, store: "MemoryDB", name: str, params: dict):
+        self._store, self._name, self._params = store, name, params
+
+    def execute(self) -> MemoryResult:
+        handler = self._store.rpcs.get(self._name)
+        if not handler:
+            raise ValueError(f"Unknown RPC {self._name}")
+        self._store.wait()
+        with self._store.lock:
+            self._store.calls += 1
+            return MemoryResult(handler(self._store, **self._params))
+
+
+class MemoryDB:
+    """Thread-safe, process-local table store with a Supabase-like `table()`/`rpc()` API."""
+
+    def __init__(self, latency: float = 0.0):
+        self.tables: dict[str, list[dict]] = {}
+        self.indexes: dict[str, dict[str, dict]] = {}  # table → column → value → rows
+        self.lock = threading.RLock()
+        self.calls = 0
+        self.latency = latency  # simulated round-trip seconds per request
+        self._seq = 0
+        self.rpcs = {
+            "claim_pipeline_leads": claim_pipeline_leads,
+            "apply_lead_patches": apply_lead_patches,
+        }
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> MemoryRpc:
+        return MemoryRpc(self, name, params or {})
+
+    def wait(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _insert(self, table: str, row: dict) -> dict:
+        row = copy.deepcopy(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", _now().isoformat())
+        self._seq += 1
+        row["_seq"] = self._seq
+        self.tables.setdefault(table, []).append(row)
+        self._index(table, row)
+        return _public(row)
+
+    def _index(self, table: str, row: dict, columns=INDEXED_COLUMNS):
+        by_col = self.indexes.setdefault(table, {})
+        for col in columns:
+            if row.get(col) is not None:
+                by_col.setdefault(col, {}).setdefault(row[col], []).append(row)
+
+    def _unindex(self, table: str, row: dict, columns=INDEXED_COLUMNS):
+        by_col = self.indexes.get(table, {})
+        for col in columns:
+            bucket = by_col.get(col, {}).get(row.get(col))
+            if bucket:
+                bucket[:] = [r for r in bucket if r is not row]
+
+    def _update(self, table: str, row: dict, values: dict):
+        changed = [c for c in INDEXED_COLUMNS if c in values and values[c] != row.get(c)]
+        self._unindex(table, row, changed)
+        row.update(copy.deepcopy(values))
+        self._index(table, row, changed)
+
+    def _delete(self, table: str, row: dict):
+        self._unindex(table, row)
+        rows = self.tables.get(table, [])
+        rows[:] = [r for r in rows if r is not row]
+
+    def seed(self, table: str, rows: list[dict]):
+        with self.lock:
+            for r in rows:
+                self._insert(table, r)
+
+
+def claim_pipeline_leads(
+    store: MemoryDB,
+    p_stage: str,
+    p_owner: str,
+    p_limit: int,
+    p_lease_seconds: int,
+    p_pipeline_status: str,
+    p_enrichment_status: str | None = None,
+    p_set_enrichment_status: str | None = None,
+    p_score_tiers: list[str] | None = None,
+    p_require_email: bool = False,
+    p_market: str | None = None,
+) -> list[dict]:
+    """Python mirror of the claim_pipeline_leads() SQL function (see supabase/migrations)."""
+    now = _now()
+    claimed = []
+    rows = sorted(store.tables.get("outreach_leads", []), key=lambda r: r.get("created_at") or "")
+    for r in rows:
+        if len(claimed) >= p_limit:
+            break
+        expires = _parse_ts(r.get("lease_expires_at"))
+        lease_free = not r.get("lease_owner") or (expires is not None and expires < now)
+        expired_same_stage = r.get("lease_stage") == p_stage and expires is not None and expires < now
+        if r.get("pipeline_status") != p_pipeline_status or not lease_free:
+            continue
+        if p_enrichment_status and r.get("enrichment_status") != p_enrichment_status and not expired_same_stage:
+            continue
+        if p_score_tiers and r.get("score_tier") not in p_score_tiers:
+            continue
+        if p_require_email and not (r.get("contact_email") or r.get("owner_email")):
+            continue
+        if p_market and r.get("market") != p_market:
+            continue
+        r["lease_owner"] = p_owner
+        r["lease_stage"] = p_stage
+        r["lease_expires_at"] = (now + timedelta(seconds=p_lease_seconds)).isoformat()
+        if p_set_enrichment_status:
+            r["enrichment_status"] = p_set_enrichment_status
+        claimed.append(_public(r))
+    return claimed
+
+
+def apply_lead_patches(store: MemoryDB, p_patches: list[dict]) -> list[dict]:
+    """Python mirror of the apply_lead_patches() SQL function (see supabase/migrations)."""
+    by_id = store.indexes.get("outreach_leads", {}).get("id", {})
+    applied = []
+    for patch in p_patches:
+        row = next(iter(by_id.get(patch["id"], [])), None)
+        if row is None or not patch.get("fields"):
+            continue
+        if any(row.get(col) != value for col, value in (patch.get("expect") or {}).items()):
+            continue
+        store._update("outreach_leads", row, patch["fields"])
+        applied.append({"id": row["id"]})
+    return applied
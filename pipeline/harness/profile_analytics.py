@@ -0,0 +1,121 @@
+"""
+Stored profile re-analysis benchmark.
+Builds synthetic stored posts for many Instagram profiles, stores them in a
+MemoryDB with a simulated round-trip latency and times
+reanalyze_stored_profiles() end to end, next to the round trips a
+profile-at-a-time re-analysis would make. Checks the stored figures match
+InstagramScraper's per-profile _calculate_engagement / _analyze_posting_patterns.
+
+Usage (from pipeline/):
+    python -m harness.profile_analytics                  # 50k profiles
+    python -m harness.profile_analytics --profiles 5000 --seed 3 --latency-ms 50
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "local.harness.key")
+
+import utils.profile_analytics
+from scrapers.instagram_scraper import InstagramScraper
+from utils.profile_analytics import reanalyze_stored_profiles
+from harness.memory_db import MemoryDB
+
+POST_TYPES = ("photo", "video", "carousel", "reel")
+
+
+def make_profiles(count: int, seed: int, now: datetime) -> tuple[list[list[dict]], list[int]]:
+    """Posts shaped like prospect_posts rows (timestamptz strings from the database, a few oddities)."""
+    rng = random.Random(seed)
+    profiles, followers = [], []
+    for _ in range(count):
+        posts = []
+        taken = now - timedelta(hours=rng.uniform(0, 240))
+        for _ in range(rng.choice((0, rng.randint(1, 12), rng.randint(12, 50)))):
+            taken -= timedelta(seconds=rng.randint(3600, 20 * 86400))
+            odd = rng.random()
+            if odd < 0.01:
+                date = None
+            elif odd < 0.02:
+                date = taken.astimezone(timezone(timedelta(hours=2))).isoformat()
+            elif odd < 0.03:
+                date = taken.replace(tzinfo=None).isoformat()
+            else:
+                date = taken.isoformat()
+            posts.append({
+                "post_date": date,
+                "likes": rng.randint(0, 800),
+                "comments": rng.randint(0, 60),
+                "post_type": rng.choice(POST_TYPES),
+            })
+        profiles.append(posts)
+        followers.append(rng.choice((0, rng.randint(50, 50_000))))
+    return profiles, followers
+
+
+def stored(profiles: list[list[dict]], followers: list[int], latency_ms: float, now: datetime) -> bool:
+    """reanalyze_stored_profiles() against a MemoryDB holding the synthetic profiles."""
+    store = MemoryDB()
+    store.seed("prospect_social_profiles", [
+        {"id": f"p{i}", "lead_id": f"l{i}", "platform": "instagram", "followers": f, "raw_data": {}}
+        for i, f in enumerate(followers)
+    ])
+    store.seed("prospect_posts", [
+        {**post, "social_profile_id": f"p{i}"} for i, posts in enumerate(profiles) for post in posts
+    ])
+    store.latency = latency_ms / 1000
+
+    real_db = utils.profile_analytics.db
+    utils.profile_analytics.db = store
+    try:
+        start = time.perf_counter()
+        updated = reanalyze_stored_profiles(now=now)
+        elapsed = time.perf_counter() - start
+    finally:
+        utils.profile_analytics.db = real_db
+
+    # One profile at a time: read its posts, write its figures
+    one_by_one = 2 * len(profiles)
+    print(f"stored re-analysis ({latency_ms:.0f} ms per query)")
+    print(f"batched               {elapsed:>8.3f}s  {store.calls} queries, {updated} profiles updated")
+    print(f"profile at a time    ~{one_by_one * latency_ms / 1000:>8.0f}s  {one_by_one} queries (round trips alone)")
+
+    # Reference: each profile's posts read on their own, through the per-profile methods
+    store.latency = 0
+    rows = {row["id"]: row for row in store.tables["prospect_social_profiles"]}
+    mismatches = 0
+    for i, f in enumerate(followers):
+        posts = [utils.profile_analytics._post(row) for row in (
+            store.table("prospect_posts").select(utils.profile_analytics._POST_COLUMNS)
+            .eq("social_profile_id", f"p{i}").order("post_date", desc=True).order("id").execute()
+        ).data]
+        details = rows[f"p{i}"]["raw_data"]
+        if (details["engagement_details"], details["posting_patterns"]) != (
+            InstagramScraper._calculate_engagement(posts, f), InstagramScraper._analyze_posting_patterns(posts, now)
+        ):
+            mismatches += 1
+    print(f"results vs per-profile methods: {'same' if not mismatches else f'{mismatches} profiles DIFFERENT'}")
+    return updated == len(profiles) and not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched stored profile re-analysis")
+    parser.add_argument("--profiles", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated database round trip")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    profiles, followers = make_profiles(args.profiles, args.seed, now)
+    print(f"{args.profiles} profiles, {sum(len(p) for p in profiles)} posts")
+
+    return 0 if stored(profiles, followers, args.latency_ms, now) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Record/replay layer for the pipeline's external dependencies.
+In "record" mode real Outscraper, Instagram, Yelp, website, OpenRouter and
+Instantly responses are captured to a JSONL fixture file. In "replay" mode they
+are served back with configurable synthetic latency and error rates. Lookup
+order is exact fixture match, then a recorded response of the same kind used as
+a template, then a synthetic response (see harness/synthetic.py).
+
+Patches the transports, not the pipeline: requests.Session.send,
+curl_cffi Session.request, outscraper ApiClient.google_maps_search and the
+OpenAI chat completions resource. Supabase is replaced separately with
+harness.memory_db (see harness/benchmark.py).
+
+    python -m harness.replay --out fixtures/munich.jsonl --target 20   # record a live run
+
+    with ReplayLayer(mode="record", fixtures="fixtures/munich.jsonl"):
+        MainOrchestrator().run_daily_workflow()
+
+    with ReplayLayer(fixtures="fixtures/munich.jsonl", latency_scale=1.0, error_rate=0.02):
+        MainOrchestrator().run_daily_workflow()
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from curl_cffi import requests as cffi_requests
+from outscraper import ApiClient
+from openai.resources.chat.completions import Completions
+from openai.types.chat import ChatCompletion
+
+from harness import synthetic
+
+# Typical production latency per dependency (ms); multiplied by latency_scale
+DEFAULT_LATENCY_MS = {
+    "outscraper": 4000,
+    "instagram": 900,
+    "yelp": 700,
+    "website": 500,
+    "openrouter": 8000,
+    "instantly": 300,
+    "supabase": 40,  # applied by the stand-in DB, not by this layer
+}
+
+# Recorded bodies are truncated to keep fixture files manageable
+MAX_BODY_CHARS = 200_000
+
+# Results that must stay unique per request (templates would produce duplicate leads)
+NO_TEMPLATES = {"outscraper"}
+
+
+class ReplayError(ConnectionError):
+    """Failure injected by the replay layer (error_rate)."""
+
+
+def classify(url: str) -> str:
+    host = urlsplit(url).netloc.lower()
+    if "outscraper" in host:
+        return "outscraper"
+    if "instagram.com" in host:
+        return "instagram"
+    if "yelp." in host:
+        return "yelp"
+    if "openrouter.ai" in host:
+        return "openrouter"
+    if "instantly.ai" in host:
+        return "instantly"
+    return "website"
+
+
+class FixtureStore:
+    """JSONL fixture file: one {"group", "key", "payload"} object per line."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._entries: dict[str, dict[str, dict]] = {}
+        self._templates: dict[str, list[dict]] = {}
+        self._cursor: Counter = Counter()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._add(entry["group"], entry["key"], entry["payload"])
+
+    def _add(self, group: str, key: str, payload: dict):
+        self._entries.setdefault(group, {})[key] = payload
+        self._templates.setdefault(group, []).append(payload)
+
+    def get(self, group: str, key: str) -> dict | None:
+        return self._entries.get(group, {}).get(key)
+
+    def template(self, group: str) -> dict | None:
+        """Round-robin over everything recorded for `group`."""
+        with self._lock:
+            pool = self._templates.get(group)
+            if not pool:
+                return None
+            payload = pool[self._cursor[group] % len(pool)]
+            self._cursor[group] += 1
+            return payload
+
+    def put(self, group: str, key: str, payload: dict):
+        with self._lock:
+            self._add(group, key, payload)
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"group": group, "key": key, "payload": payload}) + "\n")
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+
+class _ReplayResponse:
+    """Minimal curl_cffi-style response."""
+
+    def __init__(self, payload: dict):
+        self.status_code = payload["status"]
+        self.headers = CaseInsensitiveDict(payload.get("headers") or {})
+        self.url = payload.get("url")
+        self.text = payload.get("body") or ""
+        self.content = self.text.encode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _http_payload(resp) -> dict:
+    return {
+        "status": resp.status_code,
+        "headers": {"content-type": resp.headers.get("content-type", "")},
+        "body": resp.text[:MAX_BODY_CHARS],
+        "url": str(resp.url),
+    }
+
+
+def _requests_response(payload: dict, request) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = payload["status"]
+    resp._content = (payload.get("body") or "").encode("utf-8")
+    resp.headers = CaseInsensitiveDict(payload.get("headers") or {})
+    resp.url = payload.get("url") or request.url
+    resp.request = request
+    resp.encoding = "utf-8"
+    return resp
+
+
+def _chat_group(messages: list[dict]) -> str:
+    prompt = " ".join(m.get("content") or "" for m in messages)
+    if "email_number" in prompt:
+        return "openrouter/emails"
+    if "insight_type" in prompt:
+        return "openrouter/insights"
+    return "openrouter"
+
+
+class ReplayLayer:
+    def __init__(
+        self,
+        mode: str = "replay",
+        fixtures: str | FixtureStore | None = None,
+        latency_scale: float = 0.0,
+        error_rate: float = 0.0,
+        synthetic_fallback: bool = True,
+        latency_ms: dict | None = None,
+        seed: int = 0,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.mode = mode
+        self.fixtures = fixtures if isinstance(fixtures, FixtureStore) else FixtureStore(fixtures)
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.synthetic_fallback = synthetic_fallback
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.stats: Counter = Counter()  # (dependency, source) → calls
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._originals: dict = {}
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    # ── Patching ──
+
+    def install(self):
+        layer = self
+        send = requests.Session.send
+        cffi_request = cffi_requests.Session.request
+        maps_search = ApiClient.google_maps_search
+        create = Completions.create
+        self._originals = {
+            (requests.Session, "send"): send,
+            (cffi_requests.Session, "request"): cffi_request,
+            (ApiClient, "google_maps_search"): maps_search,
+            (Completions, "create"): create,
+        }
+
+        def replay_send(session, request, **kwargs):
+            dependency = classify(request.url)
+            return layer._call(
+                dependency, dependency, f"{request.method} {request.url}",
+                live=lambda: send(session, request, **kwargs),
+                synthesize=lambda: synthetic.http(dependency, request.method, request.url),
+                encode=_http_payload,
+                decode=lambda payload: _requests_response(payload, request),
+            )
+
+        def replay_cffi_request(session, method, url, *args, **kwargs):
+            dependency = classify(url)
+            return layer._call(
+                dependency, dependency, f"{method.upper()} {url}",
+                live=lambda: cffi_request(session, method, url, *args, **kwargs),
+                synthesize=lambda: synthetic.http(dependency, method.upper(), url),
+                encode=_http_payload,
+                decode=_ReplayResponse,
+            )
+
+        def replay_maps_search(client, query, limit=20, *args, **kwargs):
+            skip = kwargs.get("skip", 0)
+            coordinates = kwargs.get("coordinates") or ""
+            key = [query, limit, skip, coordinates] if coordinates else [query, limit, skip]
+            return layer._call(
+                "outscraper", "outscraper", json.dumps(key),
+                live=lambda: maps_search(client, query, limit, *args, **kwargs),
+                synthesize=lambda: {"results": synthetic.maps_search(query, limit, skip, coordinates)},
+                encode=lambda results: {"results": results},
+                decode=lambda payload: payload["results"],
+            )
+
+        def replay_create(completions, *args, **kwargs):
+            messages = kwargs.get("messages") or []
+            key = hashlib.sha1(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+            return layer._call(
+                "openrouter", _chat_group(messages), key,
+                live=lambda: create(completions, *args, **kwargs),
+                synthesize=lambda: synthetic.chat_completion(messages, kwargs.get("model", "replay")),
+                encode=lambda response: response.model_dump(mode="json"),
+                decode=ChatCompletion.model_validate,
+            )
+
+        requests.Session.send = replay_send
+        cffi_requests.Session.request = replay_cffi_request
+        ApiClient.google_maps_search = replay_maps_search
+        Completions.create = replay_create
+
+    def uninstall(self):
+        for (owner, name), original in self._originals.items():
+            setattr(owner, name, original)
+        self._originals = {}
+
+    # ── Dispatch ──
+
+    def _call(self, dependency: str, group: str, key: str, live, synthesize, encode, decode):
+        if self.mode == "record":
+            result = live()
+            self.fixtures.put(group, key, encode(result))
+            self.stats[(dependency, "recorded")] += 1
+            return result
+
+        self._delay(dependency)
+        with self._rng_lock:
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if fail:
+            self.stats[(dependency, "error")] += 1
+            raise ReplayError(f"Injected {dependency} failure for {key[:80]}")
+
+        payload, source = self.fixtures.get(group, key), "fixture"
+        if payload is None and group not in NO_TEMPLATES:
+            payload, source = self.fixtures.template(group), "template"
+        if payload is None and self.synthetic_fallback:
+            payload, source = synthesize(), "synthetic"
+        if payload is None:
+            raise ReplayError(f"No fixture for {group}: {key[:80]}")
+        self.stats[(dependency, source)] += 1
+        return decode(payload)
+
+    def _delay(self, dependency: str):
+        base = self.latency_ms.get(dependency, 0) * self.latency_scale / 1000
+        if base <= 0:
+            return
+        with self._rng_lock:
+            jitter = self._rng.uniform(0.5, 1.5)
+        time.sleep(base * jitter)
+
+    def summary(self) -> dict:
+        out: dict = {}
+        for (dependency, source), n in sorted(self.stats.items()):
+            out.setdefault(dependency, {})[source] = n
+        return out
+
+
+def main():
+    """Record fixtures from a real (small) pipeline run against live services and Supabase."""
+    import argparse
+    from config.settings import settings
+    from orchestrator.main_orchestrator import MainOrchestrator
+
+    parser = argparse.ArgumentParser(description="Record external responses to a fixture file")
+    parser.add_argument("--out", required=True, help="JSONL fixture file (appended to)")
+    parser.add_argument("--target", type=int, default=20, help="Leads to scrape for the recording run")
+    parser.add_argument("--category", type=str)
+    parser.add_argument("--location", type=str)
+    args = parser.parse_args()
+
+    settings.load_remote_settings()
+    settings.daily_scrape_target = args.target
+    if args.category:
+        settings.target_category = args.category
+    if args.location:
+        settings.target_location = args.location
+        settings.target_city = args.location
+
+    with ReplayLayer(mode="record", fixtures=args.out) as layer:
+        MainOrchestrator().run_daily_workflow(reload_settings=False)
+    print(f"Recorded {len(layer.fixtures)} fixtures to {args.out}: {layer.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup-time benchmark.
+Times `daily_workflow.py --dry-run` in a fresh interpreter per run and lists
+the slowest imports (python -X importtime), so import-time work and network
+calls sneaking back into module import show up.
+
+Usage (from pipeline/):
+    python -m harness.startup --runs 5
+    python -m harness.startup --runs 5 --top 15
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    env.setdefault("SUPABASE_SERVICE_KEY", "local.harness.key")
+    return env
+
+
+def time_dry_run(runs: int, command: list[str]) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *command],
+            cwd=PIPELINE_DIR,
+            env=_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(command: list[str], top: int) -> list[tuple[int, str]]:
+    """(cumulative µs, module) for the slowest top-level imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        cwd=PIPELINE_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time pipeline startup (daily_workflow.py --dry-run)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    command = ["daily_workflow.py", "--dry-run"]
+    timings = time_dry_run(args.runs, command)
+    print(f"daily_workflow.py --dry-run over {args.runs} runs: "
+          f"median {statistics.median(timings):.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s")
+
+    print("\nSlowest imports (cumulative):")
+    for micros, name in slowest_imports(command, args.top):
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
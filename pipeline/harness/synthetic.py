@@ -0,0 +1,194 @@
+"""
+Deterministic synthetic responses for the replay layer.
+Used when no recorded fixture matches a request, so the pipeline can run end to
+end offline at any size. Payload shapes mirror what each client returns
+(Outscraper places, Instagram web_profile_info, HTML pages, OpenRouter chat
+completions, Instantly JSON).
+"""
+
+import hashlib
+import json
+import random
+import time
+from urllib.parse import parse_qs, urlsplit
+
+SHARE_WITH_INSTAGRAM = 0.6
+SHARE_WITH_YELP = 0.3
+SHARE_WITH_EMAIL = 0.5
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(digest[:12], 16))
+
+
+# Centre and spread (degrees) of synthetic places when a search isn't pinned to coordinates
+CITY_CENTER = (48.137, 11.575)
+CITY_SPREAD = 0.08
+# Businesses per category in a synthetic city (what tiled searches can find in total)
+CITY_PLACES = 3000
+
+
+def maps_search(query: str, limit: int, skip: int = 0, coordinates: str = "") -> list[list[dict]]:
+    """
+    Outscraper google_maps_search(): one result list per query.
+    A search pinned to `coordinates` (@lat,lng,zoom) returns its own places around
+    that point, as many as its share of the city's area holds (uneven, so some tiles run dry).
+    """
+    category, _, location = query.partition(" in ")
+    city = location.split(",")[0].strip() or "Munich"
+    tag = hashlib.sha1(f"{query}{coordinates}".encode()).hexdigest()[:6]
+    (lat0, lng0), spread = CITY_CENTER, CITY_SPREAD
+    if coordinates:
+        lat, lng, zoom = coordinates.lstrip("@").rstrip("z").split(",")
+        lat0, lng0, zoom = float(lat), float(lng), float(zoom)
+        spread = 1400.0 / 2 ** zoom / 2
+        share = min(1.0, (spread / CITY_SPREAD) ** 2)
+        available = int(_rng(query, coordinates).uniform(0.0, 2.0) * CITY_PLACES * share)
+        limit = max(0, min(limit, available - skip))
+    places = []
+    for n in range(skip, skip + limit):
+        rng = _rng(query, coordinates, n)
+        slug = f"{category.lower().replace(' ', '-').replace('&', 'and')}-{tag}-{n}"
+        socials = []
+        if rng.random() < SHARE_WITH_INSTAGRAM:
+            socials.append(f"https://instagram.com/{slug.replace('-', '_')}")
+        if rng.random() < SHARE_WITH_YELP:
+            socials.append(f"https://www.yelp.com/biz/{slug}")
+        places.append({
+            "name": f"{category.strip()} {city} {tag}-{n}",
+            "place_id": f"ChIJ{tag}{n:08d}",
+            "site": f"https://{slug}.example.com",
+            "social_media": socials,
+            "email_1": f"info@{slug}.example.com" if rng.random() < SHARE_WITH_EMAIL else None,
+            "phone": f"+49 89 {rng.randint(1000000, 9999999)}",
+            "full_address": f"Teststraße {n % 200 + 1}, {city}",
+            "city": city,
+            "rating": round(rng.uniform(3.2, 5.0), 1),
+            "reviews": rng.randint(3, 900),
+            "photos_count": rng.randint(0, 300),
+            "type": category.strip(),
+            "location_link": f"https://maps.google.com/?cid={tag}{n}",
+            "latitude": round(lat0 + rng.uniform(-spread, spread), 6),
+            "longitude": round(lng0 + rng.uniform(-spread, spread), 6),
+        })
+    return [places]
+
+
+def instagram_profile(url: str) -> dict:
+    username = parse_qs(urlsplit(url).query).get("username", ["unknown"])[0]
+    rng = _rng("instagram", username)
+    now = int(time.time())
+    edges = []
+    for i in range(12):
+        edges.append({"node": {
+            "__typename": rng.choice(["GraphImage", "GraphSidecar", "GraphVideo"]),
+            "shortcode": f"{username[:6]}{i}",
+            "taken_at_timestamp": now - (i + 1) * rng.randint(2, 12) * 86400,
+            "is_video": rng.random() < 0.3,
+            "video_view_count": rng.randint(100, 5000),
+            "edge_liked_by": {"count": rng.randint(5, 400)},
+            "edge_media_to_comment": {"count": rng.randint(0, 40)},
+            "edge_media_to_caption": {"edges": [{"node": {"text": f"Before/after at {username} #salon #book now"}}]},
+        }})
+    return {"data": {"user": {
+        "username": username,
+        "biography": "Book via link in bio • linktr.ee/" + username,
+        "is_private": False,
+        "is_business_account": rng.random() < 0.8,
+        "edge_followed_by": {"count": rng.randint(100, 20000)},
+        "edge_follow": {"count": rng.randint(50, 1500)},
+        "edge_owner_to_timeline_media": {"count": rng.randint(12, 900), "edges": edges},
+    }}}
+
+
+def website_html(url: str) -> str:
+    host = urlsplit(url).netloc or "example.com"
+    rng = _rng("website", host)
+    slug = host.split(".")[0].replace("-", "_")
+    links = [f'<a href="https://instagram.com/{slug}">Instagram</a>'] if rng.random() < 0.5 else []
+    if rng.random() < 0.4:
+        links.append('<a href="/blog">Blog</a>')
+    filler = " ".join(["Welcome to our local business, family owned since 1998."] * rng.randint(5, 40))
+    return (
+        f"<html><head><title>{host}</title></head><body>"
+        f"<h1>{host}</h1><p>{filler}</p><p>Book now online or call us.</p>"
+        f'<a href="mailto:hello@{host}">Contact</a> {" ".join(links)}'
+        f"</body></html>"
+    )
+
+
+def yelp_html(url: str) -> str:
+    rng = _rng("yelp", url)
+    return (
+        "<html><body>"
+        f'<div aria-label="{round(rng.uniform(3.0, 5.0), 1)} star rating"></div>'
+        f'<a href="#reviews"><span>{rng.randint(3, 400)} reviews</span></a>'
+        '<span class="priceRange">€€</span>'
+        "</body></html>"
+    )
+
+
+def instantly(method: str, url: str) -> dict:
+    path = urlsplit(url).path
+    if path.endswith("/campaigns") and method == "GET":
+        return {"items": []}
+    if path.endswith("/campaigns") and method == "POST":
+        return {"id": "replay-campaign"}
+    if path.endswith("/leads") and method == "POST":
+        return {"id": hashlib.sha1(url.encode() + str(time.time_ns()).encode()).hexdigest()[:16]}
+    return {}
+
+
+def http(dependency: str, method: str, url: str) -> dict:
+    """Synthetic HTTP payload: {"status", "headers", "body", "url"}."""
+    if dependency == "instagram":
+        body, ctype = json.dumps(instagram_profile(url)), "application/json"
+    elif dependency == "instantly":
+        body, ctype = json.dumps(instantly(method, url)), "application/json"
+    elif dependency == "yelp" and "/biz/" in url:
+        body, ctype = yelp_html(url), "text/html"
+    elif dependency in ("website", "yelp"):
+        body, ctype = website_html(url), "text/html"
+    else:
+        return {"status": 404, "headers": {}, "body": "", "url": url}
+    return {"status": 200, "headers": {"content-type": ctype}, "body": body, "url": url}
+
+
+def chat_completion(messages: list[dict], model: str) -> dict:
+    """OpenRouter chat completion with insight or email-sequence JSON, depending on the prompt."""
+    prompt = " ".join(m.get("content") or "" for m in messages)
+    rng = _rng("chat", hashlib.sha1(prompt.encode()).hexdigest())
+    if "email_number" in prompt:
+        content = [{
+            "email_number": n,
+            "subject_line": f"Quick idea #{n}",
+            "body": "Hi there,\n\n" + "We noticed a few things about your online presence. " * rng.randint(3, 8),
+            "data_points_used": ["rating"],
+            "data_points_count": 1,
+        } for n in range(1, 5)]
+    else:
+        types = ["posting_pattern", "engagement_analysis", "competitor_gap", "review_social_gap",
+                 "content_quality", "platform_gap", "tool_usage", "growth_opportunity"]
+        content = [{
+            "insight_type": t,
+            "insight_title": f"Synthetic {t.replace('_', ' ')}",
+            "insight_description": f"Replay insight about {t}. Posting dropped to {rng.randint(0, 4)}x/month.",
+            "priority_score": rng.randint(3, 10),
+            "supporting_data": {"value": rng.randint(1, 100)},
+        } for t in rng.sample(types, 7)]
+    text = json.dumps(content)
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(text) // 4
+    return {
+        "id": f"replay-{rng.randint(0, 10**9)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
@@ -9,6 +9,8 @@ from config.settings import settings
 from config.database import db
 from utils.logger import logger
 from utils.helpers import retry
+from utils.leases import leases
+from utils.llm_scheduler import llm_scheduler, estimate_tokens
 
 
 class InsightGenerator:
@@ -22,13 +24,17 @@ class InsightGenerator:
     def generate_insights(self, lead_id: str, lead_data: dict, social_data: dict | None = None, competitors: list[dict] | None = None) -> list[dict]:
         prompt = self._build_prompt(lead_data, social_data, competitors)
 
-        response = self.client.chat.completions.create(
-            model=settings.ai_model,
-            max_tokens=2000,
-            messages=[
-                {"role": "system", "content": self._system_prompt()},
-                {"role": "user", "content": prompt},
-            ],
+        messages = [
+            {"role": "system", "content": self._system_prompt()},
+            {"role": "user", "content": prompt},
+        ]
+        response = llm_scheduler.call(
+            lambda: self.client.chat.completions.create(
+                model=settings.ai_model,
+                max_tokens=2000,
+                messages=messages,
+            ),
+            est_tokens=estimate_tokens(messages, 2000),
         )
 
         text = response.choices[0].message.content
@@ -172,9 +178,9 @@ Generate 7-10 insights. Return ONLY the JSON array, no other text.""")
                 logger.error(f"Failed to save insight for lead {lead_id}: {e}")
 
         try:
-            db.table("outreach_leads").update({
+            leases.advance(lead_id, "scored", {
                 "pipeline_status": "insights_generated"
-            }).eq("id", lead_id).execute()
+            })
         except Exception:
             pass
 
@@ -8,6 +8,8 @@ from config.settings import settings
 from config.database import db
 from utils.logger import logger
 from utils.helpers import retry
+from utils.leases import leases
+from utils.metrics import metrics
 
 INSTANTLY_API_URL = "https://api.instantly.ai/api/v2"
 
@@ -24,14 +26,16 @@ class InstantlyAPI:
         url = f"{INSTANTLY_API_URL}{endpoint}"
 
         try:
-            if method == "GET":
-                resp = requests.get(url, headers=self.headers, params=data, timeout=30)
-            elif method == "POST":
-                resp = requests.post(url, headers=self.headers, json=data, timeout=30)
-            elif method == "PATCH":
-                resp = requests.patch(url, headers=self.headers, json=data, timeout=30)
-            else:
-                resp = requests.request(method, url, headers=self.headers, json=data, timeout=30)
+            with metrics.call("instantly") as call:
+                if method == "GET":
+                    resp = requests.get(url, headers=self.headers, params=data, timeout=30)
+                elif method == "POST":
+                    resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+                elif method == "PATCH":
+                    resp = requests.patch(url, headers=self.headers, json=data, timeout=30)
+                else:
+                    resp = requests.request(method, url, headers=self.headers, json=data, timeout=30)
+                call.response(resp)
 
             if resp.status_code in (200, 201):
                 return resp.json()
@@ -171,11 +175,11 @@ class InstantlyAPI:
             if success:
                 uploaded += 1
                 try:
-                    db.table("outreach_leads").update({
+                    leases.advance(lead_id, "emails_generated", {
                         "pipeline_status": "uploaded_to_instantly",
                         "instantly_campaign_id": campaign_id,
                         "status": "contacted",
-                    }).eq("id", lead_id).execute()
+                    })
                 except Exception:
                     pass
             else:
@@ -4,52 +4,106 @@ Coordinates all modules: scrape → enrich → score → insights → emails →
 """
 
 import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from config.settings import settings
-from config.database import db
-from scrapers.outscraper_scraper import OutscraperScraper
-from scrapers.instagram_scraper import InstagramScraper
-from scrapers.email_finder import EmailFinder
-from scrapers.fresh_sources import FreshSourcesScraper
-from scrapers.engagement_scraper import EngagementScraper
-from enrichment.multi_platform import MultiPlatformEnricher
-from enrichment.competitor_finder import CompetitorFinder
-from scoring.scoring_engine import ScoringEngine
-from insights.insight_generator import InsightGenerator
-from emails.email_generator import EmailGenerator
-from integrations.instantly_api import InstantlyAPI
-from learning.learning_engine import LearningEngine
+from config.database import db, pool_stats
+from orchestrator.streaming import StreamingPipeline
+from orchestrator.markets import apply_market, market_scope
 from utils.logger import logger
 from utils.helpers import extract_instagram_username
+from utils.llm_scheduler import llm_scheduler
+from utils.leases import leases
+from utils.metrics import metrics
+from utils.write_buffer import write_buffer
+from utils.dedup_index import dedup_index
+from utils.entity_resolution import entity_resolver
+from utils.lead_scan import load_stored_leads
+from utils.response_cache import outscraper_cache
+from utils.query_watermarks import query_watermarks
+from utils.profile_cache import profile_cache
+from utils import concurrency
+from utils.adaptive_limiter import instagram_limiter
+from utils.proxy_pool import proxy_pool
+
+
+_component_lock = threading.RLock()
+
+
+class _Component:
+    """
+    Pipeline component created on first use. Importing the scraper/LLM modules pulls in
+    instaloader, curl_cffi, outscraper, bs4 and openai, so that only happens when a step needs them.
+    """
+
+    def __init__(self, path: str):
+        self.module, self.cls = path.split(":")
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with _component_lock:
+            if self.name not in obj.__dict__:
+                component_cls = getattr(importlib.import_module(self.module), self.cls)
+                obj.__dict__[self.name] = component_cls()
+        return obj.__dict__[self.name]
 
 
 class MainOrchestrator:
-    def __init__(self):
-        self.outscraper = OutscraperScraper()
-        self.ig_scraper = InstagramScraper()
-        self.email_finder = EmailFinder()
-        self.fresh_sources = FreshSourcesScraper()
-        self.engagement_scraper = EngagementScraper()
-        self.enricher = MultiPlatformEnricher()
-        self.competitor_finder = CompetitorFinder()
-        self.scorer = ScoringEngine()
-        self.insight_gen = InsightGenerator()
-        self.email_gen = EmailGenerator()
-        self.instantly = InstantlyAPI()
-        self.learner = LearningEngine()
-
-    def run_daily_workflow(self) -> dict:
-        """Execute the full daily pipeline."""
+    INSIGHT_TIERS = ["TIER_1", "TIER_2", "TIER_3"]
+    # Leads each stage takes per run (batch selects and streaming stages alike)
+    STAGE_LIMITS = {"score": 500, "insights": 50, "emails": 50, "upload": 50}
+
+    outscraper = _Component("scrapers.outscraper_scraper:OutscraperScraper")
+    ig_scraper = _Component("scrapers.instagram_scraper:InstagramScraper")
+    email_finder = _Component("scrapers.email_finder:EmailFinder")
+    fresh_sources = _Component("scrapers.fresh_sources:FreshSourcesScraper")
+    engagement_scraper = _Component("scrapers.engagement_scraper:EngagementScraper")
+    enricher = _Component("enrichment.multi_platform:MultiPlatformEnricher")
+    competitor_finder = _Component("enrichment.competitor_finder:CompetitorFinder")
+    scorer = _Component("scoring.scoring_engine:ScoringEngine")
+    insight_gen = _Component("insights.insight_generator:InsightGenerator")
+    email_gen = _Component("emails.email_generator:EmailGenerator")
+    instantly = _Component("integrations.instantly_api:InstantlyAPI")
+    learner = _Component("learning.learning_engine:LearningEngine")
+
+    # outreach_leads filters for a multi-market run ({"market": key}); empty = every lead
+    scope: dict = {}
+    # Leads the current batch step selected (their rejected writes count against it)
+    _stage_lead_ids: list[str] = []
+
+    def run_daily_workflow(self, market: dict | None = None, reload_settings: bool = True) -> dict:
+        """
+        Execute the full daily pipeline.
+        `market` overrides the target city/category/target for multi-market runs;
+        `reload_settings=False` skips the remote settings reload (already done by the caller).
+        """
         if not settings.pipeline_enabled:
             logger.info("Pipeline is DISABLED via dashboard settings. Exiting.")
             return {"run_id": None, "status": "disabled"}
 
         # Reload remote settings at start of each run
-        settings.load_remote_settings()
+        if reload_settings:
+            settings.load_remote_settings()
+        if market:
+            apply_market(market)
+        self.scope = market_scope() if market else {}
+        llm_scheduler.configure(settings.claude_requests_per_minute, settings.claude_tokens_per_minute)
         if not settings.pipeline_enabled:
             logger.info("Pipeline is DISABLED via dashboard settings. Exiting.")
             return {"run_id": None, "status": "disabled"}
 
+        metrics.reset()
+        outscraper_cache.reset_stats()
+        profile_cache.reset_stats()
+        instagram_limiter.configure()
+        proxy_pool.configure()
+        concurrency.configure()
         run_id = self._start_run()
         results = {
             "run_id": run_id,
@@ -64,45 +118,59 @@ class MainOrchestrator:
 
         start_time = time.time()
 
-        # ── STEP 1: SCRAPE ──
-        # Outscraper gets full target; fresh/engagement get spillover only if Outscraper under-delivers.
+        if settings.pipeline_mode == "streaming":
+            try:
+                logger.info("=" * 60)
+                logger.info("STREAMING: scrape → enrich → score → insights → emails → upload")
+                with metrics.stage("streaming"):
+                    StreamingPipeline(self).run(results)
+            except Exception as e:
+                logger.error(f"Streaming pipeline failed: {e}", exc_info=True)
+                results["errors"].append({"step": "streaming", "error": str(e)})
+        else:
+            self._run_batch_steps(results)
+
+        # ── STEP 7: LEARNING ──
         try:
             logger.info("=" * 60)
-            logger.info("STEP 1: SCRAPING")
-            total_target = settings.daily_scrape_target
+            logger.info("STEP 7: LEARNING ENGINE")
+            with metrics.stage("learning"):
+                recs = self.learner.generate_recommendations()
+            logger.info(f"Learning engine: {len(recs)} recommendations")
+        except Exception as e:
+            logger.error(f"Learning engine failed: {e}", exc_info=True)
+            results["errors"].append({"step": "learning", "error": str(e)})
 
-            # Primary: Outscraper (Google Maps) — full target
-            logger.info(f"  1a. Outscraper: targeting {total_target}")
-            outscraper_result = self.outscraper.scrape_and_save(limit=total_target)
-            outscraper_saved = outscraper_result.get("saved", 0)
+        try:
+            leases.release_all()
+        except Exception as e:
+            logger.warning(f"Failed to release lead leases: {e}")
 
-            # Spillover to secondary sources if Outscraper fell short
-            remaining = max(0, total_target - outscraper_saved)
-            fresh_saved = 0
-            engagement_saved = 0
+        duration = int(time.time() - start_time)
+        self._finish_run(run_id, results, duration)
+        self._export_metrics(run_id)
+        self._log_metrics()
 
-            if remaining > 0:
-                logger.info(f"  1b. Fresh sources: targeting {remaining}")
-                try:
-                    fresh_result = self.fresh_sources.scrape_and_save(limit=remaining)
-                    fresh_saved = fresh_result.get("saved", 0)
-                except Exception as e:
-                    logger.warning(f"  Fresh sources failed (non-fatal): {e}")
+        logger.info("=" * 60)
+        logger.info("DAILY WORKFLOW COMPLETE")
+        logger.info(f"Scraped: {results['scraped']} | Enriched: {results['enriched']} | "
+                     f"Scored: {results['scored']} | Insights: {results['insights_generated']} | "
+                     f"Emails: {results['emails_generated']} | Uploaded: {results['uploaded']}")
+        logger.info(f"Duration: {duration}s | Errors: {len(results['errors'])}")
+        logger.info("=" * 60)
 
-            remaining = max(0, remaining - fresh_saved)
-            if remaining > 0:
-                logger.info(f"  1c. Engagement targeting: targeting {remaining}")
-                try:
-                    engagement_result = self.engagement_scraper.scrape_and_save(max_prospects=remaining)
-                    engagement_saved = engagement_result.get("saved", 0)
-                except Exception as e:
-                    logger.warning(f"  Engagement targeting failed (non-fatal): {e}")
+        return results
+
+    # ── Step implementations ──
 
-            results["scraped"] = outscraper_saved + fresh_saved + engagement_saved
-            logger.info(
-                f"Scraped: {results['scraped']} total "
-                f"(Outscraper: {outscraper_saved}, Fresh: {fresh_saved}, Engagement: {engagement_saved})"
-            )
+    def _run_batch_steps(self, results: dict):
+        """Steps 1-6 as strict barriers: each step re-queries Supabase by pipeline_status."""
+        # ── STEP 1: SCRAPE ──
+        try:
+            logger.info("=" * 60)
+            logger.info("STEP 1: SCRAPING")
+            with metrics.stage("scrape"):
+                results["scraped"] = self._scrape_sources()
         except Exception as e:
             logger.error(f"Scraping failed: {e}", exc_info=True)
             results["errors"].append({"step": "scraping", "error": str(e)})
@@ -111,7 +179,9 @@ class MainOrchestrator:
         try:
             logger.info("=" * 60)
             logger.info("STEP 2: ENRICHMENT")
-            results["enriched"] = self._enrich_pending_leads()
+            with metrics.stage("enrich"):
+                results["enriched"] = self._enrich_pending_leads()
+                results["enriched"] -= self._flush_stage()
         except Exception as e:
             logger.error(f"Enrichment failed: {e}", exc_info=True)
             results["errors"].append({"step": "enrichment", "error": str(e)})
@@ -120,7 +190,9 @@ class MainOrchestrator:
         try:
             logger.info("=" * 60)
             logger.info("STEP 3: SCORING")
-            results["scored"] = self._score_enriched_leads()
+            with metrics.stage("score"):
+                results["scored"] = self._score_enriched_leads()
+                results["scored"] -= self._flush_stage()
         except Exception as e:
             logger.error(f"Scoring failed: {e}", exc_info=True)
             results["errors"].append({"step": "scoring", "error": str(e)})
@@ -129,7 +201,9 @@ class MainOrchestrator:
         try:
             logger.info("=" * 60)
             logger.info("STEP 4: AI INSIGHTS")
-            results["insights_generated"] = self._generate_insights_for_top_leads()
+            with metrics.stage("insights"):
+                results["insights_generated"] = self._generate_insights_for_top_leads()
+                results["insights_generated"] -= self._flush_stage()
         except Exception as e:
             logger.error(f"Insight generation failed: {e}", exc_info=True)
             results["errors"].append({"step": "insights", "error": str(e)})
@@ -138,7 +212,9 @@ class MainOrchestrator:
         try:
             logger.info("=" * 60)
             logger.info("STEP 5: EMAIL GENERATION")
-            results["emails_generated"] = self._generate_emails_for_top_leads()
+            with metrics.stage("emails"):
+                results["emails_generated"] = self._generate_emails_for_top_leads()
+                results["emails_generated"] -= self._flush_stage()
         except Exception as e:
             logger.error(f"Email generation failed: {e}", exc_info=True)
             results["errors"].append({"step": "emails", "error": str(e)})
@@ -147,131 +223,195 @@ class MainOrchestrator:
         try:
             logger.info("=" * 60)
             logger.info("STEP 6: INSTANTLY UPLOAD")
-            results["uploaded"] = self._upload_to_instantly()
+            with metrics.stage("upload"):
+                results["uploaded"] = self._upload_to_instantly()
+                results["uploaded"] -= self._flush_stage()
         except Exception as e:
             logger.error(f"Instantly upload failed: {e}", exc_info=True)
             results["errors"].append({"step": "instantly", "error": str(e)})
 
-        # ── STEP 7: LEARNING ──
-        try:
-            logger.info("=" * 60)
-            logger.info("STEP 7: LEARNING ENGINE")
-            recs = self.learner.generate_recommendations()
-            logger.info(f"Learning engine: {len(recs)} recommendations")
-        except Exception as e:
-            logger.error(f"Learning engine failed: {e}", exc_info=True)
-            results["errors"].append({"step": "learning", "error": str(e)})
-
-        duration = int(time.time() - start_time)
-        self._finish_run(run_id, results, duration)
-
-        logger.info("=" * 60)
-        logger.info("DAILY WORKFLOW COMPLETE")
-        logger.info(f"Scraped: {results['scraped']} | Enriched: {results['enriched']} | "
-                     f"Scored: {results['scored']} | Insights: {results['insights_generated']} | "
-                     f"Emails: {results['emails_generated']} | Uploaded: {results['uploaded']}")
-        logger.info(f"Duration: {duration}s | Errors: {len(results['errors'])}")
-        logger.info("=" * 60)
+    def _flush_stage(self) -> int:
+        """
+        Store every buffered write before the next step (it compare-and-sets on the
+        new statuses). Returns how many of this step's leads didn't land.
+        """
+        unlanded = write_buffer.flush(self._stage_lead_ids)
+        write_buffer.flush()  # the rest, e.g. fields merged into stored leads while scraping
+        return len(unlanded)
+
+    def _scrape_sources(self, on_saved=None) -> int:
+        """
+        Outscraper gets full target; fresh/engagement get spillover only if Outscraper under-delivers.
+        `on_saved` is called after each source has saved its leads (used by streaming mode).
+        """
+        total_target = settings.daily_scrape_target
+        # Both per-run indexes are filled from one scan of outreach_leads
+        load_stored_leads(*(index for enabled, index in (
+            (settings.dedup_index, dedup_index),
+            (settings.entity_resolution, entity_resolver),
+        ) if enabled))
+        # Watermarks are re-read each run (another worker may have advanced them)
+        query_watermarks.reset()
+
+        # Primary: Outscraper (Google Maps) — full target
+        logger.info(f"  1a. Outscraper: targeting {total_target}")
+        outscraper_result = self.outscraper.scrape_and_save(limit=total_target)
+        outscraper_saved = outscraper_result.get("saved", 0)
+        if on_saved:
+            on_saved()
+
+        # Spillover to secondary sources if Outscraper fell short
+        remaining = max(0, total_target - outscraper_saved)
+        fresh_saved = 0
+        engagement_saved = 0
+
+        if remaining > 0:
+            logger.info(f"  1b. Fresh sources: targeting {remaining}")
+            try:
+                fresh_result = self.fresh_sources.scrape_and_save(limit=remaining)
+                fresh_saved = fresh_result.get("saved", 0)
+                if on_saved:
+                    on_saved()
+            except Exception as e:
+                logger.warning(f"  Fresh sources failed (non-fatal): {e}")
 
-        return results
+        remaining = max(0, remaining - fresh_saved)
+        if remaining > 0:
+            logger.info(f"  1c. Engagement targeting: targeting {remaining}")
+            try:
+                engagement_result = self.engagement_scraper.scrape_and_save(max_prospects=remaining)
+                engagement_saved = engagement_result.get("saved", 0)
+                if on_saved:
+                    on_saved()
+            except Exception as e:
+                logger.warning(f"  Engagement targeting failed (non-fatal): {e}")
 
-    # ── Step implementations ──
+        scraped = outscraper_saved + fresh_saved + engagement_saved
+        logger.info(
+            f"Scraped: {scraped} total "
+            f"(Outscraper: {outscraper_saved}, Fresh: {fresh_saved}, Engagement: {engagement_saved})"
+        )
+        if dedup_index.loaded:
+            logger.info(f"Dedup index: {dedup_index.stats}")
+        if entity_resolver.loaded:
+            logger.info(f"Entity resolution: {entity_resolver.stats}")
+        return scraped
+
+    def _claim(self, stage: str, limit: int) -> list[dict]:
+        return leases.claim(stage, limit, self.scope)
+
+    def _leads(self):
+        """select("*") on outreach_leads, narrowed to this run's market."""
+        query = db.table("outreach_leads").select("*")
+        for col, value in self.scope.items():
+            query = query.eq(col, value)
+        return query
 
     def _enrich_pending_leads(self) -> int:
         """Enrich all leads with pending enrichment status."""
-        leads = (
-            db.table("outreach_leads")
-            .select("*")
-            .eq("enrichment_status", "pending")
-            .eq("pipeline_status", "scraped")
-            .limit(settings.daily_scrape_target)
-            .execute()
-        )
+        if leases.enabled:
+            leads = self._claim("enrich", settings.daily_scrape_target)
+        else:
+            leads = (
+                self._leads()
+                .eq("enrichment_status", "pending")
+                .eq("pipeline_status", "scraped")
+                .limit(settings.daily_scrape_target)
+                .execute()
+            ).data
 
-        if not leads.data:
+        self._stage_lead_ids = [lead["id"] for lead in leads or []]
+        if not leads:
             logger.info("No leads to enrich")
             return 0
 
-        enriched = 0
-        for lead in leads.data:
-            try:
-                lead_id = lead["id"]
+        # At least one worker per healthy Instagram proxy, so each exit IP stays busy
+        workers = max(1, settings.enrichment_workers, len(proxy_pool.healthy()))
+        logger.info(f"Enriching {len(leads)} leads with {workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as pool:
+            enriched = sum(1 for ok in pool.map(self._enrich_lead, leads) if ok)
 
-                # Mark as in progress
-                db.table("outreach_leads").update({
-                    "enrichment_status": "in_progress"
-                }).eq("id", lead_id).execute()
-
-                # Instagram
-                ig_username = extract_instagram_username(lead.get("instagram_url"))
-                if ig_username:
-                    ig_data = self.ig_scraper.scrape_profile(ig_username)
-                    if ig_data:
-                        self.ig_scraper.save_profile_to_supabase(lead_id, ig_data)
-
-                # Multi-platform (Yelp, website)
-                self.enricher.enrich_lead(lead_id, lead)
-
-                # Email finding (if no email yet)
-                if not lead.get("contact_email") and not lead.get("owner_email"):
-                    email_result = self.email_finder.find_email(lead)
-                    if email_result:
-                        db.table("outreach_leads").update({
-                            "contact_email": email_result["email"],
-                            "owner_email": email_result["email"],
-                            "email_confidence": email_result["confidence"],
-                            "email_source": email_result["source"],
-                        }).eq("id", lead_id).execute()
-
-                # Competitors (only for leads with Instagram)
-                if ig_username:
-                    try:
-                        self.competitor_finder.analyze_competitors(lead_id, lead, max_competitors=2)
-                    except Exception as e:
-                        logger.warning(f"Competitor analysis failed for {lead_id}: {e}")
-
-                # Mark enriched
-                db.table("outreach_leads").update({
-                    "enrichment_status": "completed",
-                    "pipeline_status": "enriched",
-                    "last_enriched_at": datetime.now(timezone.utc).isoformat(),
-                }).eq("id", lead_id).execute()
-
-                enriched += 1
-                logger.info(f"Enriched lead {lead_id} ({lead.get('business_name')})")
+        return enriched
 
-            except Exception as e:
-                logger.error(f"Enrichment failed for lead {lead.get('id')}: {e}")
+    def _enrich_lead(self, lead: dict) -> bool:
+        """Enrich a single lead. Failures are isolated to the lead and mark it as failed."""
+        try:
+            lead_id = lead["id"]
+
+            # Mark as in progress (a lease claim already did this atomically)
+            if not leases.enabled:
+                write_buffer.update(lead_id, {"enrichment_status": "in_progress"})
+
+            # Instagram
+            ig_username = extract_instagram_username(lead.get("instagram_url"))
+            if ig_username:
+                ig_data = self.ig_scraper.scrape_profile(ig_username)
+                if ig_data:
+                    self.ig_scraper.save_profile_to_supabase(lead_id, ig_data)
+
+            # Multi-platform (Yelp, website)
+            self.enricher.enrich_lead(lead_id, lead)
+
+            # Email finding (if no email yet)
+            if not lead.get("contact_email") and not lead.get("owner_email"):
+                email_result = self.email_finder.find_email(lead)
+                if email_result:
+                    write_buffer.update(lead_id, {
+                        "contact_email": email_result["email"],
+                        "owner_email": email_result["email"],
+                        "email_confidence": email_result["confidence"],
+                        "email_source": email_result["source"],
+                    })
+
+            # Competitors (only for leads with Instagram)
+            if ig_username:
                 try:
-                    db.table("outreach_leads").update({
-                        "enrichment_status": "failed"
-                    }).eq("id", lead["id"]).execute()
-                except Exception:
-                    pass
+                    self.competitor_finder.analyze_competitors(lead_id, lead, max_competitors=2)
+                except Exception as e:
+                    logger.warning(f"Competitor analysis failed for {lead_id}: {e}")
 
-        return enriched
+            # Mark enriched
+            if not leases.advance(lead_id, "scraped", {
+                "enrichment_status": "completed",
+                "pipeline_status": "enriched",
+                "last_enriched_at": datetime.now(timezone.utc).isoformat(),
+            }):
+                return False
+
+            logger.info(f"Enriched lead {lead_id} ({lead.get('business_name')})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Enrichment failed for lead {lead.get('id')}: {e}")
+            try:
+                leases.release([lead["id"]], {"enrichment_status": "failed"})
+            except Exception:
+                pass
+            return False
 
     def _score_enriched_leads(self) -> int:
         """Score all enriched but unscored leads."""
-        leads = (
-            db.table("outreach_leads")
-            .select("*")
-            .eq("pipeline_status", "enriched")
-            .limit(500)
-            .execute()
-        )
+        if leases.enabled:
+            leads = self._claim("score", self.STAGE_LIMITS["score"])
+        else:
+            leads = (
+                self._leads()
+                .eq("pipeline_status", "enriched")
+                .limit(self.STAGE_LIMITS["score"])
+                .execute()
+            ).data
 
-        if not leads.data:
+        self._stage_lead_ids = [lead["id"] for lead in leads or []]
+        if not leads:
             return 0
 
+        related = self._prefetch_related([lead["id"] for lead in leads])
+
         scored = 0
-        for lead in leads.data:
+        for lead in leads:
             try:
                 lead_id = lead["id"]
-
-                # Get social data
-                social = self._get_social_data(lead_id)
-                self.scorer.score_and_save(lead_id, lead, social)
+                self.scorer.score_and_save(lead_id, lead, related["social"].get(lead_id))
                 scored += 1
             except Exception as e:
                 logger.error(f"Scoring failed for lead {lead.get('id')}: {e}")
@@ -280,143 +420,172 @@ class MainOrchestrator:
 
     def _generate_insights_for_top_leads(self) -> int:
         """Generate insights for scored Tier 1-2 leads."""
-        leads = (
-            db.table("outreach_leads")
-            .select("*")
-            .eq("pipeline_status", "scored")
-            .in_("score_tier", ["TIER_1", "TIER_2", "TIER_3"])
-            .limit(50)
-            .execute()
-        )
+        if leases.enabled:
+            leads = self._claim("insights", self.STAGE_LIMITS["insights"])
+        else:
+            leads = (
+                self._leads()
+                .eq("pipeline_status", "scored")
+                .in_("score_tier", self.INSIGHT_TIERS)
+                .limit(self.STAGE_LIMITS["insights"])
+                .execute()
+            ).data
 
-        if not leads.data:
+        self._stage_lead_ids = [lead["id"] for lead in leads or []]
+        if not leads:
             return 0
 
-        count = 0
-        for lead in leads.data:
-            try:
-                lead_id = lead["id"]
-                social = self._get_social_data(lead_id)
-                competitors = self._get_competitors(lead_id)
-                self.insight_gen.generate_and_save(lead_id, lead, social, competitors)
-                count += 1
-                time.sleep(2)  # Rate limit Claude API
-            except Exception as e:
-                logger.error(f"Insight generation failed for lead {lead.get('id')}: {e}")
-
+        related = self._prefetch_related([lead["id"] for lead in leads], competitors=True)
+        count = self._run_llm_stage(self._generate_insights_for_lead, leads, related)
+        logger.info(f"LLM scheduler: {llm_scheduler.stats()}")
         return count
 
+    def _generate_insights_for_lead(self, lead: dict, related: dict) -> bool:
+        try:
+            lead_id = lead["id"]
+            social = related["social"].get(lead_id)
+            competitors = related["competitors"].get(lead_id, [])
+            self.insight_gen.generate_and_save(lead_id, lead, social, competitors)
+            return True
+        except Exception as e:
+            logger.error(f"Insight generation failed for lead {lead.get('id')}: {e}")
+            return False
+
     def _generate_emails_for_top_leads(self) -> int:
         """Generate email sequences for leads with insights and a valid email."""
-        leads = (
-            db.table("outreach_leads")
-            .select("*")
-            .eq("pipeline_status", "insights_generated")
-            .not_.is_("contact_email", "null")
-            .limit(50)
-            .execute()
-        )
-
-        if not leads.data:
-            # Also try owner_email
+        if leases.enabled:
+            leads = self._claim("emails", self.STAGE_LIMITS["emails"])
+        else:
             leads = (
-                db.table("outreach_leads")
-                .select("*")
+                self._leads()
                 .eq("pipeline_status", "insights_generated")
-                .not_.is_("owner_email", "null")
-                .limit(50)
+                .not_.is_("contact_email", "null")
+                .limit(self.STAGE_LIMITS["emails"])
                 .execute()
-            )
-
-        if not leads.data:
+            ).data
+
+            if not leads:
+                # Also try owner_email
+                leads = (
+                    self._leads()
+                    .eq("pipeline_status", "insights_generated")
+                    .not_.is_("owner_email", "null")
+                    .limit(self.STAGE_LIMITS["emails"])
+                    .execute()
+                ).data
+
+        self._stage_lead_ids = [lead["id"] for lead in leads or []]
+        if not leads:
             return 0
 
-        count = 0
-        for lead in leads.data:
-            try:
-                lead_id = lead["id"]
-                social = self._get_social_data(lead_id)
-                insights = self._get_insights(lead_id)
-                competitors = self._get_competitors(lead_id)
-                self.email_gen.generate_and_save(lead_id, lead, social, insights, competitors)
-                count += 1
-                time.sleep(2)  # Rate limit Claude API
-            except Exception as e:
-                logger.error(f"Email generation failed for lead {lead.get('id')}: {e}")
-
+        related = self._prefetch_related(
+            [lead["id"] for lead in leads], competitors=True, insights=True
+        )
+        count = self._run_llm_stage(self._generate_emails_for_lead, leads, related)
+        logger.info(f"LLM scheduler: {llm_scheduler.stats()}")
         return count
 
+    def _generate_emails_for_lead(self, lead: dict, related: dict) -> bool:
+        try:
+            lead_id = lead["id"]
+            social = related["social"].get(lead_id)
+            insights = related["insights"].get(lead_id, [])
+            competitors = related["competitors"].get(lead_id, [])
+            self.email_gen.generate_and_save(lead_id, lead, social, insights, competitors)
+            return True
+        except Exception as e:
+            logger.error(f"Email generation failed for lead {lead.get('id')}: {e}")
+            return False
+
+    def _run_llm_stage(self, fn, leads: list[dict], related: dict) -> int:
+        """Fan LLM-bound work out; the shared scheduler enforces RPM/TPM limits."""
+        workers = max(1, settings.llm_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as pool:
+            return sum(1 for ok in pool.map(lambda lead: fn(lead, related), leads) if ok)
+
     def _upload_to_instantly(self) -> int:
         """Upload leads with generated emails to Instantly."""
-        leads = (
-            db.table("outreach_leads")
-            .select("*")
-            .eq("pipeline_status", "emails_generated")
-            .limit(50)
-            .execute()
-        )
+        if leases.enabled:
+            leads = self._claim("upload", self.STAGE_LIMITS["upload"])
+        else:
+            leads = (
+                self._leads()
+                .eq("pipeline_status", "emails_generated")
+                .limit(self.STAGE_LIMITS["upload"])
+                .execute()
+            ).data
 
-        if not leads.data:
+        self._stage_lead_ids = [lead["id"] for lead in leads or []]
+        if not leads:
             return 0
 
-        campaign_name = (
-            f"GeoSpark — {settings.target_category} — {settings.target_city} — "
-            f"{datetime.now().strftime('%Y-%m-%d')}"
-        )
-        campaign_id = self.instantly.get_or_create_campaign(campaign_name)
+        campaign_id = self._get_campaign_id()
         if not campaign_id:
             logger.error("Failed to get/create Instantly campaign")
             return 0
 
-        result = self.instantly.upload_prospects(campaign_id, leads.data)
+        result = self.instantly.upload_prospects(campaign_id, leads)
         return result.get("uploaded", 0)
 
-    # ── Helpers ──
+    def _get_campaign_id(self) -> str | None:
+        campaign_name = (
+            f"GeoSpark — {settings.target_category} — {settings.target_city} — "
+            f"{datetime.now().strftime('%Y-%m-%d')}"
+        )
+        return self.instantly.get_or_create_campaign(campaign_name)
 
-    def _get_social_data(self, lead_id: str) -> dict | None:
-        try:
-            result = (
-                db.table("prospect_social_profiles")
-                .select("*")
-                .eq("lead_id", lead_id)
-                .eq("platform", "instagram")
-                .limit(1)
-                .execute()
-            )
-            if result.data:
-                profile = result.data[0]
-                raw = profile.get("raw_data", {})
-                profile["posting_patterns"] = raw.get("posting_patterns", {})
-                profile["engagement_details"] = raw.get("engagement_details", {})
-                return profile
-        except Exception:
-            pass
-        return None
-
-    def _get_competitors(self, lead_id: str) -> list[dict]:
-        try:
-            result = (
-                db.table("prospect_competitors")
-                .select("*")
-                .eq("lead_id", lead_id)
-                .execute()
-            )
-            return result.data or []
-        except Exception:
-            return []
+    # ── Helpers ──
 
-    def _get_insights(self, lead_id: str) -> list[dict]:
-        try:
-            result = (
-                db.table("prospect_marketing_insights")
-                .select("*")
-                .eq("lead_id", lead_id)
-                .order("priority_score", desc=True)
-                .execute()
-            )
-            return result.data or []
-        except Exception:
-            return []
+    PREFETCH_CHUNK = 100  # lead IDs per in_() filter — keeps PostgREST URLs short
+
+    def _prefetch_related(
+        self,
+        lead_ids: list[str],
+        competitors: bool = False,
+        insights: bool = False,
+    ) -> dict:
+        """
+        Batch-load related rows for a page of leads with in_() filters.
+        Returns {"social": {lead_id: profile}, "competitors": {lead_id: [...]},
+        "insights": {lead_id: [...]}} so each step does dict lookups instead of
+        one round trip per lead.
+        """
+        related = {"social": {}, "competitors": {}, "insights": {}}
+
+        for row in self._select_in_chunks(
+            "prospect_social_profiles", lead_ids,
+            lambda q: q.eq("platform", "instagram"),
+        ):
+            raw = row.get("raw_data") or {}
+            row["posting_patterns"] = raw.get("posting_patterns", {})
+            row["engagement_details"] = raw.get("engagement_details", {})
+            related["social"].setdefault(row["lead_id"], row)
+
+        if competitors:
+            for row in self._select_in_chunks("prospect_competitors", lead_ids):
+                related["competitors"].setdefault(row["lead_id"], []).append(row)
+
+        if insights:
+            for row in self._select_in_chunks(
+                "prospect_marketing_insights", lead_ids,
+                lambda q: q.order("priority_score", desc=True),
+            ):
+                related["insights"].setdefault(row["lead_id"], []).append(row)
+
+        return related
+
+    def _select_in_chunks(self, table: str, lead_ids: list[str], refine=None) -> list[dict]:
+        rows = []
+        for i in range(0, len(lead_ids), self.PREFETCH_CHUNK):
+            chunk = lead_ids[i:i + self.PREFETCH_CHUNK]
+            try:
+                query = db.table(table).select("*").in_("lead_id", chunk)
+                if refine:
+                    query = refine(query)
+                rows.extend(query.execute().data or [])
+            except Exception as e:
+                logger.warning(f"Prefetch from {table} failed for {len(chunk)} leads: {e}")
+        return rows
 
     # ── Run tracking ──
 
@@ -425,6 +594,7 @@ class MainOrchestrator:
             result = db.table("pipeline_runs").insert({
                 "status": "running",
                 "config_snapshot": {
+                    "market": f"{settings.target_category} in {settings.target_location}",
                     "target_city": settings.target_city,
                     "target_category": settings.target_category,
                     "daily_target": settings.daily_scrape_target,
@@ -450,7 +620,43 @@ class MainOrchestrator:
                 "uploaded_to_instantly": results["uploaded"],
                 "errors": results["errors"],
                 "duration_seconds": duration,
+                "metrics": {
+                    **metrics.summary(),
+                    "llm_scheduler": llm_scheduler.stats(),
+                    "supabase_pool": pool_stats(),
+                    "outscraper_cache": outscraper_cache.summary(),
+                    "instagram_cache": profile_cache.summary(),
+                    "instagram_limiter": instagram_limiter.summary(),
+                    "proxy_pool": proxy_pool.summary(),
+                },
                 "completed_at": datetime.now(timezone.utc).isoformat(),
             }).eq("id", run_id).execute()
         except Exception as e:
             logger.error(f"Failed to update pipeline run: {e}")
+
+    def _log_metrics(self):
+        summary = metrics.summary()
+        logger.info("Run metrics:")
+        for kind in ("stages", "calls"):
+            for name, s in summary[kind].items():
+                logger.info(
+                    f"  {kind[:-1]} {name}: n={s['count']} err={s['errors']} "
+                    f"p50={s['p50_ms']}ms p95={s['p95_ms']}ms max={s['max_ms']}ms bytes={s['bytes']}"
+                )
+        logger.info(f"  supabase pool: {pool_stats()}")
+        logger.info(f"  outscraper cache: {outscraper_cache.summary()}")
+        logger.info(f"  instagram cache: {profile_cache.summary()}")
+        logger.info(f"  instagram limiter: {instagram_limiter.summary()}")
+        pool = proxy_pool.summary()
+        logger.info(f"  proxy pool: {pool['healthy']}/{pool['size']} healthy, {pool['reassigned']} reassigned")
+
+    def _export_metrics(self, run_id: str | None):
+        path = settings.metrics_export_path
+        if not path:
+            return
+        path = path.replace("{run_id}", run_id or "local")
+        try:
+            metrics.export(path, labels={"run_id": run_id or "local", "market": settings.target_location})
+            logger.info(f"Run metrics written to {path}")
+        except Exception as e:
+            logger.error(f"Failed to export run metrics: {e}")
@@ -0,0 +1,144 @@
+"""
+Multi-market runs.
+Runs many target_city × target_category jobs in one invocation on a process pool.
+Remote settings are loaded once and shipped to the workers, and Outscraper,
+Instagram and LLM concurrency plus request budgets are capped globally across
+all market processes. Each market writes its own pipeline_runs row, and its
+leads carry the market key (outreach_leads.market, stamped at ingest) so its
+stages only select their own leads.
+"""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.lead_ingest import normalize_key_part
+from utils.concurrency import install_shared_limits, destination_cap
+
+# Destinations whose concurrency and budget are shared by every market process
+GLOBAL_DESTINATIONS = ("outscraper", "instagram", "llm")
+
+
+def market_label(market: dict) -> str:
+    return f"{market.get('category') or settings.target_category} in {market.get('location') or market.get('city')}"
+
+
+def market_key(location: str, category: str) -> str:
+    """Stable outreach_leads.market value for a location × category job."""
+    return f"{normalize_key_part(location)}|{normalize_key_part(category)}"
+
+
+def apply_market(market: dict):
+    """Point the global settings at one market (location, category, optional target/state)."""
+    location = market.get("location") or market.get("city")
+    if location:
+        settings.target_location = location
+        settings.target_city = location
+    if market.get("state"):
+        settings.target_state = market["state"]
+    if market.get("category"):
+        settings.target_category = market["category"]
+    if market.get("daily_target"):
+        settings.daily_scrape_target = int(market["daily_target"])
+    settings.market = market_key(settings.target_location, settings.target_category)
+
+
+def market_scope() -> dict:
+    """outreach_leads filters that keep a market's stages on its own leads (after apply_market)."""
+    return {"market": settings.market} if settings.market else {}
+
+
+def load_markets(path: str | None = None) -> list[dict]:
+    """
+    Markets from a JSON file, else from the `markets` key in pipeline_settings.
+    Format: [{"location": "Munich, Germany", "category": "Hair Salon", "daily_target": 50}, ...]
+    """
+    if path:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    else:
+        result = db.table("pipeline_settings").select("value").eq("key", "markets").limit(1).execute()
+        if not result.data:
+            return []
+        raw = result.data[0]["value"]
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+
+    return [m for m in (raw or []) if isinstance(m, dict) and (m.get("location") or m.get("city"))]
+
+
+# Settings every market in this worker process starts from (set by _init_worker)
+_worker_settings: dict = {}
+
+
+def _init_worker(snapshot: dict, semaphores: dict, budget, budget_lock, workers: int):
+    _worker_settings.update(
+        snapshot,
+        # Split the provider's rate limits between the market processes
+        claude_requests_per_minute=max(1, snapshot["claude_requests_per_minute"] // workers),
+        claude_tokens_per_minute=max(1000, snapshot["claude_tokens_per_minute"] // workers),
+        # Market processes share outreach_leads, so stage selection must go through leases
+        lead_leases=True,
+    )
+    install_shared_limits(semaphores, budget, budget_lock)
+
+
+def _run_market(market: dict) -> dict:
+    from orchestrator.main_orchestrator import MainOrchestrator
+
+    # Pool processes are reused and apply_market only sets the keys a market has,
+    # so start each market from the snapshot rather than the previous market
+    for key, value in _worker_settings.items():
+        setattr(settings, key, value)
+    results = MainOrchestrator().run_daily_workflow(market=market, reload_settings=False)
+    results["market"] = market_label(market)
+    return results
+
+
+def run_markets(markets: list[dict], workers: int | None = None) -> list[dict]:
+    """Run every market through the full pipeline; returns one results dict per market."""
+    if not markets:
+        logger.info("No markets configured")
+        return []
+
+    settings.load_remote_settings()
+    if not settings.pipeline_enabled:
+        logger.info("Pipeline is DISABLED via dashboard settings. Exiting.")
+        return []
+
+    workers = max(1, min(workers or settings.market_workers, len(markets)))
+    logger.info(f"Multi-market run: {len(markets)} markets on {workers} processes")
+
+    ctx = multiprocessing.get_context("spawn")
+    all_results = []
+    with ctx.Manager() as manager:
+        semaphores = {d: manager.BoundedSemaphore(destination_cap(d)) for d in GLOBAL_DESTINATIONS}
+        budget = manager.dict({d: int(n) for d, n in settings.market_quotas.items()})
+        budget_lock = manager.Lock()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(settings.model_dump(), semaphores, budget, budget_lock, workers),
+        ) as pool:
+            futures = {pool.submit(_run_market, m): m for m in markets}
+            for future in as_completed(futures):
+                label = market_label(futures[future])
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"Market '{label}' failed: {e}", exc_info=True)
+                    results = {"market": label, "errors": [{"step": "market", "error": str(e)}]}
+                all_results.append(results)
+                logger.info(
+                    f"Market '{label}' done — scraped {results.get('scraped', 0)}, "
+                    f"uploaded {results.get('uploaded', 0)}, errors {len(results.get('errors', []))}"
+                )
+
+        if settings.market_quotas:
+            logger.info(f"Remaining global quota: {dict(budget)}")
+
+    return all_results
@@ -0,0 +1,244 @@
+"""
+Streaming stage pipeline.
+Leads flow scrape → enrich → score → insights → emails → upload through bounded
+in-process queues, so later stages start on the first leads instead of waiting
+for the previous step to finish. A full queue blocks its producer (backpressure).
+Each stage takes at most as many leads per run as the batch path does
+(MainOrchestrator.STAGE_LIMITS); leads past the limit keep their status (and
+lose their lease at the end of the run), so the next run picks them up.
+"""
+
+import queue
+import threading
+import time
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.leases import leases
+from utils.metrics import metrics
+from utils.write_buffer import write_buffer
+
+_DONE = object()
+
+
+class StreamingPipeline:
+    def __init__(self, orchestrator):
+        self.orch = orchestrator
+        size = max(1, settings.stream_queue_size)
+        self.enrich_q: queue.Queue = queue.Queue(maxsize=size)
+        self.score_q: queue.Queue = queue.Queue(maxsize=size)
+        self.insight_q: queue.Queue = queue.Queue(maxsize=size)
+        self.email_q: queue.Queue = queue.Queue(maxsize=size)
+        self.upload_q: queue.Queue = queue.Queue(maxsize=size)
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+        self._results: dict = {}
+        self._start = 0.0
+        self._campaign_id: str | None = None
+        self._taken: dict[str, int] = {}  # leads each stage has accepted this run
+
+    def run(self, results: dict) -> dict:
+        self._results = results
+        self._start = time.monotonic()
+        batch = max(1, settings.stream_batch_size)
+        llm_workers = max(1, settings.llm_concurrency)
+
+        stages = [
+            self._stage("enrich", self.enrich_q, self.score_q, self._enrich, settings.enrichment_workers, 1),
+            self._stage("score", self.score_q, self.insight_q, self._score, 1, batch),
+            self._stage("insights", self.insight_q, self.email_q, self._insights, llm_workers, batch),
+            self._stage("emails", self.email_q, self.upload_q, self._emails, llm_workers, batch),
+            self._stage("upload", self.upload_q, None, self._upload, 1, batch),
+        ]
+        for stage in stages:
+            stage.start()
+        leases.hand_off = True
+
+        try:
+            self._enqueue_pending()  # backlog left over from earlier runs
+            results["scraped"] = self.orch._scrape_sources(on_saved=self._enqueue_pending)
+        except Exception as e:
+            logger.error(f"Scraping failed: {e}", exc_info=True)
+            self._error("scraping", e)
+        finally:
+            self.enrich_q.put(_DONE)
+
+        for stage in stages:
+            stage.join()
+        leases.hand_off = False
+
+        if "first_upload_seconds" in results:
+            logger.info(f"Streaming: first upload after {results['first_upload_seconds']}s")
+        return results
+
+    # ── Stage plumbing ──
+
+    def _stage(self, name, inbox, outbox, handler, workers: int, batch_size: int) -> threading.Thread:
+        """One coordinator thread per stage; signals downstream once all its workers drain."""
+        def coordinate():
+            threads = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(name, inbox, outbox, handler, batch_size),
+                    name=f"stream-{name}-{i}",
+                    daemon=True,
+                )
+                for i in range(max(1, workers))
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            if outbox is not None:
+                outbox.put(_DONE)
+            logger.info(f"Streaming stage '{name}' finished")
+
+        return threading.Thread(target=coordinate, name=f"stream-{name}", daemon=True)
+
+    def _worker(self, name, inbox, outbox, handler, batch_size: int):
+        while True:
+            batch, done = self._take(inbox, batch_size)
+            batch = self._within_limit(name, batch)
+            if batch:
+                try:
+                    with metrics.stage(name):
+                        forwarded = handler(batch)
+                        # Next stage compare-and-sets on the new status, so it must be stored first.
+                        # Only this batch's writes: sibling workers own (and report) theirs
+                        rejected = write_buffer.flush([i["id"] if isinstance(i, dict) else i for i in batch])
+                    forwarded = [i for i in forwarded if i not in rejected]
+                except Exception as e:
+                    logger.error(f"Streaming {name} failed for {len(batch)} leads: {e}", exc_info=True)
+                    self._error(name, e)
+                    forwarded = []
+                if outbox is not None:
+                    for item in forwarded:
+                        outbox.put(item)
+            if done:
+                inbox.put(_DONE)  # let sibling workers see it too
+                return
+
+    def _take(self, inbox, batch_size: int) -> tuple[list, bool]:
+        """Block for one item, then drain whatever else is ready (micro-batch)."""
+        item = inbox.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        while len(batch) < batch_size:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _within_limit(self, name: str, batch: list) -> list:
+        """The part of `batch` the stage may still take this run (STAGE_LIMITS)."""
+        limit = self.orch.STAGE_LIMITS.get(name)
+        if limit is None or not batch:
+            return batch
+        with self._lock:
+            taken = self._taken.get(name, 0)
+            accepted = batch[:max(0, limit - taken)]
+            self._taken[name] = taken + len(accepted)
+        if len(accepted) < len(batch) and taken < limit:  # log once, when the limit is first hit
+            logger.info(f"Streaming stage '{name}' reached its limit of {limit} leads — the rest wait for the next run")
+        return accepted
+
+    def _add(self, key: str, n: int):
+        with self._lock:
+            self._results[key] = self._results.get(key, 0) + n
+
+    def _error(self, step: str, e: Exception):
+        with self._lock:
+            self._results["errors"].append({"step": step, "error": str(e)})
+
+    def _fetch_leads(self, lead_ids: list[str]) -> list[dict]:
+        result = db.table("outreach_leads").select("*").in_("id", lead_ids).execute()
+        return result.data or []
+
+    # ── Producer ──
+
+    def _enqueue_pending(self):
+        """Push newly scraped leads that haven't been queued yet, up to the daily target."""
+        remaining = settings.daily_scrape_target - len(self._seen)
+        if remaining <= 0:
+            return
+        if leases.enabled:
+            leads = self.orch._claim("enrich", remaining)
+        else:
+            leads = (
+                self.orch._leads()
+                .eq("enrichment_status", "pending")
+                .eq("pipeline_status", "scraped")
+                .limit(settings.daily_scrape_target)
+                .execute()
+            ).data
+        queued = 0
+        for lead in leads or []:
+            if queued >= remaining:
+                break
+            if lead["id"] in self._seen:
+                continue
+            self._seen.add(lead["id"])
+            self.enrich_q.put(lead)
+            queued += 1
+        if queued:
+            logger.info(f"Streaming: queued {queued} leads for enrichment")
+
+    # ── Stage handlers (take a micro-batch, return lead IDs for the next stage) ──
+
+    def _enrich(self, leads: list[dict]) -> list[str]:
+        done = [lead["id"] for lead in leads if self.orch._enrich_lead(lead)]
+        self._add("enriched", len(done))
+        return done
+
+    def _score(self, lead_ids: list[str]) -> list[str]:
+        leads = self._fetch_leads(lead_ids)
+        related = self.orch._prefetch_related(lead_ids)
+        forward = []
+        for lead in leads:
+            try:
+                result = self.orch.scorer.score_and_save(lead["id"], lead, related["social"].get(lead["id"]))
+                self._add("scored", 1)
+                if result["tier"] in self.orch.INSIGHT_TIERS:
+                    forward.append(lead["id"])
+            except Exception as e:
+                logger.error(f"Scoring failed for lead {lead.get('id')}: {e}")
+        return forward
+
+    def _insights(self, lead_ids: list[str]) -> list[str]:
+        leads = self._fetch_leads(lead_ids)
+        related = self.orch._prefetch_related(lead_ids, competitors=True)
+        forward = []
+        for lead in leads:
+            if self.orch._generate_insights_for_lead(lead, related):
+                self._add("insights_generated", 1)
+                if lead.get("contact_email") or lead.get("owner_email"):
+                    forward.append(lead["id"])
+        return forward
+
+    def _emails(self, lead_ids: list[str]) -> list[str]:
+        leads = self._fetch_leads(lead_ids)
+        related = self.orch._prefetch_related(lead_ids, competitors=True, insights=True)
+        forward = []
+        for lead in leads:
+            if self.orch._generate_emails_for_lead(lead, related):
+                self._add("emails_generated", 1)
+                forward.append(lead["id"])
+        return forward
+
+    def _upload(self, lead_ids: list[str]) -> list[str]:
+        if self._campaign_id is None:
+            self._campaign_id = self.orch._get_campaign_id()
+            if not self._campaign_id:
+                raise RuntimeError("Failed to get/create Instantly campaign")
+
+        result = self.orch.instantly.upload_prospects(self._campaign_id, self._fetch_leads(lead_ids))
+        uploaded = result.get("uploaded", 0)
+        self._add("uploaded", uploaded)
+        if uploaded and "first_upload_seconds" not in self._results:
+            self._results["first_upload_seconds"] = int(time.monotonic() - self._start)
+        return []
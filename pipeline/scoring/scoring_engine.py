@@ -6,6 +6,7 @@
 from config.settings import settings
 from config.database import db
 from utils.logger import logger
+from utils.leases import leases
 
 
 class ScoringEngine:
@@ -270,12 +271,12 @@ class ScoringEngine:
         result = self.calculate_score(lead_id, lead_data, social_data)
 
         try:
-            db.table("outreach_leads").update({
+            leases.advance(lead_id, "enriched", {
                 "geospark_score": result["score"],
                 "score_tier": result["tier"],
                 "score_breakdown": result["breakdown"],
                 "pipeline_status": "scored",
-            }).eq("id", lead_id).execute()
+            })
         except Exception as e:
             logger.error(f"Failed to save score for lead {lead_id}: {e}")
 
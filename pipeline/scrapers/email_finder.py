@@ -10,6 +10,8 @@ import requests
 from bs4 import BeautifulSoup
 from utils.logger import logger
 from utils.helpers import clean_email, extract_domain, retry
+from utils.concurrency import destination_slot
+from utils.metrics import metrics
 
 
 class EmailFinder:
@@ -94,7 +96,8 @@ class EmailFinder:
 
     def _extract_email_from_url(self, url: str, headers: dict) -> str | None:
         try:
-            resp = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
+            with destination_slot("website"), metrics.call("website") as call:
+                resp = call.response(requests.get(url, headers=headers, timeout=10, allow_redirects=True))
             if resp.status_code != 200:
                 return None
 
@@ -14,19 +14,76 @@ Flow:
 4. Tag as "engagement" source with the specific post + comment
 5. Enrich, score (+15 bonus), generate emails referencing the engagement
 6. Upload to Instantly within 24 hours
+
+Commenter profiles (step 3) are loaded concurrently: one request in flight
+per Instagram exit IP, each paced by its own limiter, and prospects are
+streamed out (and saved in batches) as they qualify.
 """
 
 import re
-import time
 import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta, timezone
+from typing import Iterator
 import instaloader
 from config.settings import settings
 from config.database import db
 from utils.logger import logger
-from utils.helpers import extract_instagram_username, clean_email, rate_limit
-
-def _build_engagement_loader() -> instaloader.Instaloader:
+from utils.concurrency import destination_cap, destination_slot, QuotaExceeded
+from utils.helpers import extract_instagram_username, clean_email
+from utils.lead_ingest import ingest_leads, existing_values, lead_dedup_key
+from utils.dedup_index import dedup_index
+from utils.adaptive_limiter import AdaptiveLimiter, instagram_limiter, CoolingDown
+from utils.proxy_pool import proxy_pool, Proxy
+from utils.keyword_matcher import KeywordMatcher
+
+
+class _Stopped(Exception):
+    """A commenter load skipped because the qualification it belonged to has stopped."""
+
+
+class _LimiterRateController(instaloader.RateController):
+    """Paces every Instaloader query through an Instagram limiter (on top of Instaloader's own windows)."""
+
+    def __init__(self, context, target: Proxy | AdaptiveLimiter):
+        super().__init__(context)
+        self.target = target
+        self.limiter = target.limiter if isinstance(target, Proxy) else target
+
+    def wait_before_query(self, query_type: str) -> None:
+        super().wait_before_query(query_type)
+        if not self.limiter.acquire(max_wait=settings.instagram_max_wait_seconds):
+            raise CoolingDown(f"Instagram cooling down for {self.limiter.resume_in():.0f}s")
+
+    def handle_429(self, query_type: str) -> None:
+        self.target.throttled()
+        super().handle_429(query_type)
+
+
+def _instagram_call(target: Proxy | AdaptiveLimiter, fn, *args):
+    """Run one Instaloader call and report the outcome to the proxy (or the direct limiter)."""
+    try:
+        result = fn(*args)
+    except CoolingDown:
+        raise
+    except instaloader.exceptions.ProfileNotExistsException:
+        target.success()
+        raise
+    except Exception as e:
+        if "429" in str(e):
+            target.throttled()
+        else:
+            target.failure(type(e).__name__)
+        raise
+    target.success()
+    return result
+
+
+def _build_engagement_loader(proxy: Proxy | None = None) -> instaloader.Instaloader:
+    """Instaloader on `proxy`, or direct (paced by instagram_limiter) without one."""
+    target = proxy or instagram_limiter
     loader = instaloader.Instaloader(
         download_pictures=False,
         download_videos=False,
@@ -38,10 +95,10 @@ def _build_engagement_loader() -> instaloader.Instaloader:
         quiet=True,
         max_connection_attempts=1,
         fatal_status_codes=[429],
+        rate_controller=lambda context: _LimiterRateController(context, target),
     )
-    proxy = settings.social_proxy
     if proxy:
-        loader.context._session.proxies = {"http": proxy, "https": proxy}
+        loader.context._session.proxies = proxy.proxies
     return loader
 
 # Default target creators — configurable via dashboard pipeline_settings
@@ -76,11 +133,37 @@ MARKETING_KEYWORDS = [
     "visibility", "online presence", "google", "reviews", "brand",
     "consistency", "schedule", "reels", "stories", "algorithm",
 ]
+MARKETING_MATCHER = KeywordMatcher(MARKETING_KEYWORDS)
+
+# Bio words that mark a commenter as a business
+BUSINESS_SIGNALS = ["book", "appointment", "studio", "salon", "shop", "owner", "📍", "📞", "💇", "✂️", "dm to book"]
+
+# Prospects saved per ingest batch while a scan streams them in
+SAVE_BATCH = 10
 
 
 class EngagementScraper:
     def __init__(self):
-        self.loader = _build_engagement_loader()
+        self._use_proxy(proxy_pool.best())
+        # Commenter checks: one Instaloader per exit IP, each used by one thread at a time
+        self._loaders: dict[str | None, tuple[instaloader.Instaloader, threading.Lock]] = {}
+        self._loaders_lock = threading.Lock()
+
+    def _use_proxy(self, proxy: Proxy | None):
+        self.proxy = proxy
+        self.target = proxy or instagram_limiter
+        self.loader = _build_engagement_loader(proxy)
+
+    def _cooling_down(self) -> bool:
+        """True if Instagram is out of reach for longer than we'd wait; moves to a healthy proxy if there is one."""
+        if self.proxy and self.proxy.quarantined_for():
+            best = proxy_pool.best()
+            if best is not self.proxy and not best.quarantined_for():
+                logger.info(f"Engagement scan: switching from proxy {self.proxy.label} to {best.label}")
+                self._use_proxy(best)
+                return False
+            return self.proxy.quarantined_for() > settings.instagram_max_wait_seconds
+        return instagram_limiter.resume_in() > settings.instagram_max_wait_seconds
 
     def run_engagement_scan(
         self,
@@ -96,60 +179,60 @@ class EngagementScraper:
         4. Filter for business accounts
         5. Return prospects tagged with engagement data
         """
+        prospects = list(self.stream_engagement_prospects(category, city, max_prospects))
+        logger.info(f"Engagement scan complete: {len(prospects)} prospects found")
+        return prospects
+
+    def stream_engagement_prospects(
+        self,
+        category: str | None = None,
+        city: str | None = None,
+        max_prospects: int = 30,
+    ) -> Iterator[dict]:
+        """run_engagement_scan, yielding each new prospect as soon as its commenter qualifies."""
         category = category or settings.target_category
         city = city or settings.target_city
 
         creators = self._get_target_creators(category)
         if not creators:
             logger.info("No target creators configured for engagement scraping")
-            return []
+            return
 
         logger.info(f"Engagement scan: checking {len(creators)} creators for {category}")
 
-        all_prospects = []
+        found = 0
+        checked: set[str] = set()  # commenters already looked at in this scan
 
-        ig_failures = 0
         for creator_username in creators:
+            if self._cooling_down():
+                logger.warning("Instagram cooling down — ending engagement scan early")
+                break
             try:
                 posts = self._find_marketing_posts(creator_username)
                 if not posts:
-                    ig_failures += 1
-                    if ig_failures >= 2:
-                        logger.warning("Instagram rate-limited — aborting engagement scan")
-                        break
                     continue
 
-                ig_failures = 0
                 for post_data in posts[:2]:
                     commenters = self._scrape_commenters(post_data)
-                    business_commenters = self._filter_business_accounts(commenters, category, city)
-
-                    for commenter in business_commenters:
+                    quota = min(settings.engagement_business_per_post, max_prospects - found)
+                    for commenter in self._filter_business_accounts(commenters, category, city, quota, checked):
                         prospect = self._build_prospect(
                             commenter, creator_username, post_data, category, city
                         )
-                        if prospect:
-                            all_prospects.append(prospect)
+                        if prospect and dedup_index.filter_new([prospect]):
+                            found += 1
+                            yield prospect
 
-                    if len(all_prospects) >= max_prospects:
+                    if found >= max_prospects:
                         break
 
-                time.sleep(10)
-
             except Exception as e:
                 logger.warning(f"Engagement scan failed for @{creator_username}: {e}")
-                ig_failures += 1
-                if ig_failures >= 2:
-                    logger.warning("Instagram rate-limited — aborting engagement scan")
-                    break
                 continue
 
-            if len(all_prospects) >= max_prospects:
+            if found >= max_prospects:
                 break
 
-        logger.info(f"Engagement scan complete: {len(all_prospects)} prospects found")
-        return all_prospects[:max_prospects]
-
     def _get_target_creators(self, category: str) -> list[str]:
         """Get target creators from dashboard settings or defaults."""
         try:
@@ -174,13 +257,12 @@ class EngagementScraper:
         creators.extend(DEFAULT_TARGET_CREATORS.get("default", []))
         return list(set(creators))
 
-    @rate_limit(seconds=30)
     def _find_marketing_posts(self, username: str, max_posts: int = 20) -> list[dict]:
         """Find recent high-engagement posts about marketing/growth."""
         logger.info(f"Scanning @{username} for marketing posts")
 
         try:
-            profile = instaloader.Profile.from_username(self.loader.context, username)
+            profile = _instagram_call(self.target, instaloader.Profile.from_username, self.loader.context, username)
         except Exception as e:
             logger.warning(f"Could not load @{username}: {e}")
             return []
@@ -200,7 +282,7 @@ class EngagementScraper:
                     break
 
                 caption = (post.caption or "").lower()
-                is_marketing = sum(1 for kw in MARKETING_KEYWORDS if kw in caption) >= 2
+                is_marketing = len(MARKETING_MATCHER.keywords(caption)) >= 2
 
                 # High engagement threshold: 300+ comments or 5K+ likes
                 high_engagement = post.comments >= 300 or post.likes >= 5000
@@ -217,16 +299,16 @@ class EngagementScraper:
                         "post_obj": post,
                     })
 
-                if i % 5 == 4:
-                    time.sleep(2)
-
         except Exception as e:
             logger.warning(f"Error scanning posts from @{username}: {e}")
+            if "429" in str(e):
+                self.target.throttled()
+        else:
+            self.target.success()
 
         logger.info(f"@{username}: found {len(marketing_posts)} marketing posts with high engagement")
         return marketing_posts
 
-    @rate_limit(seconds=30)
     def _scrape_commenters(self, post_data: dict, max_comments: int = 100) -> list[dict]:
         """Scrape commenters from a high-engagement post."""
         post = post_data.get("post_obj")
@@ -247,78 +329,146 @@ class EngagementScraper:
                     "comment_date": comment.created_at_utc.isoformat() if comment.created_at_utc else None,
                 })
 
-                if i % 20 == 19:
-                    time.sleep(3)
-
         except Exception as e:
             logger.warning(f"Error scraping comments: {e}")
+            if "429" in str(e):
+                self.target.throttled()
+        else:
+            self.target.success()
 
         logger.info(f"Scraped {len(commenters)} commenters")
         return commenters
 
-    @rate_limit(seconds=settings.instagram_delay_seconds)
     def _filter_business_accounts(
-        self, commenters: list[dict], category: str, city: str
-    ) -> list[dict]:
+        self,
+        commenters: list[dict],
+        category: str,
+        city: str,
+        quota: int | None = None,
+        checked: set[str] | None = None,
+    ) -> Iterator[dict]:
         """
         Filter commenters to find business accounts in the target category/city.
-        Checks profile bios for business signals.
+        Checks profile bios for business signals. Profiles load concurrently
+        (destination_cap("instagram") workers: one per proxy), and each business
+        is yielded as soon as it's found; stops once `quota` are found, and loads
+        still waiting for a slot then skip their request.
+        `checked` carries usernames whose profile was requested, across posts.
         """
+        quota = quota if quota is not None else settings.engagement_business_per_post
+        if quota <= 0:
+            return
         city_name = city.split(",")[0].strip().lower()
         state_name = (city.split(",")[1].strip().lower() if "," in city else settings.target_state.lower())
-
         category_keywords = self._get_category_keywords(category)
-        business_commenters = []
+        checked = checked if checked is not None else set()
 
+        queue: deque[dict] = deque()
+        queued: set[str] = set()
         for commenter in commenters:
             username = commenter.get("username", "")
-            if not username:
+            # Skip obvious non-businesses, and anyone already checked
+            if not username or username.startswith("__") or len(username) < 3 or username in checked or username in queued:
                 continue
-
-            # Skip obvious non-businesses
-            if username.startswith("__") or len(username) < 3:
-                continue
-
-            try:
-                profile = instaloader.Profile.from_username(self.loader.context, username)
-                time.sleep(3)
-            except Exception:
+            queued.add(username)
+            # Already a lead — skip the profile request
+            if dedup_index.seen({"instagram_url": f"https://instagram.com/{username}"}):
                 continue
+            queue.append(commenter)
+
+        workers = destination_cap("instagram")
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qualify")
+        pending: dict = {}
+        retried: set[str] = set()
+        stop = threading.Event()
+        found = 0
+        try:
+            while queue or pending:
+                # A short window of requests ahead, so an early stop wastes little budget
+                while queue and len(pending) < 2 * workers:
+                    commenter = queue.popleft()
+                    pending[pool.submit(self._load_commenter, commenter["username"], stop)] = commenter
+                    checked.add(commenter["username"])
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    commenter = pending.pop(future)
+                    username = commenter["username"]
+                    try:
+                        profile = future.result()
+                    except _Stopped:
+                        checked.discard(username)
+                        continue
+                    except CoolingDown:
+                        if self._cooling_down():
+                            logger.warning("Instagram cooling down — stopping commenter checks")
+                            queue.clear()
+                            stop.set()
+                        elif username not in retried:
+                            # Its proxy is cooling down; another healthy one takes it
+                            retried.add(username)
+                            queue.append(commenter)
+                        continue
+                    except QuotaExceeded as e:
+                        logger.warning(f"{e} — stopping commenter checks")
+                        queue.clear()
+                        stop.set()
+                        continue
+                    except Exception:
+                        continue
 
+                    if not profile:
+                        continue
+                    bio = (profile["bio"] or "").lower()
+                    has_category_signal = any(kw in bio for kw in category_keywords)
+                    has_location_signal = city_name in bio or state_name in bio
+                    has_business_signal = any(signal in bio for signal in BUSINESS_SIGNALS)
+
+                    if (profile["is_business"] or has_business_signal) and (has_category_signal or has_location_signal):
+                        commenter["profile"] = profile
+                        found += 1
+                        logger.info(f"  Found business: @{username} ({profile['full_name']})")
+                        yield commenter
+                        if found >= quota:
+                            return
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            # Abandoned loads skip their request (or were cancelled): not checked
+            checked.difference_update(c["username"] for c in pending.values())
+
+    def _load_commenter(self, username: str, stop: threading.Event | None = None) -> dict | None:
+        """
+        A commenter's public profile (None if private), on the username's proxy.
+        Raises _Stopped instead of requesting it once `stop` is set.
+        """
+        proxy = proxy_pool.assign(username)
+        loader, slot = self._loader_for(proxy)
+        # Proxy slot first: only threads with their exit IP free take a global Instagram slot
+        with slot, destination_slot("instagram"):
+            if stop is not None and stop.is_set():
+                raise _Stopped(username)
+            profile = _instagram_call(proxy or instagram_limiter, instaloader.Profile.from_username,
+                                      loader.context, username)
             if profile.is_private:
-                continue
-
-            bio = (profile.biography or "").lower()
-            is_business = profile.is_business_account
-
-            # Check if bio matches our category and location
-            has_category_signal = any(kw in bio for kw in category_keywords)
-            has_location_signal = city_name in bio or state_name in bio
-
-            # Business signals in bio
-            has_business_signal = any(
-                signal in bio
-                for signal in ["book", "appointment", "studio", "salon", "shop", "owner", "📍", "📞", "💇", "✂️", "dm to book"]
-            )
-
-            if (is_business or has_business_signal) and (has_category_signal or has_location_signal):
-                commenter["profile"] = {
-                    "username": username,
-                    "bio": profile.biography,
-                    "followers": profile.followers,
-                    "following": profile.followees,
-                    "posts_count": profile.mediacount,
-                    "is_business": is_business,
-                    "full_name": profile.full_name,
-                    "external_url": profile.external_url,
-                }
-                business_commenters.append(commenter)
-                logger.info(f"  Found business: @{username} ({profile.full_name})")
-
-                if len(business_commenters) >= 10:
-                    break
-
-        return business_commenters
+                return None
+            return {
+                "username": username,
+                "bio": profile.biography,
+                "followers": profile.followers,
+                "following": profile.followees,
+                "posts_count": profile.mediacount,
+                "is_business": profile.is_business_account,
+                "full_name": profile.full_name,
+                "external_url": profile.external_url,
+            }
+
+    def _loader_for(self, proxy: Proxy | None) -> tuple[instaloader.Instaloader, threading.Lock]:
+        key = proxy.url if proxy else None
+        with self._loaders_lock:
+            entry = self._loaders.get(key)
+            if entry is None:
+                entry = self._loaders[key] = (_build_engagement_loader(proxy), proxy.slot if proxy else threading.Lock())
+            return entry
 
     def _get_category_keywords(self, category: str) -> list[str]:
         mapping = {
@@ -386,85 +536,70 @@ class EngagementScraper:
     # ── Save to Supabase ──
 
     def save_to_supabase(self, prospects: list[dict]) -> dict:
-        saved = 0
-        skipped = 0
-        errors = 0
-
+        # Dedup by Instagram URL first (more reliable for engagement sources),
+        # then by normalized business name + city inside the bulk upsert
+        seen_urls = existing_values("instagram_url", [biz.get("instagram_url") for biz in prospects])
+        fresh = []
         for biz in prospects:
+            ig_url = biz.get("instagram_url")
+            if ig_url in seen_urls:
+                continue
+            if ig_url:
+                seen_urls.add(ig_url)
+            fresh.append(biz)
+        url_skipped = len(prospects) - len(fresh)
+
+        social_by_key = {}
+        rows = []
+        for biz in fresh:
+            social_data = biz.pop("_social_data", None)
+            if social_data:
+                social_by_key[lead_dedup_key(biz.get("business_name"), biz.get("city"))] = (social_data, biz)
+            rows.append({
+                "business_name": biz.get("business_name"),
+                "industry": biz.get("category"),
+                "category": biz.get("category"),
+                "website": biz.get("website"),
+                "contact_email": biz.get("contact_email"),
+                "instagram_url": biz.get("instagram_url"),
+                "city": biz.get("city"),
+                "state": biz.get("state"),
+                "source": "engagement",
+                "prospect_source": "engagement",
+                "prospect_source_detail": biz.get("prospect_source_detail"),
+                "source_details": biz.get("source_details"),
+                "status": "new",
+                "pipeline_status": "scraped",
+                "enrichment_status": "pending",
+            })
+
+        result = ingest_leads(rows, "Engagement")
+
+        # Pre-save basic social profile data (we already have it)
+        profiles = []
+        for lead in result["inserted"]:
+            social_data, biz = social_by_key.get(lead.get("dedup_key"), (None, None))
+            if social_data:
+                profiles.append({
+                    "lead_id": lead["id"],
+                    "platform": "instagram",
+                    "username": social_data["username"],
+                    "profile_url": biz.get("instagram_url"),
+                    "followers": social_data.get("followers"),
+                    "following": social_data.get("following"),
+                    "posts_count": social_data.get("posts_count"),
+                    "bio": social_data.get("bio"),
+                    "is_business_account": social_data.get("is_business_account"),
+                })
+        if profiles:
             try:
-                # Dedup by Instagram URL (more reliable for engagement sources)
-                ig_url = biz.get("instagram_url", "")
-                if ig_url:
-                    existing = (
-                        db.table("outreach_leads")
-                        .select("id")
-                        .eq("instagram_url", ig_url)
-                        .execute()
-                    )
-                    if existing.data:
-                        skipped += 1
-                        continue
-
-                # Also dedup by business name + city
-                existing = (
-                    db.table("outreach_leads")
-                    .select("id")
-                    .eq("business_name", biz["business_name"])
-                    .eq("city", biz.get("city", ""))
-                    .execute()
-                )
-                if existing.data:
-                    skipped += 1
-                    continue
-
-                social_data = biz.pop("_social_data", None)
-
-                row = {
-                    "business_name": biz["business_name"],
-                    "industry": biz.get("category"),
-                    "category": biz.get("category"),
-                    "website": biz.get("website"),
-                    "contact_email": biz.get("contact_email"),
-                    "instagram_url": biz.get("instagram_url"),
-                    "city": biz.get("city"),
-                    "state": biz.get("state"),
-                    "source": "engagement",
-                    "prospect_source": "engagement",
-                    "prospect_source_detail": biz.get("prospect_source_detail"),
-                    "source_details": biz.get("source_details"),
-                    "status": "new",
-                    "pipeline_status": "scraped",
-                    "enrichment_status": "pending",
-                }
-
-                result = db.table("outreach_leads").insert(row).execute()
-                lead_id = result.data[0]["id"] if result.data else None
-
-                # Pre-save basic social profile data (we already have it)
-                if lead_id and social_data:
-                    try:
-                        db.table("prospect_social_profiles").upsert({
-                            "lead_id": lead_id,
-                            "platform": "instagram",
-                            "username": social_data["username"],
-                            "profile_url": biz.get("instagram_url"),
-                            "followers": social_data.get("followers"),
-                            "following": social_data.get("following"),
-                            "posts_count": social_data.get("posts_count"),
-                            "bio": social_data.get("bio"),
-                            "is_business_account": social_data.get("is_business_account"),
-                        }, on_conflict="lead_id,platform").execute()
-                    except Exception:
-                        pass
-
-                saved += 1
-
+                db.table("prospect_social_profiles").upsert(profiles, on_conflict="lead_id,platform").execute()
             except Exception as e:
-                logger.error(f"Failed to save engagement prospect {biz.get('business_name')}: {e}")
-                errors += 1
+                logger.warning(f"Engagement social profile pre-save failed: {e}")
 
-        logger.info(f"Engagement save: {saved} saved, {skipped} skipped, {errors} errors")
-        return {"saved": saved, "skipped": skipped, "errors": errors}
+        skipped = result["skipped"] + url_skipped
+        logger.info(f"Engagement save: {result['saved']} saved, {skipped} skipped, {result['errors']} errors")
+        return {"saved": result["saved"], "skipped": skipped, "errors": result["errors"]}
 
     def scrape_and_save(
         self,
@@ -472,9 +607,21 @@ class EngagementScraper:
         city: str | None = None,
         max_prospects: int = 30,
     ) -> dict:
-        prospects = self.run_engagement_scan(category, city, max_prospects)
-        if not prospects:
-            return {"scraped": 0, "saved": 0, "skipped": 0, "errors": 0}
+        totals = {"scraped": 0, "saved": 0, "skipped": 0, "errors": 0}
+        batch: list[dict] = []
+        # Saved as they stream in, so a long (rate-limited) scan doesn't hold back its leads
+        for prospect in self.stream_engagement_prospects(category, city, max_prospects):
+            batch.append(prospect)
+            if len(batch) >= SAVE_BATCH:
+                self._save_batch(batch, totals)
+                batch = []
+        if batch:
+            self._save_batch(batch, totals)
+        logger.info(f"Engagement scan complete: {totals['scraped']} prospects found")
+        return totals
+
+    def _save_batch(self, prospects: list[dict], totals: dict):
         result = self.save_to_supabase(prospects)
-        result["scraped"] = len(prospects)
-        return result
+        totals["scraped"] += len(prospects)
+        for key in ("saved", "skipped", "errors"):
+            totals[key] += result[key]
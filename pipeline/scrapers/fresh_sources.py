@@ -13,9 +13,11 @@ import time
 import requests
 from bs4 import BeautifulSoup
 from config.settings import settings
-from config.database import db
 from utils.logger import logger
 from utils.helpers import clean_email, clean_phone, retry
+from utils.lead_ingest import ingest_leads
+from utils.dedup_index import dedup_index
+from utils.metrics import metrics
 
 
 HEADERS = {
@@ -105,7 +107,8 @@ class FreshSourcesScraper:
         url = f"https://www.yelp.de/search?find_desc={requests.utils.quote(search_term)}&find_loc={requests.utils.quote(location)}"
         logger.info(f"Scraping Yelp: '{search_term}' in {location}")
 
-        resp = requests.get(url, headers=HEADERS, timeout=15, allow_redirects=True)
+        with metrics.call("yelp") as call:
+            resp = call.response(requests.get(url, headers=HEADERS, timeout=15, allow_redirects=True))
         if resp.status_code != 200:
             logger.warning(f"Yelp returned {resp.status_code} for '{search_term}'")
             return []
@@ -137,57 +140,39 @@ class FreshSourcesScraper:
                 "prospect_source_detail": f"yelp:{search_term}",
             })
 
-        logger.info(f"Yelp '{search_term}': {len(prospects)} businesses found")
-        return prospects
+        fresh = dedup_index.filter_new(prospects)
+        logger.info(f"Yelp '{search_term}': {len(prospects)} businesses found, {len(fresh)} new")
+        return fresh
 
     # ── Save to Supabase ──
 
     def save_to_supabase(self, prospects: list[dict]) -> dict:
-        saved = 0
-        skipped = 0
-        errors = 0
-
-        for biz in prospects:
-            try:
-                existing = (
-                    db.table("outreach_leads")
-                    .select("id")
-                    .eq("business_name", biz["business_name"])
-                    .eq("city", biz.get("city", ""))
-                    .execute()
-                )
-
-                if existing.data:
-                    skipped += 1
-                    continue
-
-                row = {
-                    "business_name": biz["business_name"],
-                    "industry": biz.get("category"),
-                    "category": biz.get("category"),
-                    "website": biz.get("website"),
-                    "contact_phone": biz.get("contact_phone"),
-                    "address": biz.get("address"),
-                    "city": biz.get("city"),
-                    "state": biz.get("state"),
-                    "yelp_url": biz.get("yelp_url"),
-                    "source": biz.get("source", "fresh_source"),
-                    "prospect_source": "fresh_source",
-                    "prospect_source_detail": biz.get("prospect_source_detail"),
-                    "status": "new",
-                    "pipeline_status": "scraped",
-                    "enrichment_status": "pending",
-                }
-
-                db.table("outreach_leads").insert(row).execute()
-                saved += 1
-
-            except Exception as e:
-                logger.error(f"Failed to save fresh source {biz.get('business_name')}: {e}")
-                errors += 1
-
-        logger.info(f"Fresh sources save: {saved} saved, {skipped} skipped, {errors} errors")
-        return {"saved": saved, "skipped": skipped, "errors": errors}
+        rows = [
+            {
+                "business_name": biz.get("business_name"),
+                "industry": biz.get("category"),
+                "category": biz.get("category"),
+                "website": biz.get("website"),
+                "contact_phone": biz.get("contact_phone"),
+                "address": biz.get("address"),
+                "city": biz.get("city"),
+                "state": biz.get("state"),
+                "yelp_url": biz.get("yelp_url"),
+                "source": biz.get("source", "fresh_source"),
+                "prospect_source": "fresh_source",
+                "prospect_source_detail": biz.get("prospect_source_detail"),
+                "status": "new",
+                "pipeline_status": "scraped",
+                "enrichment_status": "pending",
+            }
+            for biz in prospects
+        ]
+
+        result = ingest_leads(rows, "Fresh sources")
+        logger.info(
+            f"Fresh sources save: {result['saved']} saved, {result['skipped']} skipped, {result['errors']} errors"
+        )
+        return {k: result[k] for k in ("saved", "skipped", "errors")}
 
     def scrape_and_save(
         self,
@@ -1,16 +1,24 @@
 """
 Instagram scraper using curl_cffi (browser TLS fingerprint).
 Fetches profile + recent posts via Instagram's web API in a single request.
-Requires SOCIAL_PROXY in .env pointing to a SOCKS5 proxy through a VPN.
+SOCIAL_PROXY (or several in SOCIAL_PROXIES) in .env points to SOCKS5/HTTP proxies;
+requests are spread over them by utils/proxy_pool.py. Without one, requests go out
+directly, paced by instagram_limiter (utils/adaptive_limiter.py).
 """
 
+import threading
 import time
 from datetime import datetime, timedelta, timezone
 from curl_cffi import requests as cffi_requests
 from config.settings import settings
 from config.database import db
 from utils.logger import logger
-from utils.helpers import rate_limit
+from utils.adaptive_limiter import AdaptiveLimiter, instagram_limiter
+from utils.concurrency import destination_slot, QuotaExceeded
+from utils.metrics import metrics
+from utils.profile_cache import profile_cache
+from utils.proxy_pool import proxy_pool, Proxy
+from utils.keyword_matcher import KeywordMatcher
 
 IG_API = "https://i.instagram.com/api/v1/users/web_profile_info/"
 IG_HEADERS = {
@@ -18,60 +26,100 @@ IG_HEADERS = {
     "X-IG-App-ID": "567067343352427",
 }
 
+# Caption classes, checked in this order (first match wins)
+CONTENT_MATCHER = KeywordMatcher({
+    "before_after": ["before and after", "before/after", "transformation", "results", "glow up"],
+    "testimonial": ["review", "testimonial", "client", "customer", "thank you", "amazing experience"],
+    "behind_the_scenes": ["behind the scenes", "bts", "day in the life", "team", "process", "making of"],
+    "educational": ["tip", "how to", "guide", "learn", "did you know", "tutorial", "steps"],
+    "promotional": ["book now", "appointment", "sale", "discount", "offer", "deal", "% off", "link in bio", "shop", "buy"],
+})
+
+TOOL_MATCHER = KeywordMatcher({
+    "linktree": ["linktr.ee", "linktree"], "canva": ["canva.com", "made with canva"],
+    "milkshake": ["milkshake.app"], "later": ["later.com", "linkin.bio"],
+    "planoly": ["planoly"], "vagaro": ["vagaro"], "mindbody": ["mindbody"],
+    "square": ["square.site", "squareup"], "schedulicity": ["schedulicity"],
+    "fresha": ["fresha"], "booksy": ["booksy"], "glossgenius": ["glossgenius"],
+})
+
+
+# Direct connections share one exit IP: one request in flight, like a proxy's slot
+_DIRECT_SLOT = threading.Lock()
+
 
 class InstagramScraper:
     def __init__(self):
-        proxy = settings.social_proxy
-        self._proxies = {"http": proxy, "https": proxy} if proxy else None
         self._available = True
-        self._consecutive_failures = 0
-        if not proxy:
-            logger.warning("No SOCIAL_PROXY — Instagram scraping disabled")
-            self._available = False
+        if not len(proxy_pool):
+            logger.warning("No SOCIAL_PROXY — Instagram requests go out directly")
+
+    def scrape_profile(self, username: str, fresh_hours: float | None = None) -> dict | None:
+        """Profile + recent posts, from the shared profile cache when it's fresh enough."""
+        username = username.strip().lower().lstrip("@")
+        return profile_cache.get(username, self._fetch_profile, fresh_hours)
 
-    def scrape_profile(self, username: str) -> dict | None:
+    def _fetch_profile(self, username: str) -> dict | None:
         if not self._available:
             return None
-        return self._scrape_profile_inner(username)
+        proxy = proxy_pool.assign(username)
+        limiter = proxy.limiter if proxy else instagram_limiter
+        # During a long cooldown skip this profile instead of stalling the worker
+        if not limiter.acquire(max_wait=settings.instagram_max_wait_seconds):
+            if proxy:
+                logger.info(f"Proxy {proxy.label} cooling down ({proxy.quarantined_for():.0f}s left) — skipping @{username}")
+            else:
+                logger.info(f"Instagram cooling down ({limiter.resume_in():.0f}s left) — skipping @{username}")
+            return None
+        try:
+            # One request in flight per exit IP
+            with destination_slot("instagram"), (proxy.slot if proxy else _DIRECT_SLOT):
+                return self._scrape_profile_inner(username, proxy)
+        except QuotaExceeded as e:
+            logger.warning(f"{e} — disabling Instagram for this run")
+            self._available = False
+            return None
 
-    @rate_limit(seconds=10)
-    def _scrape_profile_inner(self, username: str) -> dict | None:
+    def _scrape_profile_inner(self, username: str, proxy: Proxy | None) -> dict | None:
+        """One web_profile_info request via `proxy` (direct without one); the outcome feeds its limiter."""
         username = username.strip().lower().lstrip("@")
-        logger.info(f"Scraping Instagram: @{username}")
+        target = proxy or instagram_limiter
+        via = proxy.label if proxy else "direct"
+        logger.info(f"Scraping Instagram: @{username} (via {via})")
 
+        started = time.monotonic()
         try:
-            resp = cffi_requests.get(
-                f"{IG_API}?username={username}",
-                headers=IG_HEADERS,
-                proxies=self._proxies,
-                impersonate="chrome",
-                timeout=20,
-            )
+            with metrics.call("instagram") as call:
+                resp = call.response(cffi_requests.get(
+                    f"{IG_API}?username={username}",
+                    headers=IG_HEADERS,
+                    proxies=proxy.proxies if proxy else None,
+                    impersonate="chrome",
+                    timeout=20,
+                ))
         except Exception as e:
-            logger.error(f"Instagram request failed for @{username}: {e}")
-            self._consecutive_failures += 1
-            if self._consecutive_failures >= 3:
-                logger.warning("Instagram: 3 consecutive failures — disabling for this run")
-                self._available = False
+            logger.error(f"Instagram request failed for @{username} via {via}: {e}")
+            target.failure(type(e).__name__)
             return None
+        latency = time.monotonic() - started
 
         if resp.status_code == 404:
             logger.warning(f"Instagram profile @{username} does not exist")
+            self._succeeded(target, latency)
+            profile_cache.put_missing(username)
             return None
 
         if resp.status_code == 429:
-            logger.warning("Instagram rate-limited — disabling for this run")
-            self._available = False
+            retry_after = resp.headers.get("retry-after")
+            target.throttled(float(retry_after) if retry_after and retry_after.isdigit() else None)
             return None
 
         if resp.status_code != 200:
-            logger.warning(f"Instagram returned {resp.status_code} for @{username}")
-            self._consecutive_failures += 1
-            if self._consecutive_failures >= 3:
-                self._available = False
+            logger.warning(f"Instagram returned {resp.status_code} for @{username} via {via}")
+            target.failure(f"HTTP {resp.status_code}")
             return None
 
-        self._consecutive_failures = 0
+        self._succeeded(target, latency)
 
         try:
             data = resp.json()
@@ -79,11 +127,21 @@ class InstagramScraper:
             if not user:
                 logger.warning(f"No user data in response for @{username}")
                 return None
-            return self._parse_profile(username, user)
+            profile = self._parse_profile(username, user)
+            profile["scraped_at"] = datetime.now(timezone.utc).isoformat()
+            return profile
         except Exception as e:
             logger.error(f"Failed to parse Instagram data for @{username}: {e}")
             return None
 
+    @staticmethod
+    def _succeeded(target: Proxy | AdaptiveLimiter, latency: float):
+        """A proxy also tracks latency for its health score; the direct limiter only paces."""
+        if isinstance(target, Proxy):
+            target.success(latency)
+        else:
+            target.success()
+
     def _parse_profile(self, username: str, user: dict) -> dict:
         followers = user.get("edge_followed_by", {}).get("count", 0)
         following = user.get("edge_follow", {}).get("count", 0)
@@ -168,7 +226,8 @@ class InstagramScraper:
 
     # ── Analysis methods (unchanged) ──
 
-    def _calculate_engagement(self, posts: list[dict], followers: int) -> dict:
+    @staticmethod
+    def _calculate_engagement(posts: list[dict], followers: int) -> dict:
         if not posts or followers == 0:
             return {"avg_engagement_rate": 0, "avg_likes": 0, "avg_comments": 0}
 
@@ -201,11 +260,12 @@ class InstagramScraper:
             "worst_engagement": round(type_averages.get(worst_type, 0), 3) if worst_type else 0,
         }
 
-    def _analyze_posting_patterns(self, posts: list[dict]) -> dict:
+    @staticmethod
+    def _analyze_posting_patterns(posts: list[dict], now: datetime | None = None) -> dict:
         if not posts:
             return {"posts_last_30_days": 0, "posts_per_month": 0, "max_gap_days": None}
 
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         thirty_days_ago = now - timedelta(days=30)
 
         dates = []
@@ -250,43 +310,16 @@ class InstagramScraper:
             "promotional": 0, "educational": 0, "behind_the_scenes": 0,
             "before_after": 0, "testimonial": 0, "personal": 0, "other": 0,
         }
-        promo_kw = ["book now", "appointment", "sale", "discount", "offer", "deal", "% off", "link in bio", "shop", "buy"]
-        edu_kw = ["tip", "how to", "guide", "learn", "did you know", "tutorial", "steps"]
-        bts_kw = ["behind the scenes", "bts", "day in the life", "team", "process", "making of"]
-        ba_kw = ["before and after", "before/after", "transformation", "results", "glow up"]
-        test_kw = ["review", "testimonial", "client", "customer", "thank you", "amazing experience"]
-
         for p in posts:
-            caption = (p.get("caption") or "").lower()
-            if any(kw in caption for kw in ba_kw):
-                categories["before_after"] += 1
-            elif any(kw in caption for kw in test_kw):
-                categories["testimonial"] += 1
-            elif any(kw in caption for kw in bts_kw):
-                categories["behind_the_scenes"] += 1
-            elif any(kw in caption for kw in edu_kw):
-                categories["educational"] += 1
-            elif any(kw in caption for kw in promo_kw):
-                categories["promotional"] += 1
-            else:
-                categories["other"] += 1
+            categories[CONTENT_MATCHER.top(p.get("caption") or "") or "other"] += 1
 
         total = sum(categories.values()) or 1
         return {k: {"count": v, "pct": round(v / total * 100, 1)} for k, v in categories.items()}
 
     def _detect_tools(self, bio: str, posts: list[dict]) -> list[str]:
-        bio = (bio or "").lower()
-        all_captions = " ".join((p.get("caption") or "") for p in posts).lower()
-        text = bio + " " + all_captions
-
-        tool_patterns = {
-            "linktree": ["linktr.ee", "linktree"], "canva": ["canva.com", "made with canva"],
-            "milkshake": ["milkshake.app"], "later": ["later.com", "linkin.bio"],
-            "planoly": ["planoly"], "vagaro": ["vagaro"], "mindbody": ["mindbody"],
-            "square": ["square.site", "squareup"], "schedulicity": ["schedulicity"],
-            "fresha": ["fresha"], "booksy": ["booksy"], "glossgenius": ["glossgenius"],
-        }
-        return [tool for tool, pats in tool_patterns.items() if any(p in text for p in pats)]
+        text = (bio or "") + " " + " ".join((p.get("caption") or "") for p in posts)
+        found = TOOL_MATCHER.categories(text)
+        return [tool for tool in TOOL_MATCHER.order if tool in found]
 
     # ── Save to Supabase ──
 
@@ -295,6 +328,23 @@ class InstagramScraper:
             return None
 
         try:
+            # Incremental refresh: merge with the posts already stored for this lead's profile
+            stored = None
+            if settings.instagram_incremental_posts and profile_data.get("posts"):
+                stored = self._stored_posts(lead_id, profile_data["username"])
+            merge = self._merge_posts(profile_data["posts"], stored) if stored is not None else None
+            if merge:
+                patterns = self._analyze_posting_patterns(merge["posts"])
+                profile_data = {
+                    **profile_data,
+                    "posts_last_30_days": patterns.get("posts_last_30_days", 0),
+                    "last_post_date": patterns.get("last_post_date"),
+                    "posting_frequency": patterns.get("posts_per_month"),
+                    "posting_patterns": patterns,
+                }
+
+            # When Instagram was asked, not when we saved (the profile may come from the cache)
+            scraped_at = profile_data.get("scraped_at") or datetime.now(timezone.utc).isoformat()
             row = {
                 "lead_id": lead_id,
                 "platform": "instagram",
@@ -315,7 +365,10 @@ class InstagramScraper:
                 "raw_data": {
                     "posting_patterns": profile_data.get("posting_patterns", {}),
                     "engagement_details": profile_data.get("engagement_details", {}),
+                    # Marks a full scrape: the profile cache only serves rows that have it
+                    "profile_scraped_at": scraped_at,
                 },
+                "scraped_at": scraped_at,
             }
 
             result = (
@@ -325,7 +378,9 @@ class InstagramScraper:
             )
             profile_id = result.data[0]["id"] if result.data else None
 
-            if profile_id and profile_data.get("posts"):
+            if profile_id and merge:
+                self._upsert_posts(profile_id, lead_id, merge)
+            elif profile_id and profile_data.get("posts"):
                 self._save_posts(profile_id, lead_id, profile_data["posts"])
 
             return profile_id
@@ -334,8 +389,8 @@ class InstagramScraper:
             logger.error(f"Failed to save Instagram profile for lead {lead_id}: {e}")
             return None
 
-    def _save_posts(self, profile_id: str, lead_id: str, posts: list[dict]):
-        rows = [{
+    def _post_row(self, profile_id: str, lead_id: str, p: dict) -> dict:
+        return {
             "social_profile_id": profile_id,
             "lead_id": lead_id,
             "post_url": p.get("post_url"),
@@ -345,7 +400,10 @@ class InstagramScraper:
             "comments": p.get("comments", 0),
             "views": p.get("video_view_count"),
             "post_type": p.get("post_type", "photo"),
-        } for p in posts[:50]]
+        }
+
+    def _save_posts(self, profile_id: str, lead_id: str, posts: list[dict]):
+        rows = [self._post_row(profile_id, lead_id, p) for p in posts[:settings.instagram_post_history]]
 
         try:
             db.table("prospect_posts").delete().eq("social_profile_id", profile_id).execute()
@@ -353,3 +411,122 @@ class InstagramScraper:
                 db.table("prospect_posts").insert(rows).execute()
         except Exception as e:
             logger.error(f"Failed to save posts for profile {profile_id}: {e}")
+
+    # ── Incremental post refresh ──
+
+    def _stored_posts(self, lead_id: str, username: str) -> list[dict] | None:
+        """
+        Posts stored for the lead's Instagram profile. None when there is nothing
+        to merge with (no profile yet, another account, or the read failed), so
+        the posts are replaced outright.
+        """
+        try:
+            profiles = (
+                db.table("prospect_social_profiles")
+                .select("id, username")
+                .eq("lead_id", lead_id)
+                .eq("platform", "instagram")
+                .limit(1)
+                .execute()
+            ).data
+            if not profiles or profiles[0].get("username") != username:
+                return None
+            return (
+                db.table("prospect_posts")
+                .select("id, post_url, post_date, caption, likes, comments, views, post_type")
+                .eq("social_profile_id", profiles[0]["id"])
+                .execute()
+            ).data or []
+        except Exception as e:
+            logger.warning(f"Reading stored posts for @{username} failed (replacing them instead): {e}")
+            return None
+
+    def _merge_posts(self, fetched: list[dict], stored: list[dict], now: datetime | None = None) -> dict | None:
+        """
+        Fetched posts merged into the stored ones, by post_url:
+        - posts not stored yet are written, unless they are older than the watermark
+          (the newest stored post) and outside instagram_post_refresh_days: those
+          were trimmed from the history before and would only be trimmed again
+        - stored posts within instagram_post_refresh_days get fresh like/comment/view counts
+          (written only when they changed); older ones are left as stored
+        - the newest instagram_post_history posts are kept, older stored ones trimmed
+        Returns {"posts", "writes", "trim_ids", "new", "refreshed"}, or None with nothing stored.
+        """
+        if not stored:
+            return None
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=settings.instagram_post_refresh_days)
+        by_url = {row.get("post_url"): row for row in stored}
+        watermark = max((t for t in map(_post_time, stored) if t), default=None)
+
+        merged = {
+            row.get("post_url"): {
+                "post_url": row.get("post_url"),
+                "post_date": row.get("post_date"),
+                "caption": row.get("caption"),
+                "likes": row.get("likes") or 0,
+                "comments": row.get("comments") or 0,
+                "post_type": row.get("post_type") or "photo",
+                "is_video": row.get("post_type") == "video",
+                "video_view_count": row.get("views"),
+            }
+            for row in stored
+        }
+        writes: dict[str, dict] = {}
+        new = refreshed = skipped = 0
+        for post in fetched:
+            url = post.get("post_url")
+            old = by_url.get(url)
+            taken = _post_time(post)
+            if old is None:
+                if taken and watermark and taken < watermark and taken < cutoff:
+                    skipped += 1
+                    continue
+                merged[url] = writes[url] = post
+                new += 1
+            elif taken and taken >= cutoff:
+                merged[url] = post
+                counts = (post.get("likes", 0), post.get("comments", 0), post.get("video_view_count"))
+                if counts != (old.get("likes") or 0, old.get("comments") or 0, old.get("views")):
+                    writes[url] = post
+                    refreshed += 1
+
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        posts = sorted(merged.values(), key=lambda p: _post_time(p) or epoch, reverse=True)
+        posts = posts[:settings.instagram_post_history]
+        kept = {p.get("post_url") for p in posts}
+        if skipped:
+            logger.debug(f"{skipped} unstored posts older than {watermark.isoformat()} skipped")
+        return {
+            "posts": posts,
+            "writes": [p for url, p in writes.items() if url in kept],
+            "trim_ids": [row["id"] for row in stored if row.get("post_url") not in kept],
+            "new": new,
+            "refreshed": refreshed,
+        }
+
+    def _upsert_posts(self, profile_id: str, lead_id: str, merge: dict):
+        rows = [self._post_row(profile_id, lead_id, p) for p in merge["writes"]]
+        try:
+            if rows:
+                (
+                    db.table("prospect_posts")
+                    .upsert(rows, on_conflict="social_profile_id,post_url")
+                    .execute()
+                )
+            if merge["trim_ids"]:
+                db.table("prospect_posts").delete().in_("id", merge["trim_ids"]).execute()
+            logger.info(
+                f"Posts for profile {profile_id}: {merge['new']} new, {merge['refreshed']} refreshed, "
+                f"{len(merge['trim_ids'])} trimmed, {len(merge['posts']) - len(rows)} unchanged"
+            )
+        except Exception as e:
+            logger.error(f"Failed to upsert posts for profile {profile_id}: {e}")
+
+
+def _post_time(post: dict) -> datetime | None:
+    try:
+        taken = datetime.fromisoformat(post["post_date"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    return taken if taken.tzinfo else taken.replace(tzinfo=timezone.utc)
@@ -3,11 +3,17 @@ Outscraper Google Maps scraper.
 Searches by category + city, extracts business data, saves to Supabase.
 """
 
+from datetime import datetime, timezone
 from outscraper import ApiClient
 from config.settings import settings
 from config.database import db
 from utils.logger import logger
 from utils.helpers import clean_email, clean_phone, extract_instagram_username, retry
+from utils.lead_ingest import ingest_leads
+from utils.dedup_index import dedup_index
+from utils.response_cache import google_maps_search
+from utils.query_watermarks import query_watermarks
+from utils.geo_tiles import bounding_box, harvest_tiles, place_key
 
 
 class OutscraperScraper:
@@ -34,46 +40,149 @@ class OutscraperScraper:
         if category == 'All Categories':
             return self._scrape_all_categories(location, limit)
 
-        return self._scrape_single_category(category, location, limit)
+        return dedup_index.filter_new(self._scrape_single_category(category, location, limit))
 
     @retry(max_attempts=3, delay=5.0)
     def _scrape_single_category(self, category: str, location: str, limit: int) -> list[dict]:
         query = f"{category} in {location}"
         logger.info(f"Scraping Google Maps: '{query}' (limit={limit})")
 
-        results = self.client.google_maps_search(
-            query,
-            limit=limit,
-            language="en",
-        )
-
-        if not results or not results[0]:
+        if settings.outscraper_tiling:
+            items = self._scrape_tiled(query, limit)
+        else:
+            items = self._harvest(query, limit) if settings.outscraper_incremental else None
+            if items is None:
+                items = self._search(query, limit)
+        if not items:
             logger.warning(f"No results for '{query}'")
             return []
 
         businesses = []
-        for item in results[0]:
+        for item in items:
             business = self._parse_business(item, category, location)
             if business:
                 businesses.append(business)
 
-        logger.info(f"Parsed {len(businesses)} businesses from {len(results[0])} results")
+        logger.info(f"Parsed {len(businesses)} businesses from {len(items)} results")
         return businesses
 
+    def _search(self, query: str, limit: int, skip: int = 0, coordinates: str = "") -> list[dict]:
+        results = google_maps_search(
+            self.client,
+            query,
+            limit=limit,
+            language="en",
+            ttl_hours=settings.outscraper_cache_scrape_ttl_hours,
+            skip=skip,
+            coordinates=coordinates,
+        )
+        return results[0] if results and results[0] else []
+
+    def _scrape_tiled(self, query: str, limit: int) -> list[dict]:
+        """
+        City-wide query first (no more results than `limit`: Outscraper bills per
+        result); if it fills the whole page without `limit` new businesses, the city
+        is split into tiles around its results and the query fans out per tile
+        (see utils/geo_tiles.py).
+        """
+        page_size = min(limit, settings.outscraper_tile_page_size)
+        base = self._search(query, page_size)
+
+        def held(item: dict) -> bool:
+            return dedup_index.holds_place(item.get("place_id"))
+
+        fresh = [item for item in base if not held(item)][:limit]
+        box = bounding_box(base)
+        if len(base) < page_size or len(fresh) >= limit or box is None:
+            return fresh
+
+        def search_tile(tile, n):
+            if settings.outscraper_incremental:
+                items = self._harvest(query, n, coordinates=tile.coordinates)
+                if items is not None:
+                    return items
+            return self._search(query, n, coordinates=tile.coordinates)
+
+        # Stored businesses count as seen, so tiles are judged by what's new to us
+        seen = {place_key(item) for item in base}
+        tiles, stats = harvest_tiles(box, search_tile, limit - len(fresh), seen, skip=held)
+        logger.info(f"Tiled '{query}': {len(fresh)} from the city query + {len(tiles)} from tiles {stats}")
+        return fresh + tiles
+
+    def _harvest(self, query: str, limit: int, coordinates: str = "") -> list[dict] | None:
+        """
+        Incremental mode: page past everything this query (or tile of it) has already yielded
+        (skip = watermark) and return only unseen place_ids. None = no watermark, do a full search.
+        """
+        label = f"{query} {coordinates}".strip()
+        mark = query_watermarks.get(label)
+        if mark is None:
+            return None
+        if mark["exhausted"]:
+            logger.info(f"'{label}' is exhausted at {mark['next_skip']} results; skipping")
+            return []
+
+        known = set(mark["place_ids"])
+        new_before = mark.get("new_places") or 0
+        fresh = []
+        for _ in range(settings.outscraper_max_pages_per_query):
+            want = limit - len(fresh)
+            if want <= 0:
+                break
+            try:
+                page = self._search(query, want, skip=mark["next_skip"], coordinates=coordinates)
+            except Exception as e:
+                if not fresh:
+                    raise
+                # Earlier pages are already marked as seen; keep what they yielded
+                logger.warning(f"'{label}' page at skip {mark['next_skip']} failed, keeping {len(fresh)}: {e}")
+                break
+            mark["next_skip"] += len(page)
+            mark["results_seen"] = (mark.get("results_seen") or 0) + len(page)
+            for item in page:
+                place_id = item.get("place_id")
+                if place_id in known:
+                    continue
+                if place_id:
+                    known.add(place_id)
+                    mark["place_ids"].append(place_id)
+                fresh.append(item)
+            if len(page) < want:
+                mark["exhausted"] = True
+                mark["exhausted_at"] = datetime.now(timezone.utc).isoformat()
+            mark["new_places"] = new_before + len(fresh)
+            # Saved per page so a retry after a failed page doesn't pay for the earlier ones again
+            query_watermarks.save(mark)
+            if mark["exhausted"]:
+                logger.info(f"'{label}' exhausted after {mark['next_skip']} results")
+                break
+
+        logger.info(f"'{label}': {len(fresh)} new places (next skip {mark['next_skip']})")
+        return fresh
+
     def _scrape_all_categories(self, location: str, limit: int) -> list[dict]:
-        per_category = max(3, limit // len(self.ALL_CATEGORIES))
+        categories = self.ALL_CATEGORIES
+        if settings.outscraper_incremental:
+            # Spend the budget on queries that still have unseen results
+            categories = [c for c in categories if not query_watermarks.is_exhausted(f"{c} in {location}")]
+            if not categories:
+                logger.info(f"All Categories: every query for {location} is exhausted")
+                return []
         all_businesses = []
 
-        for cat in self.ALL_CATEGORIES:
+        for i, cat in enumerate(categories):
             if len(all_businesses) >= limit:
                 break
+            # What sparse categories leave unused rolls over to the remaining ones
+            per_category = max(3, (limit - len(all_businesses)) // (len(categories) - i))
             try:
+                # Businesses already held (or seen under another category) don't count toward the limit
                 batch = self._scrape_single_category(cat, location, per_category)
-                all_businesses.extend(batch)
+                all_businesses.extend(dedup_index.filter_new(batch))
             except Exception as e:
                 logger.warning(f"Failed to scrape '{cat}': {e}")
 
-        logger.info(f"All Categories: {len(all_businesses)} total from {len(self.ALL_CATEGORIES)} categories")
+        logger.info(f"All Categories: {len(all_businesses)} total from {len(categories)} categories")
         return all_businesses[:limit]
 
     def _parse_business(self, item: dict, category: str, location: str) -> dict | None:
@@ -150,63 +259,45 @@ class OutscraperScraper:
         return links
 
     def save_to_supabase(self, businesses: list[dict]) -> dict:
-        saved = 0
-        skipped = 0
-        errors = 0
-
-        for biz in businesses:
-            try:
-                # Dedup by business name + city
-                existing = (
-                    db.table("outreach_leads")
-                    .select("id")
-                    .eq("business_name", biz["business_name"])
-                    .eq("city", biz.get("city", ""))
-                    .execute()
-                )
-
-                if existing.data:
-                    skipped += 1
-                    continue
-
-                row = {
-                    "business_name": biz["business_name"],
-                    "industry": biz.get("category"),
-                    "category": biz.get("category"),
-                    "website": biz.get("website"),
-                    "contact_name": biz.get("contact_name"),
-                    "contact_email": biz.get("contact_email"),
-                    "contact_phone": biz.get("contact_phone"),
-                    "owner_name": biz.get("owner_name"),
-                    "owner_email": biz.get("owner_email"),
-                    "owner_phone": biz.get("owner_phone"),
-                    "address": biz.get("address"),
-                    "city": biz.get("city"),
-                    "state": biz.get("state"),
-                    "zip": biz.get("zip"),
-                    "google_rating": biz.get("google_rating"),
-                    "google_reviews_count": biz.get("google_reviews_count"),
-                    "google_maps_url": biz.get("google_maps_url"),
-                    "instagram_url": biz.get("instagram_url"),
-                    "facebook_url": biz.get("facebook_url"),
-                    "yelp_url": biz.get("yelp_url"),
-                    "source": biz.get("source"),
-                    "prospect_source": biz.get("prospect_source"),
-                    "source_details": biz.get("source_details"),
-                    "status": "new",
-                    "pipeline_status": "scraped",
-                    "enrichment_status": "pending",
-                }
-
-                db.table("outreach_leads").insert(row).execute()
-                saved += 1
-
-            except Exception as e:
-                logger.error(f"Failed to save {biz.get('business_name')}: {e}")
-                errors += 1
-
-        logger.info(f"Outscraper save: {saved} saved, {skipped} skipped, {errors} errors")
-        return {"saved": saved, "skipped": skipped, "errors": errors}
+        rows = [
+            {
+                "business_name": biz.get("business_name"),
+                "industry": biz.get("category"),
+                "category": biz.get("category"),
+                "website": biz.get("website"),
+                "contact_name": biz.get("contact_name"),
+                "contact_email": biz.get("contact_email"),
+                "contact_phone": biz.get("contact_phone"),
+                "owner_name": biz.get("owner_name"),
+                "owner_email": biz.get("owner_email"),
+                "owner_phone": biz.get("owner_phone"),
+                "address": biz.get("address"),
+                "city": biz.get("city"),
+                "state": biz.get("state"),
+                "zip": biz.get("zip"),
+                "google_rating": biz.get("google_rating"),
+                "google_reviews_count": biz.get("google_reviews_count"),
+                "google_maps_url": biz.get("google_maps_url"),
+                "google_place_id": biz.get("google_place_id"),
+                "instagram_url": biz.get("instagram_url"),
+                "facebook_url": biz.get("facebook_url"),
+                "yelp_url": biz.get("yelp_url"),
+                "source": biz.get("source"),
+                "prospect_source": biz.get("prospect_source"),
+                "source_details": biz.get("source_details"),
+                "status": "new",
+                "pipeline_status": "scraped",
+                "enrichment_status": "pending",
+            }
+            for biz in businesses
+        ]
+
+        # Dedup by normalized business name + city, one upsert per chunk
+        result = ingest_leads(rows, "Outscraper")
+        logger.info(
+            f"Outscraper save: {result['saved']} saved, {result['skipped']} skipped, {result['errors']} errors"
+        )
+        return {k: result[k] for k in ("saved", "skipped", "errors")}
 
     def scrape_and_save(
         self,
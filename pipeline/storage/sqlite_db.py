@@ -0,0 +1,597 @@
+"""
+Local SQLite storage backend.
+Implements the same table()/rpc() query-builder subset as the Supabase client
+(select/insert/update/upsert/delete with eq/neq/in_/is_/not_/gt/gte/lt/lte/
+order/limit/range/single), so every stage runs unchanged against a local file
+(STORAGE_BACKEND=sqlite). The schema is built from the pipeline migrations in
+supabase/migrations, translated to SQLite; the database runs in WAL mode with
+one connection per thread. The pipeline RPCs (claim_pipeline_leads,
+apply_lead_patches) are implemented here in SQL.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "supabase", "migrations")
+
+# Applied in order; the first one defines the pipeline tables
+PIPELINE_MIGRATIONS = (
+    "20260220000000_prospect_pipeline_tables.sql",
+    "20260301000000_pipeline_lead_leases.sql",
+    "20260302000000_pipeline_run_metrics.sql",
+    "20260304000000_outreach_leads_dedup_key.sql",
+    "20260305000000_outscraper_query_watermarks.sql",
+    "20260306000000_social_profiles_username_index.sql",
+    "20260307000000_prospect_posts_post_url_unique.sql",
+    "20260308000000_claim_pipeline_leads_market_scope.sql",
+)
+
+# Tables the migrations alter but the web app created (not part of supabase/migrations)
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach_leads (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  business_name TEXT NOT NULL,
+  industry TEXT,
+  website TEXT,
+  contact_name TEXT,
+  contact_email TEXT,
+  contact_phone TEXT,
+  city TEXT,
+  state TEXT,
+  country TEXT,
+  google_rating DECIMAL(2,1),
+  google_reviews_count INTEGER,
+  google_maps_url TEXT,
+  source TEXT,
+  source_details JSONB DEFAULT '{}',
+  status TEXT DEFAULT 'new',
+  notes TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_name_city ON outreach_leads(business_name, city);
+
+CREATE TABLE IF NOT EXISTS pipeline_settings (
+  key TEXT PRIMARY KEY,
+  value JSONB,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+"""
+
+_TYPES = {
+    "uuid": "text", "text": "text", "varchar": "text", "date": "text",
+    "timestamptz": "text", "timestamp": "text",
+    "jsonb": "json", "json": "json",
+    "integer": "int", "int": "int", "bigint": "int", "smallint": "int",
+    "decimal": "real", "numeric": "real", "real": "real", "float": "real",
+    "boolean": "bool", "bool": "bool",
+}
+_SQL_TYPES = {"text": "TEXT", "json": "TEXT", "int": "INTEGER", "real": "REAL", "bool": "INTEGER"}
+# Declared types of columns added by ensure_columns() → kind, when reopening a file
+_DECLARED_KINDS = {"JSON": "json", "BOOLEAN": "bool", "INTEGER": "int", "REAL": "real"}
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ── Schema translation ──
+
+def _statements(sql: str) -> list[str]:
+    sql = re.sub(r"\$\$.*?\$\$", "", sql, flags=re.S)  # function bodies
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return [s.strip() for s in sql.split(";") if s.strip()]
+
+
+def _split_top_level(body: str) -> list[str]:
+    parts, depth, current = [], 0, []
+    for ch in body:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _column(definition: str, altering: bool = False) -> tuple[str, str, str, object]:
+    """Postgres column definition → (name, kind, SQLite definition, python default or None)."""
+    match = re.match(r"(\w+)\s+([A-Za-z]+)(\s*\([^)]*\))?(\[\])?\s*(.*)$", definition, re.S)
+    name, pg_type, _, is_array, rest = match.groups()
+    kind = "json" if is_array else _TYPES.get(pg_type.lower(), "text")
+    py_default = None
+    default = re.search(r"DEFAULT\s+(uuid_generate_v4\(\)|gen_random_uuid\(\)|NOW\(\)|CURRENT_DATE)", rest, re.I)
+    if default:
+        fn = default.group(1).lower()
+        py_default = "uuid" if "uuid" in fn else "date" if fn == "current_date" else "now"
+        rest = rest.replace(default.group(0), "")
+    rest = re.sub(r"\bTRUE\b", "1", re.sub(r"\bFALSE\b", "0", rest))
+    rest = re.sub(r"'(\{\}|\[\])'::jsonb", r"'\1'", rest)
+    if altering:
+        rest = re.sub(r"\bNOT NULL\b", "", rest)
+    return name, kind, f"{name} {_SQL_TYPES[kind]} {' '.join(rest.split())}".strip(), py_default
+
+
+class Schema:
+    def __init__(self):
+        self.columns: dict[str, dict[str, str]] = {}      # table → column → kind
+        self.defaults: dict[str, dict[str, str]] = {}     # table → column → "uuid" | "now" | "date"
+        self.ddl: list[str] = []
+
+    def apply(self, sql: str):
+        for stmt in _statements(sql):
+            head = " ".join(stmt.split()[:6]).upper()
+            if head.startswith("CREATE TABLE"):
+                self._create_table(stmt)
+            elif re.match(r"ALTER TABLE \w+ ADD COLUMN", stmt, re.I):
+                self._add_column(stmt)
+            elif re.match(r"CREATE (UNIQUE )?INDEX", head):
+                self._create_index(stmt)
+            # RLS, policies, functions and data backfills have no SQLite equivalent
+
+    def _create_table(self, stmt: str):
+        match = re.match(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\((.*)\)\s*$", stmt, re.S | re.I)
+        table, body = match.groups()
+        cols, defs = {}, []
+        for part in _split_top_level(body):
+            if re.match(r"(PRIMARY KEY|UNIQUE|CHECK|CONSTRAINT|FOREIGN KEY)\b", part, re.I):
+                defs.append(part)
+                continue
+            name, kind, sql_def, py_default = _column(part)
+            cols[name] = kind
+            defs.append(sql_def)
+            if py_default:
+                self.defaults.setdefault(table, {})[name] = py_default
+        self.columns[table] = cols
+        self.ddl.append(f"CREATE TABLE IF NOT EXISTS {table} (\n  " + ",\n  ".join(defs) + "\n)")
+
+    def _add_column(self, stmt: str):
+        match = re.match(r"ALTER TABLE (\w+) ADD COLUMN (?:IF NOT EXISTS )?(.*)$", stmt, re.S | re.I)
+        table, definition = match.groups()
+        if table not in self.columns:
+            return
+        name, kind, sql_def, py_default = _column(definition.strip(), altering=True)
+        if name in self.columns[table]:
+            return
+        self.columns[table][name] = kind
+        if py_default:
+            self.defaults.setdefault(table, {})[name] = py_default
+        self.ddl.append(f"ALTER TABLE {table} ADD COLUMN {sql_def}")
+
+    def _create_index(self, stmt: str):
+        match = re.match(r"CREATE (UNIQUE )?INDEX (?:IF NOT EXISTS )?(\w+) ON (\w+)\s*(\(.*\))(.*)$", stmt, re.S | re.I)
+        if not match or "USING" in stmt.upper():
+            return
+        unique, name, table, cols, where = match.groups()
+        if table in self.columns:
+            self.ddl.append(f"CREATE {unique or ''}INDEX IF NOT EXISTS {name} ON {table}{cols}{where}")
+
+
+def build_schema(migrations_dir: str = MIGRATIONS_DIR) -> Schema:
+    schema = Schema()
+    schema.apply(BASE_SCHEMA)
+    for name in PIPELINE_MIGRATIONS:
+        with open(os.path.join(migrations_dir, name), encoding="utf-8") as f:
+            schema.apply(f.read())
+    return schema
+
+
+# ── Query builder ──
+
+class SQLiteResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Negate:
+    def __init__(self, query: "SQLiteQuery"):
+        self._query = query
+
+    def __getattr__(self, name):
+        def apply(*args):
+            self._query._negate_next = True
+            return getattr(self._query, name)(*args)
+        return apply
+
+
+class SQLiteQuery:
+    def __init__(self, store: "SQLiteDB", table: str):
+        self._store = store
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = "id"
+        self._ignore_duplicates = False
+        self._where: list[str] = []
+        self._params: list = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single = False
+        self._negate_next = False
+
+    # ── Operations ──
+
+    def select(self, columns: str = "*", **kwargs):
+        self._op, self._columns = "select", columns
+        return self
+
+    def insert(self, rows, **kwargs):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def update(self, values: dict, **kwargs):
+        self._op, self._payload = "update", values
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", ignore_duplicates: bool = False, **kwargs):
+        self._op, self._payload = "upsert", rows
+        self._on_conflict, self._ignore_duplicates = on_conflict or "id", ignore_duplicates
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # ── Filters ──
+
+    @property
+    def not_(self):
+        return _Negate(self)
+
+    def _filter(self, col: str, clause: str, params=()):
+        self._store.ensure_columns(self._table, [col])
+        negate, self._negate_next = self._negate_next, False
+        self._where.append(f"NOT ({clause})" if negate else clause)
+        self._params.extend(params)
+        return self
+
+    def _value(self, col, value):
+        return self._store.encode(self._table, col, value)
+
+    def eq(self, col, value):
+        return self._filter(col, f'"{col}" = ?', [self._value(col, value)])
+
+    def neq(self, col, value):
+        return self._filter(col, f'"{col}" <> ?', [self._value(col, value)])
+
+    def in_(self, col, values):
+        values = list(values)
+        if not values:
+            return self._filter(col, "0")
+        marks = ", ".join("?" * len(values))
+        return self._filter(col, f'"{col}" IN ({marks})', [self._value(col, v) for v in values])
+
+    def is_(self, col, value):
+        if value in (None, "null"):
+            return self._filter(col, f'"{col}" IS NULL')
+        return self._filter(col, f'"{col}" = ?', [1 if value in (True, "true") else 0])
+
+    def gt(self, col, value):
+        return self._filter(col, f'"{col}" > ?', [self._value(col, value)])
+
+    def gte(self, col, value):
+        return self._filter(col, f'"{col}" >= ?', [self._value(col, value)])
+
+    def lt(self, col, value):
+        return self._filter(col, f'"{col}" < ?', [self._value(col, value)])
+
+    def lte(self, col, value):
+        return self._filter(col, f'"{col}" <= ?', [self._value(col, value)])
+
+    def order(self, col, desc: bool = False, **kwargs):
+        self._store.ensure_columns(self._table, [col])
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n: int, **kwargs):
+        self._limit = n
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    # ── Execution ──
+
+    def _where_sql(self) -> str:
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+    def _projection(self) -> str:
+        if self._columns.strip() == "*":
+            return "*"
+        cols = [c.strip() for c in self._columns.split(",") if c.strip()]
+        self._store.ensure_columns(self._table, cols)
+        return ", ".join(f'"{c}"' for c in cols)
+
+    def _rows(self) -> list[dict]:
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def execute(self) -> SQLiteResult:
+        store, table = self._store, self._table
+        if self._op == "select":
+            sql = f"SELECT {self._projection()} FROM {table}{self._where_sql()}"
+            if self._order:
+                # PostgREST order: NULLS LAST ascending, NULLS FIRST descending
+                sql += " ORDER BY " + ", ".join(
+                    f'"{c}" IS NULL {"DESC" if d else "ASC"}, "{c}" {"DESC" if d else "ASC"}' for c, d in self._order
+                )
+            if self._limit is not None or self._offset:
+                sql += f" LIMIT {-1 if self._limit is None else int(self._limit)} OFFSET {int(self._offset)}"
+            data = store.query(table, sql, self._params)
+            if self._single:
+                if len(data) != 1:
+                    raise ValueError(f"single() expected 1 row from {table}, got {len(data)}")
+                return SQLiteResult(data[0])
+            return SQLiteResult(data)
+
+        if self._op == "insert":
+            return SQLiteResult(store.insert(table, self._rows()))
+        if self._op == "upsert":
+            return SQLiteResult(store.insert(table, self._rows(), self._on_conflict, self._ignore_duplicates))
+        if self._op == "update":
+            values = dict(self._payload)
+            store.ensure_columns(table, values, values)
+            sets = ", ".join(f'"{c}" = ?' for c in values)
+            params = [store.encode(table, c, v) for c, v in values.items()] + self._params
+            return SQLiteResult(store.query(table, f"UPDATE {table} SET {sets}{self._where_sql()} RETURNING *", params))
+        if self._op == "delete":
+            return SQLiteResult(store.query(table, f"DELETE FROM {table}{self._where_sql()} RETURNING *", self._params))
+        raise ValueError(f"Unsupported operation {self._op}")
+
+
+class SQLiteRpc:
+    def __init__(self, store: "SQLiteDB", name: str, params: dict):
+        self._store, self._name, self._params = store, name, params
+
+    def execute(self) -> SQLiteResult:
+        handler = self._store.rpcs.get(self._name)
+        if not handler:
+            raise ValueError(f"Unknown RPC {self._name}")
+        return SQLiteResult(handler(self._store, **self._params))
+
+
+class SQLiteDB:
+    """Supabase-compatible table()/rpc() API over a local SQLite file (WAL, one connection per thread)."""
+
+    def __init__(self, path: str, migrations_dir: str = MIGRATIONS_DIR):
+        self.path = path
+        if path != ":memory:" and os.path.dirname(os.path.abspath(path)):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.schema = build_schema(migrations_dir)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self.calls = 0  # statements issued through table()/rpc(), for benchmarks
+        self.rpcs = {
+            "claim_pipeline_leads": claim_pipeline_leads,
+            "apply_lead_patches": apply_lead_patches,
+        }
+        conn = self.connection()
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for stmt in self.schema.ddl:
+            alter = re.match(r"ALTER TABLE (\w+) ADD COLUMN (\w+)", stmt)
+            if alter and alter.group(1) in existing:
+                present = {r[1] for r in conn.execute(f"PRAGMA table_info({alter.group(1)})")}
+                if alter.group(2) in present:
+                    continue
+            conn.execute(stmt)
+        # Columns added on the fly by earlier runs (see ensure_columns)
+        for table, cols in self.schema.columns.items():
+            for row in conn.execute(f"PRAGMA table_info({table})"):
+                cols.setdefault(row[1], _DECLARED_KINDS.get(row[2], "text"))
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def table(self, name: str) -> SQLiteQuery:
+        self.calls += 1
+        return SQLiteQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> SQLiteRpc:
+        self.calls += 1
+        return SQLiteRpc(self, name, params or {})
+
+    # ── Values ──
+
+    def encode(self, table: str, col: str, value):
+        kind = self.schema.columns.get(table, {}).get(col)
+        if value is None:
+            return None
+        if kind == "json" or isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def decode(self, table: str, row: sqlite3.Row) -> dict:
+        kinds = self.schema.columns.get(table, {})
+        out = {}
+        for col in row.keys():
+            value, kind = row[col], kinds.get(col)
+            if value is not None and kind == "json":
+                try:
+                    value = json.loads(value)
+                except (TypeError, ValueError):
+                    pass
+            elif value is not None and kind == "bool":
+                value = bool(value)
+            out[col] = value
+        return out
+
+    def ensure_columns(self, table: str, cols, sample: dict | None = None):
+        """Add columns the migrations don't declare (the hosted schema has more) as needed."""
+        known = self.schema.columns.setdefault(table, {})
+        missing = [c for c in cols if c not in known]
+        if not missing:
+            return
+        with self._schema_lock:
+            conn = self.connection()
+            present = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            for col in missing:
+                if not _IDENT.match(col):
+                    raise ValueError(f"Invalid column name: {col}")
+                value = (sample or {}).get(col)
+                kind = ("json" if isinstance(value, (dict, list)) else "bool" if isinstance(value, bool)
+                        else "int" if isinstance(value, int) else "real" if isinstance(value, float) else "text")
+                if col not in present:
+                    decl = {"json": "JSON", "bool": "BOOLEAN"}.get(kind, _SQL_TYPES[kind])
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN "{col}" {decl}')
+                known[col] = kind
+
+    # ── Execution ──
+
+    def query(self, table: str, sql: str, params=()) -> list[dict]:
+        conn = self.connection()
+        return [self.decode(table, r) for r in conn.execute(sql, list(params)).fetchall()]
+
+    def _with_defaults(self, table: str, row: dict) -> dict:
+        row = dict(row)
+        for col, fn in self.schema.defaults.get(table, {}).items():
+            if row.get(col) is None:
+                row[col] = str(uuid.uuid4()) if fn == "uuid" else date.today().isoformat() if fn == "date" else _now()
+        return row
+
+    def insert(self, table: str, rows: list[dict], on_conflict: str | None = None,
+               ignore_duplicates: bool = False) -> list[dict]:
+        if not rows:
+            return []
+        conflict = [c.strip() for c in on_conflict.split(",")] if on_conflict else None
+        rows = [self._with_defaults(table, r) for r in rows]
+        cols = list(dict.fromkeys(c for r in rows for c in r))
+        self.ensure_columns(table, cols, {c: v for r in rows for c, v in r.items() if v is not None})
+        col_sql = ", ".join(f'"{c}"' for c in cols)
+        sql = f"INSERT INTO {table} ({col_sql}) VALUES ({', '.join('?' * len(cols))})"
+        if conflict:
+            target = ", ".join(f'"{c}"' for c in conflict)
+            updates = [c for c in cols if c not in conflict and c not in ("id", "created_at")]
+            if ignore_duplicates or not updates:
+                sql += f" ON CONFLICT ({target}) DO NOTHING"
+            else:
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET " + ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+        sql += " RETURNING *"
+
+        conn = self.connection()
+        out = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in rows:
+                params = [self.encode(table, c, row.get(c)) for c in cols]
+                out.extend(self.decode(table, r) for r in conn.execute(sql, params).fetchall())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return out
+
+
+# ── RPCs (SQLite versions of the functions in supabase/migrations) ──
+
+def claim_pipeline_leads(
+    store: SQLiteDB,
+    p_stage: str,
+    p_owner: str,
+    p_limit: int,
+    p_lease_seconds: int,
+    p_pipeline_status: str,
+    p_enrichment_status: str | None = None,
+    p_set_enrichment_status: str | None = None,
+    p_score_tiers: list[str] | None = None,
+    p_require_email: bool = False,
+    p_market: str | None = None,
+) -> list[dict]:
+    now = _now()
+    where = ["pipeline_status = ?", "(lease_owner IS NULL OR lease_expires_at < ?)"]
+    params: list = [p_pipeline_status, now]
+    if p_enrichment_status:
+        where.append("(enrichment_status = ? OR (lease_stage = ? AND lease_expires_at < ?))")
+        params += [p_enrichment_status, p_stage, now]
+    if p_score_tiers:
+        where.append(f"score_tier IN ({', '.join('?' * len(p_score_tiers))})")
+        params += list(p_score_tiers)
+    if p_require_email:
+        where.append("(contact_email IS NOT NULL OR owner_email IS NOT NULL)")
+    if p_market:
+        where.append("market = ?")
+        params.append(p_market)
+
+    expires = (datetime.now(timezone.utc) + timedelta(seconds=p_lease_seconds)).isoformat()
+    conn = store.connection()
+    # BEGIN IMMEDIATE takes the write lock up front, so concurrent claims get disjoint sets
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            f"UPDATE outreach_leads SET lease_owner = ?, lease_stage = ?, lease_expires_at = ?, "
+            f"enrichment_status = COALESCE(?, enrichment_status) "
+            f"WHERE id IN (SELECT id FROM outreach_leads WHERE {' AND '.join(where)} ORDER BY created_at LIMIT ?) "
+            f"RETURNING *",
+            [p_owner, p_stage, expires, p_set_enrichment_status, *params, int(p_limit)],
+        ).fetchall()
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [store.decode("outreach_leads", r) for r in rows]
+
+
+def apply_lead_patches(store: SQLiteDB, p_patches: list[dict]) -> list[dict]:
+    conn = store.connection()
+    applied = []
+    for patch in p_patches:
+        fields = patch.get("fields") or {}
+        store.ensure_columns("outreach_leads", fields, fields)
+        store.ensure_columns("outreach_leads", patch.get("expect") or {})
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for patch in p_patches:
+            fields = patch.get("fields") or {}
+            if not fields:
+                continue
+            conds, params = ["id = ?"], []
+            for col, value in (patch.get("expect") or {}).items():
+                if value is None:
+                    conds.append(f'"{col}" IS NULL')
+                else:
+                    conds.append(f'"{col}" = ?')
+                    params.append(store.encode("outreach_leads", col, value))
+            sets = ", ".join(f'"{c}" = ?' for c in fields)
+            values = [store.encode("outreach_leads", c, v) for c, v in fields.items()]
+            row = conn.execute(
+                f"UPDATE outreach_leads SET {sets} WHERE {' AND '.join(conds)} RETURNING id",
+                [*values, patch["id"], *params],
+            ).fetchone()
+            if row:
+                applied.append({"id": row["id"]})
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return applied
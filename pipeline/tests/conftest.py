@@ -0,0 +1,47 @@
+"""
+Shared fixtures: the in-memory stand-in database and the local SQLite store,
+both exposing the Supabase table()/rpc() API the pipeline uses.
+
+Run from pipeline/:
+    python -m pytest -q
+"""
+
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "local.test.key")
+
+import pytest
+
+from harness.memory_db import MemoryDB
+from storage.sqlite_db import SQLiteDB
+
+
+@pytest.fixture
+def memory_db():
+    return MemoryDB()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    return SQLiteDB(str(tmp_path / "pipeline.db"))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Runs a test once against each backend."""
+    if request.param == "memory":
+        return MemoryDB()
+    return SQLiteDB(str(tmp_path / "pipeline.db"))
+
+
+def seed_leads(store, count: int, **fields) -> list[dict]:
+    rows = [{
+        "business_name": f"Test Business {i}",
+        "city": "Munich",
+        "contact_email": f"owner{i}@example.de",
+        "pipeline_status": "scraped",
+        "enrichment_status": "pending",
+        **fields,
+    } for i in range(count)]
+    return store.table("outreach_leads").insert(rows).execute().data
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from config.settings import settings
+from scrapers import instagram_scraper
+from scrapers.instagram_scraper import InstagramScraper
+from utils import profile_cache as profile_cache_module
+from utils.profile_cache import ProfileCache
+from utils.response_cache import KeyLocks, ResponseCache
+from tests.conftest import seed_leads
+
+
+@pytest.fixture
+def profiles(tmp_path, memory_db, monkeypatch):
+    monkeypatch.setattr(profile_cache_module, "db", memory_db)
+    monkeypatch.setattr(settings, "instagram_cache", True)
+    cache = ProfileCache()
+    cache.configure(str(tmp_path / "instagram.db"))
+    return cache
+
+
+def test_memory_tier_is_a_bounded_lru(profiles, monkeypatch):
+    monkeypatch.setattr(settings, "instagram_cache_memory_entries", 3)
+    for name in ("a", "b", "c"):
+        profiles.put(name, {"username": name})
+    profiles.lookup("a")  # most recently used now
+    profiles.put("d", {"username": "d"})
+
+    assert list(profiles._memory) == ["c", "a", "d"]
+    # Evicted from memory, still served by the local store
+    assert profiles.lookup("b")[0] == {"username": "b"}
+
+
+def test_profile_fetch_is_single_flight_and_gates_are_dropped(profiles):
+    calls = []
+
+    def fetch(username):
+        calls.append(username)
+        time.sleep(0.05)
+        return {"username": username}
+
+    threads = [threading.Thread(target=profiles.get, args=("salonanna", fetch)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["salonanna"]
+    assert len(profiles._gates) == 0
+
+
+@pytest.fixture
+def stored_profiles(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(profile_cache_module, "db", store)
+    monkeypatch.setattr(instagram_scraper, "db", store)
+    monkeypatch.setattr(settings, "instagram_cache", True)
+    monkeypatch.setattr(settings, "instagram_incremental_posts", False)
+    cache = ProfileCache()
+    cache.configure(str(tmp_path / "instagram.db"))
+    return cache
+
+
+def _scraped(username: str) -> dict:
+    return {
+        "username": username, "profile_url": f"https://instagram.com/{username}",
+        "followers": 900, "following": 100, "posts_count": 40, "bio": "salon", "is_private": False,
+        "engagement_rate": 2.5, "posts_last_30_days": 3, "posting_frequency": 4.0,
+        "posts": [{"post_url": "https://www.instagram.com/p/1/", "post_date": "2026-03-01T10:00:00+00:00",
+                   "caption": "new look", "likes": 20, "comments": 2, "post_type": "photo"}],
+        "posting_patterns": {"posts_last_30_days": 3}, "engagement_details": {"avg_engagement_rate": 2.5},
+    }
+
+
+def test_partial_profile_rows_are_not_cache_hits(stored_profiles, store):
+    lead = seed_leads(store, 1)[0]
+    # What the engagement scraper pre-saves: no posts or figures, scraped_at left to the default
+    store.table("prospect_social_profiles").upsert({
+        "lead_id": lead["id"], "platform": "instagram", "username": "salonanna", "followers": 900,
+    }, on_conflict="lead_id,platform").execute()
+    calls = []
+
+    profile = stored_profiles.get("salonanna", lambda name: calls.append(name) or _scraped(name))
+
+    assert calls == ["salonanna"]
+    assert profile["engagement_rate"] == 2.5
+
+
+def test_fully_scraped_profile_rows_are_served_from_the_database(stored_profiles, store):
+    lead = seed_leads(store, 1)[0]
+    InstagramScraper().save_profile_to_supabase(lead["id"], _scraped("salonanna"))
+
+    profile = stored_profiles.get("salonanna", lambda name: pytest.fail("fetched a stored profile"))
+
+    assert stored_profiles.stats["db_hits"] == 1
+    assert profile["engagement_rate"] == 2.5
+    assert [p["caption"] for p in profile["posts"]] == ["new look"]
+
+
+def test_response_fetch_is_single_flight_and_locks_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "outscraper_cache", True)
+    cache = ResponseCache(str(tmp_path / "responses.db"), 1024 * 1024)
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.05)
+        return [[{"name": "Salon Anna"}]]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.fetch("search", {"query": "salon"}, 3600, call)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [[[{"name": "Salon Anna"}]]] * 5
+    assert len(cache._inflight) == 0
+
+
+def test_key_lock_outlives_a_holder_while_others_wait():
+    locks = KeyLocks()
+    inside = []
+    release = threading.Event()
+
+    def hold(tag):
+        with locks.hold("k"):
+            inside.append(tag)
+            release.wait(1)
+
+    first = threading.Thread(target=hold, args=("first",))
+    first.start()
+    while not inside:
+        time.sleep(0.001)
+    second = threading.Thread(target=hold, args=("second",))
+    second.start()
+    time.sleep(0.02)
+
+    assert inside == ["first"] and len(locks) == 1
+    release.set()
+    first.join()
+    second.join()
+    assert inside == ["first", "second"]
+    assert len(locks) == 0
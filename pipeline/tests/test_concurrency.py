@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from config.settings import settings
+from utils import concurrency
+from utils.concurrency import destination_slot
+
+
+@pytest.fixture(autouse=True)
+def caps(monkeypatch):
+    """Fresh local caps per test, from a patched destination_concurrency."""
+    monkeypatch.setattr(settings, "social_proxy", "")
+    monkeypatch.setattr(settings, "social_proxies", "")
+
+    def set_caps(**caps: int):
+        monkeypatch.setattr(settings, "destination_concurrency", caps)
+        concurrency.configure()
+
+    set_caps(default=4)
+    yield set_caps
+    concurrency.configure()
+
+
+def _free_slots(destination: str) -> int:
+    """Take slots without blocking until none is left; returns how many there were."""
+    sem = concurrency._semaphore(destination)
+    taken = 0
+    while sem.acquire(blocking=False):
+        taken += 1
+    for _ in range(taken):
+        sem.release()
+    return taken
+
+
+def test_configure_rereads_the_caps(caps):
+    caps(website=2)
+    assert _free_slots("website") == 2
+
+    caps(website=5)
+
+    assert _free_slots("website") == 5
+
+
+def _max_in_flight(destination: str, calls: int) -> int:
+    """Run `calls` threads through destination_slot at once; the most that were inside together."""
+    lock = threading.Lock()
+    inside = peak = 0
+    start = threading.Barrier(calls)
+
+    def call():
+        nonlocal inside, peak
+        start.wait()
+        with destination_slot(destination):
+            with lock:
+                inside += 1
+                peak = max(peak, inside)
+            time.sleep(0.02)
+            with lock:
+                inside -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(calls)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return peak
+
+
+def test_each_destination_keeps_its_own_cap(caps):
+    caps(website=2, yelp=3, default=1)
+
+    assert _max_in_flight("website", 8) == 2
+    assert _max_in_flight("yelp", 8) == 3
+    assert _max_in_flight("outscraper", 4) == 1
+
+
+def test_a_busy_destination_does_not_block_another(caps):
+    caps(website=1, llm=1)
+
+    with destination_slot("website"):
+        assert _max_in_flight("llm", 3) == 1
+        assert _free_slots("website") == 0
+
+
+def test_instagram_cap_grows_with_the_proxies(caps, monkeypatch):
+    monkeypatch.setattr(settings, "social_proxies", "http://a.invalid:1, http://b.invalid:1")
+    monkeypatch.setattr(settings, "social_proxy", "http://c.invalid:1")
+    caps(instagram=1)
+
+    assert _free_slots("instagram") == 3
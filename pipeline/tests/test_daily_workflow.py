@@ -0,0 +1,19 @@
+import sys
+
+import daily_workflow
+from config import database
+from config.settings import settings
+
+
+def test_dry_run_stays_offline(monkeypatch):
+    def load_remote_settings(self):
+        raise AssertionError("dry run loaded remote settings")
+
+    monkeypatch.setattr(type(settings), "load_remote_settings", load_remote_settings)
+    monkeypatch.setattr(database._shared, "_client", None)
+    monkeypatch.setattr(sys, "argv", ["daily_workflow.py", "--dry-run", "--target", "7"])
+    monkeypatch.setattr(settings, "daily_scrape_target", settings.daily_scrape_target)
+
+    assert daily_workflow.main() == 0
+    assert database._shared._client is None
+    assert settings.daily_scrape_target == 7
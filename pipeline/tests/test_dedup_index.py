@@ -0,0 +1,103 @@
+import pytest
+
+from config.settings import settings
+from utils import lead_scan
+from utils.dedup_index import BloomFilter, LeadDedupIndex, prospect_keys
+
+
+@pytest.fixture
+def stored(store):
+    store.table("outreach_leads").insert([
+        {"business_name": "Salon Anna", "city": "Munich", "instagram_url": "https://instagram.com/salonanna",
+         "website": "https://www.salon-anna.de/kontakt", "contact_phone": "+49 89 1234 5678"},
+        {"business_name": "Hair Studio", "city": "Berlin", "website": "https://instagram.com/hairstudio"},
+    ]).execute()
+    return store
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"name:business {i}|munich" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"name:other {i}|berlin" in bloom for i in range(10_000))
+    assert false_positives < 300  # 1% target, with slack
+
+
+def test_prospect_keys_normalize_identifiers():
+    keys = prospect_keys({
+        "business_name": "Salon Anna!", "city": "Munich", "google_place_id": "ChIJ1",
+        "instagram_url": "https://www.instagram.com/salonanna/", "website": "http://salon-anna.de",
+        "contact_phone": "089 1234 5678",
+    })
+
+    assert keys == ["place:ChIJ1", "name:salon anna|munich", "ig:salonanna",
+                    "domain:munich:salon-anna.de", "phone:912345678"]
+    # Platform domains and short numbers identify nobody
+    assert prospect_keys({"website": "https://facebook.com/x", "contact_phone": "112"}) == []
+
+
+@pytest.mark.parametrize("bloom_min_rows", [0, 1], ids=["exact", "bloom"])
+def test_loaded_index_recognizes_stored_leads(stored, monkeypatch, bloom_min_rows):
+    monkeypatch.setattr(settings, "dedup_bloom_min_rows", bloom_min_rows)
+    index = LeadDedupIndex()
+
+    assert index.load(stored)
+    assert index.stats["rows"] == 2
+    assert (index._bloom is not None) == bool(bloom_min_rows)
+    assert index.seen({"business_name": "SALON ANNA", "city": "munich"})
+    assert index.seen({"business_name": "Anna's", "instagram_url": "instagram.com/salonanna"})
+    assert index.seen({"business_name": "Other", "city": "Munich", "website": "https://salon-anna.de"})
+    assert index.seen({"business_name": "Other", "contact_phone": "0049 89 12345678"})
+    assert not index.seen({"business_name": "Hair Studio", "city": "Munich"})
+    assert not index.seen({"business_name": "Other", "website": "https://instagram.com/hairstudio"})
+
+
+def test_shared_domain_only_matches_within_a_city(stored):
+    index = LeadDedupIndex()
+    index.load(stored)
+    branch = {"business_name": "Salon Anna Mitte", "city": "Berlin, Germany", "website": "https://salon-anna.de/berlin"}
+
+    # The chain's Berlin branch is a new business; a Munich page on the same site isn't
+    assert not index.seen(branch)
+    assert index.seen({**branch, "city": "Munich, Germany"})
+    assert index.filter_new([branch, {**branch, "business_name": "Anna Berlin Ost"}]) == [branch]
+
+
+def test_filter_new_drops_stored_and_repeated_prospects(stored):
+    index = LeadDedupIndex()
+    index.load(stored)
+
+    fresh = index.filter_new([
+        {"business_name": "Salon Anna", "city": "Munich"},
+        {"business_name": "Nail Bar", "city": "Munich", "contact_phone": "+49 30 9876 5432"},
+        {"business_name": "Nail Bar Mitte", "city": "Munich", "contact_phone": "030 98765432"},
+    ])
+
+    assert [b["business_name"] for b in fresh] == ["Nail Bar"]
+    assert index.seen({"business_name": "Nail Bar", "city": "Munich"})
+    assert index.stats["hits"] == 3  # two filtered, one seen()
+
+
+def test_load_pages_through_every_lead(memory_db, monkeypatch):
+    monkeypatch.setattr(lead_scan, "PAGE_SIZE", 7)
+    memory_db.seed("outreach_leads", [{"business_name": f"Business {i}", "city": "Munich"} for i in range(30)])
+    index = LeadDedupIndex()
+
+    assert index.load(memory_db)
+    assert index.stats["rows"] == 30
+    assert index.seen({"business_name": "Business 29", "city": "Munich"})
+
+
+def test_failed_load_leaves_the_index_off(memory_db, monkeypatch):
+    def broken_table(name):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(memory_db, "table", broken_table)
+    index = LeadDedupIndex()
+
+    assert not index.load(memory_db)
+    assert not index.loaded
+    assert index.filter_new([{"business_name": "Salon Anna"}]) == [{"business_name": "Salon Anna"}]
@@ -0,0 +1,103 @@
+import threading
+
+import instaloader
+import pytest
+
+from scrapers import engagement_scraper
+from scrapers.engagement_scraper import EngagementScraper, _Stopped
+from utils.concurrency import QuotaExceeded
+
+CATEGORY = "Hair Salon"
+CITY = "Munich, Germany"
+
+
+def _profile(username: str, business: bool) -> dict:
+    return {
+        "username": username,
+        "bio": "hair salon in munich, book now" if business else "coffee and dogs",
+        "followers": 500, "following": 200, "posts_count": 90,
+        "is_business": business, "full_name": username.title(), "external_url": None,
+    }
+
+
+class FakeInstagram:
+    """Stands in for _load_commenter: `biz_*` are salons, `fail_*` raise, the rest load slowly."""
+
+    def __init__(self):
+        self.loaded: list[str] = []
+        self._lock = threading.Lock()
+
+    def load(self, username: str, stop: threading.Event | None = None) -> dict | None:
+        if username.startswith("fail_"):
+            raise QuotaExceeded("instagram request budget used up")
+        if not username.startswith("biz_"):
+            stop.wait(2)
+        if stop.is_set():
+            raise _Stopped(username)
+        with self._lock:
+            self.loaded.append(username)
+        return _profile(username, username.startswith("biz_"))
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    scraper = EngagementScraper()
+    instagram = FakeInstagram()
+    monkeypatch.setattr(scraper, "_load_commenter", instagram.load)
+    scraper.instagram = instagram
+    return scraper
+
+
+def _commenters(*usernames: str) -> list[dict]:
+    return [{"username": u, "comment_text": "love this!", "comment_date": None} for u in usernames]
+
+
+def test_quota_stops_loads_still_waiting(scraper):
+    checked: set[str] = set()
+
+    found = list(scraper._filter_business_accounts(
+        _commenters("biz_anna", "user_one", "user_two", "user_three"), CATEGORY, CITY, 1, checked,
+    ))
+
+    assert [c["username"] for c in found] == ["biz_anna"]
+    assert scraper.instagram.loaded == ["biz_anna"]
+    # Only the profile actually requested counts as checked
+    assert checked == {"biz_anna"}
+
+
+def test_quota_exceeded_stops_pending_loads(scraper):
+    checked: set[str] = set()
+
+    found = list(scraper._filter_business_accounts(
+        _commenters("fail_first", "user_one", "user_two"), CATEGORY, CITY, 5, checked,
+    ))
+
+    assert found == []
+    assert scraper.instagram.loaded == []
+    assert checked == {"fail_first"}
+
+
+def test_checked_usernames_load_once_across_posts(scraper):
+    checked: set[str] = set()
+
+    first = list(scraper._filter_business_accounts(
+        _commenters("biz_anna", "biz_anna", "biz_bella", "ab", "__hidden"), CATEGORY, CITY, 5, checked,
+    ))
+    second = list(scraper._filter_business_accounts(_commenters("biz_bella", "biz_carla"), CATEGORY, CITY, 5, checked))
+
+    assert sorted(c["username"] for c in first) == ["biz_anna", "biz_bella"]
+    assert [c["username"] for c in second] == ["biz_carla"]
+    assert sorted(scraper.instagram.loaded) == ["biz_anna", "biz_bella", "biz_carla"]
+    assert checked == {"biz_anna", "biz_bella", "biz_carla"}
+
+
+def test_load_commenter_skips_the_request_once_stopped(monkeypatch):
+    def from_username(context, username):
+        raise AssertionError(f"@{username} requested after the stop")
+
+    monkeypatch.setattr(instaloader.Profile, "from_username", from_username)
+    stop = threading.Event()
+    stop.set()
+
+    with pytest.raises(_Stopped):
+        EngagementScraper()._load_commenter("salon_anna", stop)
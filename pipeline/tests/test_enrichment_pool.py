@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from config.settings import settings
+from orchestrator import main_orchestrator
+from orchestrator.main_orchestrator import MainOrchestrator
+from tests.conftest import seed_leads
+from utils import concurrency, leases as leases_module
+from utils.concurrency import destination_slot
+from utils.leases import LeaseManager
+from utils.write_buffer import LeadWriteBuffer
+
+
+class FakeEnricher:
+    """Stands in for MultiPlatformEnricher: one slow website request per lead; `Broken *` leads raise."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inside = self.peak = 0
+
+    def enrich_lead(self, lead_id: str, lead: dict):
+        if lead["business_name"].startswith("Broken"):
+            raise RuntimeError("website unreachable")
+        with destination_slot("website"):
+            with self._lock:
+                self.inside += 1
+                self.peak = max(self.peak, self.inside)
+            time.sleep(0.02)
+            with self._lock:
+                self.inside -= 1
+
+
+@pytest.fixture
+def orchestrator(store, monkeypatch):
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=60)
+    monkeypatch.setattr(main_orchestrator, "db", store)
+    monkeypatch.setattr(leases_module, "db", store)
+    monkeypatch.setattr(main_orchestrator, "write_buffer", buffer)
+    monkeypatch.setattr(main_orchestrator, "leases", LeaseManager(buffer=buffer))
+    monkeypatch.setattr(settings, "lead_leases", False)
+    monkeypatch.setattr(settings, "enrichment_workers", 6)
+    monkeypatch.setattr(settings, "destination_concurrency", {"website": 2, "default": 4})
+    concurrency.configure()
+    orchestrator = MainOrchestrator()
+    orchestrator.scope = {}
+    orchestrator.enricher = FakeEnricher()
+    yield orchestrator
+    concurrency.configure()
+
+
+def test_workers_share_the_destination_cap(store, orchestrator):
+    seed_leads(store, 8)
+
+    assert orchestrator._enrich_pending_leads() == 8
+    assert orchestrator._flush_stage() == 0
+
+    # Six workers, but never more than the website cap in flight
+    assert orchestrator.enricher.peak == 2
+    rows = store.table("outreach_leads").select("pipeline_status, enrichment_status").execute().data
+    assert {(r["pipeline_status"], r["enrichment_status"]) for r in rows} == {("enriched", "completed")}
+
+
+def test_a_failing_lead_does_not_stop_the_pool(store, orchestrator):
+    broken = seed_leads(store, 1, business_name="Broken Salon")[0]
+    seed_leads(store, 3)
+
+    assert orchestrator._enrich_pending_leads() == 3
+    orchestrator._flush_stage()
+
+    rows = {r["id"]: r for r in store.table("outreach_leads").select("*").execute().data}
+    assert rows.pop(broken["id"])["enrichment_status"] == "failed"
+    assert {r["pipeline_status"] for r in rows.values()} == {"enriched"}
@@ -0,0 +1,98 @@
+import pytest
+
+from config.settings import settings
+from utils.dedup_index import LeadDedupIndex
+from utils.entity_resolution import EntityResolver, _Entity, similarity
+from utils.lead_scan import load_stored_leads
+
+
+def score(a: dict, b: dict) -> float:
+    return similarity(_Entity({"city": "Munich", **a}), _Entity({"city": "Munich", **b}))
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Salon Anna GmbH", "Salon Anna"),
+    ("Friseur Salon Anna", "Salon Anna"),
+    ("Müller Haar Design", "Mueller Haar-Design"),
+])
+def test_same_business_merges(a, b):
+    assert score({"business_name": a}, {"business_name": b}) >= settings.entity_match_threshold
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Hair Studio", "Hair Studio Maria"),
+    ("Beauty Lounge", "Beauty Lounge Munich"),
+    ("Salon Anna", "Salon Anne"),
+    ("Salon Anna", "Salon Maria"),
+])
+def test_different_business_stays_apart(a, b):
+    assert score({"business_name": a}, {"business_name": b}) < settings.entity_match_threshold
+
+
+def test_containment_merges_when_an_identifier_agrees():
+    a = {"business_name": "Hair Studio", "contact_phone": "+49 89 1234 5678"}
+    b = {"business_name": "Hair Studio Maria", "contact_phone": "089 12345678"}
+    assert score(a, b) == 1.0
+
+
+def test_prospect_category_counts_as_category_words():
+    a = {"business_name": "Anna Cuts", "category": "Hair Salon"}
+    b = {"business_name": "Anna Cuts Hair", "category": "Hair Salon"}
+    assert score({"business_name": "Anna Cuts"}, {"business_name": "Anna Cuts Tattoo"}) < settings.entity_match_threshold
+    assert score(a, b) >= settings.entity_match_threshold
+
+
+def test_phone_conflict_lowers_instead_of_vetoing():
+    same_name = score({"business_name": "Salon Anna", "contact_phone": "089 1111 1111"},
+                      {"business_name": "Salon Anna GmbH", "contact_phone": "0176 2222 2222"})
+    typo = score({"business_name": "Salon Anna", "contact_phone": "089 1111 1111"},
+                 {"business_name": "Salon Anne", "contact_phone": "0176 2222 2222"})
+
+    assert same_name >= settings.entity_match_threshold
+    assert typo < settings.entity_match_threshold
+
+
+def test_identifier_conflicts_veto():
+    assert score({"business_name": "Salon Anna", "google_place_id": "a"},
+                 {"business_name": "Salon Anna", "google_place_id": "b"}) == 0.0
+    assert score({"business_name": "Salon Anna", "website": "https://salon-anna.de"},
+                 {"business_name": "Salon Anna", "website": "https://anna-salon.de"}) == 0.0
+    # Platform pages are not business identifiers
+    assert score({"business_name": "Salon Anna", "website": "https://m.facebook.com/a"},
+                 {"business_name": "Salon Anna", "website": "https://business.site"}) == 0.97
+
+
+def test_domain_only_matches_within_a_city():
+    a = _Entity({"business_name": "Cut & Co", "city": "Munich", "website": "https://cutco.de"})
+    b = _Entity({"business_name": "Cut und Co Berlin", "city": "Berlin", "website": "https://cutco.de"})
+    assert similarity(a, b) == 0.0
+
+
+def test_resolve_folds_matches_into_stored_leads(store):
+    stored = store.table("outreach_leads").insert([
+        {"business_name": "Salon Anna GmbH", "city": "Munich", "industry": "Hair Salon"},
+        {"business_name": "Hair Studio", "city": "Munich", "industry": "Hair Salon"},
+    ]).execute().data
+    resolver = EntityResolver()
+    assert resolver.load(store)
+
+    fresh, merges = resolver.resolve([
+        {"business_name": "Friseur Salon Anna", "city": "Munich", "contact_phone": "089 1234 5678"},
+        {"business_name": "Hair Studio Maria", "city": "Munich"},
+        {"business_name": "Hair Studio Maria", "city": "Munich", "website": "https://maria.de"},
+    ])
+
+    assert [r["business_name"] for r in fresh] == ["Hair Studio Maria"]
+    assert merges == {stored[0]["id"]: {"contact_phone": "089 1234 5678"}}
+
+
+def test_one_scan_fills_both_indexes(memory_db):
+    memory_db.seed("outreach_leads", [{"business_name": f"Business {i}", "city": "Munich"} for i in range(5)])
+    dedup, resolver = LeadDedupIndex(), EntityResolver()
+    before = memory_db.calls
+
+    assert load_stored_leads(dedup, resolver, client=memory_db)
+
+    assert memory_db.calls - before == 1
+    assert dedup.loaded and resolver.loaded
+    assert resolver.stats["stored"] == dedup.stats["rows"] == 5
@@ -0,0 +1,74 @@
+import pytest
+
+from config.settings import settings
+from scrapers import instagram_scraper
+from scrapers.instagram_scraper import InstagramScraper
+from utils.adaptive_limiter import AdaptiveLimiter
+from utils.proxy_pool import proxy_pool
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, user: dict | None = None, headers: dict | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"{}"
+        self._user = user
+
+    def json(self) -> dict:
+        return {"data": {"user": self._user}}
+
+
+class FakeInstagram:
+    """Stands in for curl_cffi's requests.get: serves queued responses and records the proxies used."""
+
+    def __init__(self, *responses: FakeResponse):
+        self.responses = list(responses)
+        self.proxies: list[dict | None] = []
+
+    def get(self, url, headers=None, proxies=None, impersonate=None, timeout=None):
+        self.proxies.append(proxies)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def direct(monkeypatch):
+    """An InstagramScraper with no proxies, on a fresh direct limiter."""
+    monkeypatch.setattr(settings, "instagram_max_wait_seconds", 5)
+    monkeypatch.setattr(proxy_pool, "proxies", [])
+    limiter = AdaptiveLimiter("Instagram")
+    monkeypatch.setattr(instagram_scraper, "instagram_limiter", limiter)
+
+    def build(*responses: FakeResponse) -> tuple[InstagramScraper, FakeInstagram, AdaptiveLimiter]:
+        instagram = FakeInstagram(*responses)
+        monkeypatch.setattr(instagram_scraper.cffi_requests, "get", instagram.get)
+        return InstagramScraper(), instagram, limiter
+
+    return build
+
+
+def test_direct_requests_are_paced_by_the_instagram_limiter(direct):
+    user = {"edge_followed_by": {"count": 800}, "biography": "salon", "edge_owner_to_timeline_media": {"edges": []}}
+    scraper, instagram, limiter = direct(FakeResponse(200, user))
+    rate = limiter.rate
+
+    profile = scraper._fetch_profile("salon_anna")
+
+    assert profile["followers"] == 800
+    assert instagram.proxies == [None]
+    assert limiter.stats["requests"] == 1
+    assert limiter.stats["successes"] == 1
+    assert limiter.rate > rate
+
+
+def test_direct_429_cools_down_instead_of_disabling(direct):
+    scraper, instagram, limiter = direct(FakeResponse(429, headers={"retry-after": "600"}))
+
+    assert scraper._fetch_profile("salon_anna") is None
+    # The next profile is skipped during the cooldown, without a request
+    assert scraper._fetch_profile("salon_bella") is None
+
+    assert len(instagram.proxies) == 1
+    assert limiter.stats["throttled"] == 1
+    assert limiter.stats["skipped"] == 1
+    assert limiter.resume_in() > 500
+    assert scraper._available
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config.settings import settings
+from scrapers import instagram_scraper
+from scrapers.instagram_scraper import InstagramScraper
+
+NOW = datetime.now(timezone.utc)
+
+
+def _post(n: int, days: float, likes: int = 10, comments: int = 1) -> dict:
+    return {
+        "post_url": f"https://www.instagram.com/p/{n}/",
+        "post_date": (NOW - timedelta(days=days)).isoformat(),
+        "caption": f"post {n}",
+        "likes": likes,
+        "comments": comments,
+        "post_type": "photo",
+        "is_video": False,
+        "video_view_count": None,
+    }
+
+
+def _row(post: dict, id: str | None = None) -> dict:
+    return {
+        "id": id or f"row-{post['post_url']}",
+        "post_url": post["post_url"],
+        "post_date": post["post_date"],
+        "caption": post["caption"],
+        "likes": post["likes"],
+        "comments": post["comments"],
+        "views": post["video_view_count"],
+        "post_type": post["post_type"],
+    }
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(settings, "instagram_post_refresh_days", 14)
+    monkeypatch.setattr(settings, "instagram_post_history", 50)
+    return InstagramScraper()
+
+
+def _urls(posts: list[dict]) -> list[str]:
+    return [p["post_url"].split("/")[-2] for p in posts]
+
+
+def test_nothing_stored_means_no_merge(scraper):
+    assert scraper._merge_posts([_post(1, 1)], [], NOW) is None
+
+
+def test_new_posts_written_and_recent_counts_refreshed(scraper):
+    stored = [_row(_post(2, 5)), _row(_post(3, 40))]
+    fetched = [_post(1, 1), _post(2, 5, likes=25), _post(3, 40, likes=99)]
+
+    merge = scraper._merge_posts(fetched, stored, NOW)
+
+    assert (merge["new"], merge["refreshed"]) == (1, 1)
+    assert _urls(merge["writes"]) == ["1", "2"]
+    # Outside the refresh window the stored counts stand
+    assert [p["likes"] for p in merge["posts"]] == [10, 25, 10]
+    assert merge["trim_ids"] == []
+
+
+def test_unchanged_recent_counts_are_not_rewritten(scraper):
+    stored = [_row(_post(1, 2))]
+
+    merge = scraper._merge_posts([_post(1, 2)], stored, NOW)
+
+    assert (merge["new"], merge["refreshed"], merge["writes"]) == (0, 0, [])
+
+
+def test_old_unstored_posts_behind_the_watermark_are_skipped(scraper):
+    # 4 is older than the newest stored post and the refresh window: trimmed before
+    stored = [_row(_post(2, 3)), _row(_post(3, 30))]
+    fetched = [_post(2, 3), _post(3, 30), _post(4, 60)]
+
+    merge = scraper._merge_posts(fetched, stored, NOW)
+
+    assert merge["new"] == 0
+    assert "4" not in _urls(merge["posts"])
+    assert merge["writes"] == []
+
+
+def test_unstored_posts_inside_the_refresh_window_are_written(scraper):
+    # Older than the watermark, but recent enough to matter
+    stored = [_row(_post(1, 1)), _row(_post(3, 30))]
+    fetched = [_post(1, 1), _post(2, 6), _post(3, 30)]
+
+    merge = scraper._merge_posts(fetched, stored, NOW)
+
+    assert merge["new"] == 1
+    assert _urls(merge["writes"]) == ["2"]
+    assert _urls(merge["posts"]) == ["1", "2", "3"]
+
+
+def test_history_is_trimmed_to_the_newest_posts(scraper, monkeypatch):
+    monkeypatch.setattr(settings, "instagram_post_history", 2)
+    stored = [_row(_post(2, 20), "r2"), _row(_post(3, 30), "r3")]
+    fetched = [_post(1, 1), _post(2, 20), _post(3, 30)]
+
+    merge = scraper._merge_posts(fetched, stored, NOW)
+
+    assert _urls(merge["posts"]) == ["1", "2"]
+    assert merge["trim_ids"] == ["r3"]
+
+
+def test_incremental_save_upserts_new_posts_and_trims(scraper, memory_db, monkeypatch):
+    monkeypatch.setattr(instagram_scraper, "db", memory_db)
+    monkeypatch.setattr(settings, "instagram_incremental_posts", True)
+    monkeypatch.setattr(settings, "instagram_post_history", 3)
+    profile = {"username": "salon_anna", "profile_url": "https://www.instagram.com/salon_anna/", "followers": 500}
+
+    first = scraper.save_profile_to_supabase("lead-1", {**profile, "posts": [_post(2, 3), _post(3, 30), _post(4, 45)]})
+    second = scraper.save_profile_to_supabase("lead-1", {
+        **profile, "posts": [_post(1, 1), _post(2, 3, likes=40), _post(3, 30), _post(4, 45), _post(5, 90)],
+    })
+
+    assert first == second
+    rows = sorted(memory_db.tables["prospect_posts"], key=lambda r: r["post_date"], reverse=True)
+    assert _urls(rows) == ["1", "2", "3"]
+    assert rows[1]["likes"] == 40
+    profile_row = memory_db.tables["prospect_social_profiles"][0]
+    assert profile_row["last_post_date"] == _post(1, 1)["post_date"]
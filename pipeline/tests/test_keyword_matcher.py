@@ -0,0 +1,92 @@
+import random
+import re
+
+import pytest
+
+from utils import keyword_matcher
+from utils.keyword_matcher import KeywordMatcher
+
+GROUPS = {
+    "negative": ["slow", "poor", "nightmare"],
+    "slow response times": ["slow response", "slow service"],
+    "booking": ["book now", "appointment", "link in bio"],
+    "tools": ["linktr.ee", "linktree", "canva.com"],
+    "short": ["bts", "tip", "% off"],
+}
+WHOLE = ["bts", "tip"]
+
+WORDS = ["slow", "slowslow", "response", "service", "poor", "nightmare", "book", "now", "appointment",
+         "link", "in", "bio", "linktr.ee/anna", "linktree", "canva.com", "bts", "tips", "tip", "20%", "off",
+         "Slow", "SERVICE", "hairtip", "the", "salon", "!", ",", "\n"]
+
+
+def corpus(count: int = 500, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 25))) for _ in range(count)]
+
+
+@pytest.fixture(params=["aho-corasick", "regex"])
+def build(request, monkeypatch):
+    """KeywordMatcher factory for one engine."""
+    if request.param == "regex":
+        monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    elif keyword_matcher.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+
+    def make(groups=GROUPS, **kwargs):
+        matcher = KeywordMatcher(groups, **kwargs)
+        assert matcher.engine == request.param
+        return matcher
+
+    return make
+
+
+def test_backends_agree(monkeypatch):
+    if keyword_matcher.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+    aho = KeywordMatcher(GROUPS, whole_words=WHOLE)
+    monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    regex = KeywordMatcher(GROUPS, whole_words=WHOLE)
+
+    for text in corpus():
+        assert sorted(aho.hits(text)) == sorted(regex.hits(text))
+        assert aho.keywords(text) == regex.keywords(text)
+        assert aho.counts(text) == regex.counts(text)
+        assert aho.top(text) == regex.top(text)
+
+
+def test_counts_match_str_count(build):
+    groups = {cat: kws for cat, kws in GROUPS.items() if cat != "short"}
+    matcher = build(groups)
+    for text in corpus(200):
+        lowered = text.lower()
+        expected = {cat: sum(lowered.count(kw) for kw in kws) for cat, kws in groups.items()}
+        assert {cat: matcher.counts(text)[cat] for cat in groups} == expected
+
+
+def test_categories_match_substring_checks(build):
+    matcher = build()
+    for text in corpus(200):
+        lowered = text.lower()
+        assert matcher.categories(text) == {cat for cat, kws in GROUPS.items() if any(kw in lowered for kw in kws)}
+
+
+def test_overlapping_and_shared_prefix_hits(build):
+    matcher = build()
+    assert sorted(h.keyword for h in matcher.hits("Slow response, linktree")) == [
+        "linktree", "slow", "slow response",
+    ]
+
+
+def test_whole_words(build):
+    matcher = build(whole_words=WHOLE)
+    text = "hairtip and bts, tips: tip"
+    starts = [h.start for h in matcher.hits(text) if h.keyword == "tip"]
+    assert starts == [m.start() for m in re.finditer(r"\btip\b", text)]
+    assert matcher.keywords("hairtips only") == set()
+
+
+def test_top_follows_priorities(build):
+    matcher = build(priorities={"booking": 10, "negative": 1})
+    assert matcher.top("slow, book now") == "booking"
+    assert matcher.top("nothing here") is None
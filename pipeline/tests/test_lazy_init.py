@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+
+from config.database import LazyClient
+from orchestrator.main_orchestrator import MainOrchestrator, _Component
+from tests.conftest import seed_leads
+
+
+class SlowComponent:
+    """Counts constructions; slow enough that racing threads overlap."""
+
+    built = 0
+
+    def __init__(self):
+        time.sleep(0.02)
+        type(self).built += 1
+
+
+class Owner:
+    part = _Component(f"{__name__}:SlowComponent")
+
+
+def test_orchestrator_builds_no_component_up_front():
+    modules = set(sys.modules)
+    orchestrator = MainOrchestrator()
+
+    assert not set(orchestrator.__dict__) & {"outscraper", "ig_scraper", "enricher", "scorer", "insight_gen"}
+    assert set(sys.modules) == modules
+
+
+def test_component_is_built_once_on_first_use(monkeypatch):
+    monkeypatch.setattr(SlowComponent, "built", 0)
+    owner = Owner()
+    parts = []
+
+    threads = [threading.Thread(target=lambda: parts.append(owner.part)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert SlowComponent.built == 1
+    assert all(part is parts[0] for part in parts)
+    # Each owner gets its own
+    assert Owner().part is not parts[0]
+    assert SlowComponent.built == 2
+
+
+def test_lazy_client_connects_on_first_query(store):
+    seed_leads(store, 2)
+    opened = []
+
+    def factory():
+        opened.append(store)
+        return store
+
+    client = LazyClient(factory)
+    assert opened == []
+
+    rows = client.table("outreach_leads").select("id").execute().data
+
+    assert len(rows) == 2
+    client.table("outreach_leads").select("id").limit(1).execute()
+    assert opened == [store]
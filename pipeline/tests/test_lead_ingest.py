@@ -0,0 +1,43 @@
+import pytest
+
+from config.settings import settings
+from utils import lead_ingest
+from utils.lead_ingest import ingest_leads, lead_dedup_key
+
+
+@pytest.fixture(params=[True, False], ids=["dedup-key", "plain-insert"])
+def ingest_store(request, memory_db, monkeypatch):
+    monkeypatch.setattr(settings, "lead_dedup_key", request.param)
+    monkeypatch.setattr(settings, "entity_resolution", False)
+    monkeypatch.setattr(lead_ingest, "db", memory_db)
+    return memory_db
+
+
+def test_dedup_key_normalization():
+    assert lead_dedup_key("Salon  Anna-GmbH!", "München ") == "salon anna gmbh|münchen"
+    assert lead_dedup_key(None, None) == "|"
+
+
+def test_ingest_skips_stored_and_batch_duplicates(ingest_store):
+    first = ingest_leads([{"business_name": "Salon Anna", "city": "Munich", "google_place_id": "p1"}], "test")
+    second = ingest_leads([
+        {"business_name": "Salon Anna", "city": "Munich"},
+        {"business_name": "Hair Studio", "city": "Munich"},
+        {"business_name": "hair studio", "city": "munich"},
+        {"business_name": None},
+    ], "test")
+
+    assert (first["saved"], first["skipped"]) == (1, 0)
+    assert (second["saved"], second["skipped"], second["errors"]) == (1, 2, 1)
+    assert second["inserted"][0]["dedup_key"] == "hair studio|munich"
+    assert len(ingest_store.tables["outreach_leads"]) == 2
+
+
+def test_plain_inserts_leave_out_migration_columns(ingest_store):
+    ingest_leads([{"business_name": "Salon Anna", "city": "Munich", "google_place_id": "p1"}], "test")
+
+    row = ingest_store.tables["outreach_leads"][0]
+    if settings.lead_dedup_key:
+        assert (row["dedup_key"], row["google_place_id"]) == ("salon anna|munich", "p1")
+    else:
+        assert "dedup_key" not in row and "google_place_id" not in row
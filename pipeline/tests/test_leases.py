@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from tests.conftest import seed_leads
+from utils.leases import LeaseManager, STAGE_CLAIMS
+
+
+def test_claim_leases_each_lead_once(store):
+    seed_leads(store, 5)
+    first = LeaseManager(owner="a", client=store, lease_seconds=60)
+    second = LeaseManager(owner="b", client=store, lease_seconds=60)
+
+    claimed_a = first.claim("enrich", 3)
+    claimed_b = second.claim("enrich", 10)
+
+    assert len(claimed_a) == 3 and len(claimed_b) == 2
+    assert not {r["id"] for r in claimed_a} & {r["id"] for r in claimed_b}
+    assert all(r["enrichment_status"] == "in_progress" for r in claimed_a + claimed_b)
+    assert second.claim("enrich", 10) == []
+
+
+def test_concurrent_claims_are_disjoint(store):
+    seed_leads(store, 60)
+    managers = [LeaseManager(owner=f"w{i}", client=store, lease_seconds=60) for i in range(6)]
+    results: dict[str, list[str]] = {}
+
+    def work(manager):
+        ids = []
+        while batch := manager.claim("enrich", 4):
+            ids += [r["id"] for r in batch]
+        results[manager.owner] = ids
+
+    threads = [threading.Thread(target=work, args=(m,)) for m in managers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    claimed = [lead_id for ids in results.values() for lead_id in ids]
+    assert len(claimed) == 60
+    assert len(set(claimed)) == 60
+
+
+def test_advance_is_compare_and_set(store):
+    lead = seed_leads(store, 1)[0]
+    manager = LeaseManager(owner="a", client=store, lease_seconds=60)
+    manager.claim("enrich", 1)
+
+    assert manager.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+    # The lead already left 'scraped': a second transition from it is stale
+    assert not manager.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+
+    row = store.table("outreach_leads").select("*").eq("id", lead["id"]).single().execute().data
+    assert row["pipeline_status"] == "enriched"
+    assert row["lease_owner"] is None
+
+
+def test_advance_requires_the_lease(store):
+    lead = seed_leads(store, 1)[0]
+    holder = LeaseManager(owner="holder", client=store, lease_seconds=60)
+    other = LeaseManager(owner="other", client=store, lease_seconds=60)
+    holder.claim("enrich", 1)
+
+    assert not other.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+    assert holder.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+
+
+def test_racing_advances_land_once(store):
+    lead = seed_leads(store, 1)[0]
+    manager = LeaseManager(owner="a", client=store, lease_seconds=60)
+    manager.claim("enrich", 1)
+    wins = []
+
+    def advance():
+        wins.append(manager.advance(lead["id"], "scraped", {"pipeline_status": "enriched"}))
+
+    threads = [threading.Thread(target=advance) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert wins.count(True) == 1
+
+
+def test_expired_lease_is_reclaimed(store):
+    lead = seed_leads(store, 1)[0]
+    crashed = LeaseManager(owner="crashed", client=store, lease_seconds=60)
+    crashed.claim("enrich", 1)
+    past = (datetime.now(timezone.utc) - timedelta(seconds=5)).isoformat()
+    store.table("outreach_leads").update({"lease_expires_at": past}).eq("id", lead["id"]).execute()
+
+    survivor = LeaseManager(owner="survivor", client=store, lease_seconds=60)
+    # enrichment_status is already 'in_progress'; the expired same-stage lease still qualifies
+    assert [r["id"] for r in survivor.claim("enrich", 1)] == [lead["id"]]
+    assert not crashed.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+    assert survivor.advance(lead["id"], "scraped", {"pipeline_status": "enriched"})
+
+
+def test_stage_filters(store):
+    seed_leads(store, 2, pipeline_status="scored", score_tier="TIER_1")
+    seed_leads(store, 1, pipeline_status="scored", score_tier="TIER_4")
+    seed_leads(store, 1, pipeline_status="insights_generated", contact_email=None)
+    manager = LeaseManager(owner="a", client=store, lease_seconds=60)
+
+    assert len(manager.claim("insights", 10)) == 2
+    assert manager.claim("emails", 10) == []
+    assert set(STAGE_CLAIMS) == {"enrich", "score", "insights", "emails", "upload"}
+
+
+def test_release_all_drops_only_own_leases(store):
+    seed_leads(store, 4)
+    mine = LeaseManager(owner="mine", client=store, lease_seconds=60)
+    theirs = LeaseManager(owner="theirs", client=store, lease_seconds=60)
+    mine.claim("enrich", 2)
+    theirs.claim("enrich", 2)
+
+    mine.release_all()
+
+    owners = [r["lease_owner"] for r in store.table("outreach_leads").select("lease_owner").execute().data]
+    assert sorted(o for o in owners if o) == ["theirs", "theirs"]
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import llm_scheduler as llm_scheduler_module
+from utils.llm_scheduler import LLMScheduler, TokenBucket
+
+
+class RateLimitError(Exception):
+    """Shaped like openai.RateLimitError: status 429 and the response headers."""
+
+    status_code = 429
+
+    def __init__(self, headers: dict):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _response(total_tokens: int):
+    return SimpleNamespace(usage=SimpleNamespace(total_tokens=total_tokens))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the scheduler's sleeps instead of taking them."""
+    slept: list[float] = []
+    monkeypatch.setattr(llm_scheduler_module.time, "sleep", slept.append)
+    return slept
+
+
+def test_bucket_waits_out_its_debt():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    # Third request within the same instant: one token short at 1 token/s
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_calls_beyond_the_request_budget_wait_instead_of_sleeping_fixed(sleeps):
+    scheduler = LLMScheduler(requests_per_minute=120, tokens_per_minute=1_000_000)
+    scheduler.request_bucket = TokenBucket(rate_per_minute=120, capacity=2)
+
+    for _ in range(3):
+        scheduler.call(lambda: _response(10), est_tokens=10)
+
+    # The first two fit in the burst; the third waits half a second (120/min)
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.5, abs=0.05)
+    assert scheduler.stats()["requests"] == 3
+
+
+def test_429_honors_retry_after_and_slows_the_request_rate(sleeps):
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=1_000_000)
+    attempts = []
+
+    def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimitError({"retry-after": "7"})
+        return _response(100)
+
+    scheduler.call(create, est_tokens=500)
+
+    stats = scheduler.stats()
+    assert len(attempts) == 2
+    assert sleeps and sleeps[0] == pytest.approx(7, abs=0.1)
+    assert stats["rate_limited"] == 1
+    assert stats["requests"] == 1
+    # Halved on the 429, then one recovery step after the success
+    assert stats["effective_rpm"] == pytest.approx(60 * (0.5 + LLMScheduler.RECOVERY_STEP), abs=0.1)
+    # Charged the real usage, not the estimate
+    assert stats["tokens_used"] == 100
+
+
+def test_other_errors_are_not_retried(sleeps):
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=1_000_000)
+
+    def create():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call(create)
+
+    assert scheduler.stats()["failures"] == 1
+    assert sleeps == []
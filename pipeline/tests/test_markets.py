@@ -0,0 +1,78 @@
+from config.settings import settings
+from orchestrator import markets
+from orchestrator.main_orchestrator import MainOrchestrator
+from tests.conftest import seed_leads
+from utils import lead_ingest
+from utils.lead_ingest import ingest_leads
+from utils.leases import LeaseManager
+
+
+def test_scoped_claim_stays_in_market(store):
+    seed_leads(store, 3, city="München", industry="Hair Salon", market="munich germany|all categories")
+    seed_leads(store, 3, city="Berlin", industry="Hair Salon", market="berlin germany|all categories")
+    seed_leads(store, 3, city="Munich", industry="Nail Salon")
+    manager = LeaseManager(owner="a", client=store, lease_seconds=60)
+
+    claimed = manager.claim("enrich", 10, {"market": "munich germany|all categories"})
+
+    assert len(claimed) == 3
+    assert {r["city"] for r in claimed} == {"München"}
+    # Without a scope the other markets' leads are still claimable
+    assert len(manager.claim("enrich", 10)) == 6
+
+
+def test_market_scope_follows_applied_market(monkeypatch):
+    monkeypatch.setattr(settings, "target_location", "Munich, Germany")
+    monkeypatch.setattr(settings, "target_category", "Hair Salon")
+    monkeypatch.setattr(settings, "market", "")
+    assert markets.market_scope() == {}
+
+    markets.apply_market({"location": "Berlin, Germany", "category": "Barber"})
+
+    assert markets.market_scope() == {"market": "berlin germany|barber"}
+
+
+def test_ingested_leads_carry_the_market(store, monkeypatch):
+    """Any scraped category and spelling of the city lands in the running market."""
+    monkeypatch.setattr(lead_ingest, "db", store)
+    monkeypatch.setattr(settings, "lead_dedup_key", False)
+    monkeypatch.setattr(settings, "entity_resolution", False)
+    for key in ("target_location", "target_city", "target_category", "market"):
+        monkeypatch.setattr(settings, key, getattr(settings, key))
+    markets.apply_market({"location": "Munich, Germany", "category": "All Categories"})
+    waiting = {"pipeline_status": "scraped", "enrichment_status": "pending"}
+    ingest_leads([
+        {"business_name": "Salon Anna", "city": "München", "industry": "Hair Salon", **waiting},
+        {"business_name": "Pizzeria Roma", "city": "Munich", "industry": "Restaurant", **waiting},
+    ], "test")
+    seed_leads(store, 2, city="Munich", industry="Hair Salon", market="berlin germany|all categories")
+
+    claimed = LeaseManager(owner="a", client=store, lease_seconds=60).claim("enrich", 10, markets.market_scope())
+
+    assert sorted(r["business_name"] for r in claimed) == ["Pizzeria Roma", "Salon Anna"]
+
+
+def test_each_market_starts_from_the_snapshot(monkeypatch):
+    seen = []
+
+    def run_daily_workflow(self, market=None, reload_settings=True):
+        markets.apply_market(market)
+        seen.append((settings.target_category, settings.daily_scrape_target, settings.target_state))
+        return {}
+
+    monkeypatch.setattr(MainOrchestrator, "run_daily_workflow", run_daily_workflow)
+    for key in ("target_location", "target_city", "target_category", "daily_scrape_target", "market",
+                "target_state", "claude_requests_per_minute", "claude_tokens_per_minute", "lead_leases"):
+        monkeypatch.setattr(settings, key, getattr(settings, key))
+    snapshot = {**settings.model_dump(), "target_category": "Hair Salon",
+                "daily_scrape_target": 50, "target_state": "Bavaria"}
+    monkeypatch.setattr(markets, "_worker_settings", {})
+    monkeypatch.setattr(markets, "install_shared_limits", lambda *args: None)
+    markets._init_worker(snapshot, {}, None, None, 2)
+
+    markets._run_market({"location": "Berlin", "category": "Barber", "daily_target": 5, "state": "Berlin"})
+    markets._run_market({"location": "Hamburg"})
+
+    assert seen == [("Barber", 5, "Berlin"), ("Hair Salon", 50, "Bavaria")]
+    assert settings.lead_leases is True
+    assert settings.claude_requests_per_minute == max(1, snapshot["claude_requests_per_minute"] // 2)
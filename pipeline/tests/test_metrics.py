@@ -0,0 +1,83 @@
+import pytest
+
+from orchestrator import main_orchestrator
+from orchestrator.main_orchestrator import MainOrchestrator
+from utils.metrics import Metrics
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(main_orchestrator, "metrics", metrics)
+    return metrics
+
+
+def _record_latencies(metrics: Metrics, kind: str, name: str, count: int = 100):
+    """Latencies 1ms..`count`ms, so the quantiles are known."""
+    for ms in range(count, 0, -1):
+        metrics.record(kind, name, ms / 1000, nbytes=10, error=ms % 25 == 0)
+
+
+def test_summary_reports_percentiles_per_dependency(metrics):
+    _record_latencies(metrics, "call", "outscraper")
+    metrics.record("call", "instagram", 0.2)
+
+    calls = metrics.summary()["calls"]
+
+    assert calls["outscraper"] == {
+        "count": 100, "errors": 4, "bytes": 1000, "total_seconds": 5.05,
+        "p50_ms": 51.0, "p95_ms": 96.0, "max_ms": 100.0,
+    }
+    assert calls["instagram"]["p50_ms"] == calls["instagram"]["max_ms"] == 200.0
+
+
+def test_call_timer_counts_http_errors_and_exceptions(metrics):
+    class Response:
+        content = b"x" * 42
+        status_code = 503
+
+    with metrics.call("website") as call:
+        call.response(Response())
+    with pytest.raises(TimeoutError):
+        with metrics.call("website"):
+            raise TimeoutError
+    with metrics.call("website") as call:
+        call.response(type("NotFound", (), {"status_code": 404, "content": b""})())
+
+    website = metrics.summary()["calls"]["website"]
+    assert (website["count"], website["errors"], website["bytes"]) == (3, 2, 42)
+
+
+def test_prometheus_export_has_counters_and_quantiles(metrics, tmp_path):
+    _record_latencies(metrics, "stage", "enrich")
+    _record_latencies(metrics, "call", "yelp", count=20)
+
+    path = tmp_path / "run.prom"
+    metrics.export(str(path), labels={"run_id": "r1"})
+    lines = path.read_text().splitlines()
+
+    assert 'geospark_stage_count{stage="enrich",run_id="r1"} 100' in lines
+    assert 'geospark_stage_latency_seconds{stage="enrich",quantile="0.95",run_id="r1"} 0.096' in lines
+    assert 'geospark_call_bytes{dependency="yelp",run_id="r1"} 200' in lines
+    assert 'geospark_call_latency_seconds{dependency="yelp",quantile="1",run_id="r1"} 0.02' in lines
+    # Stages have no response bytes
+    assert not any(line.startswith("geospark_stage_bytes") for line in lines)
+    assert "# TYPE geospark_call_latency_seconds summary" in lines
+
+
+def test_run_row_stores_the_summary(store, metrics, monkeypatch):
+    monkeypatch.setattr(main_orchestrator, "db", store)
+    orchestrator = MainOrchestrator()
+    run_id = orchestrator._start_run()
+    _record_latencies(metrics, "stage", "score", count=10)
+
+    orchestrator._finish_run(run_id, {
+        "scraped": 0, "enriched": 0, "scored": 10, "insights_generated": 0,
+        "emails_generated": 0, "uploaded": 0, "errors": [],
+    }, duration=1)
+
+    run = store.table("pipeline_runs").select("*").eq("id", run_id).single().execute().data
+    assert run["status"] == "completed"
+    assert run["metrics"]["stages"]["score"]["count"] == 10
+    assert run["metrics"]["stages"]["score"]["p95_ms"] == 10.0
+    assert "llm_scheduler" in run["metrics"]
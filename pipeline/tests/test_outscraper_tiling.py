@@ -0,0 +1,73 @@
+import pytest
+
+from config.settings import settings
+from scrapers import outscraper_scraper
+from scrapers.outscraper_scraper import OutscraperScraper
+
+QUERY = "Hair Salon in Munich, Germany"
+
+
+def _places(count: int, start: int = 0) -> list[dict]:
+    return [
+        {"place_id": f"p{i}", "name": f"Salon {i}", "latitude": 48.10 + i * 0.01, "longitude": 11.50 + i * 0.01}
+        for i in range(start, start + count)
+    ]
+
+
+class FakeOutscraper:
+    """Stands in for OutscraperScraper._search: records (limit, coordinates) and serves `base` city-wide."""
+
+    def __init__(self, base: list[dict]):
+        self.base = base
+        self.calls: list[tuple[int, str]] = []
+
+    def search(self, query: str, limit: int, skip: int = 0, coordinates: str = "") -> list[dict]:
+        self.calls.append((limit, coordinates))
+        if coordinates:
+            return _places(limit, start=1000 + len(self.calls) * limit)
+        return self.base[:limit]
+
+
+@pytest.fixture
+def tiled(monkeypatch):
+    monkeypatch.setattr(settings, "outscraper_tiling", True)
+    monkeypatch.setattr(settings, "outscraper_incremental", False)
+    monkeypatch.setattr(settings, "outscraper_tile_max_queries", 4)
+
+    def build(base: list[dict]) -> tuple[OutscraperScraper, FakeOutscraper]:
+        scraper = OutscraperScraper()
+        fake = FakeOutscraper(base)
+        monkeypatch.setattr(scraper, "_search", fake.search)
+        return scraper, fake
+
+    return build
+
+
+def test_city_query_asks_for_no_more_than_the_limit(tiled):
+    scraper, fake = tiled(_places(100))
+
+    found = scraper._scrape_tiled(QUERY, 5)
+
+    assert [p["place_id"] for p in found] == ["p0", "p1", "p2", "p3", "p4"]
+    assert fake.calls == [(5, "")]
+
+
+def test_partial_city_page_is_not_tiled(tiled):
+    scraper, fake = tiled(_places(3))
+
+    found = scraper._scrape_tiled(QUERY, 5)
+
+    assert len(found) == 3
+    assert fake.calls == [(5, "")]
+
+
+def test_full_city_page_of_stored_places_is_tiled(tiled, monkeypatch):
+    scraper, fake = tiled(_places(5))
+    monkeypatch.setattr(outscraper_scraper.dedup_index, "holds_place", lambda place_id: place_id in {"p0", "p1"})
+
+    found = scraper._scrape_tiled(QUERY, 5)
+
+    assert [p["place_id"] for p in found[:3]] == ["p2", "p3", "p4"]
+    assert len(found) == 5
+    assert fake.calls[0] == (5, "")
+    assert all(coordinates for _, coordinates in fake.calls[1:])
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scrapers.instagram_scraper import InstagramScraper
+from utils import profile_analytics
+from utils.profile_analytics import reanalyze_stored_profiles
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def _date(days: float) -> str:
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+PROFILES = {
+    # id: (followers, posts newest first)
+    "p1": (1200, [
+        {"post_date": _date(1), "likes": 90, "comments": 4, "post_type": "reel"},
+        {"post_date": _date(9), "likes": 40, "comments": 2, "post_type": "photo"},
+        {"post_date": _date(45), "likes": 60, "comments": 0, "post_type": "carousel"},
+    ]),
+    "p2": (300, [
+        {"post_date": _date(3), "likes": None, "comments": None, "post_type": None},
+        {"post_date": None, "likes": 5, "comments": 1, "post_type": "photo"},
+    ]),
+    "p3": (0, [{"post_date": _date(2), "likes": 10, "comments": 1, "post_type": "photo"}]),
+    "p4": (None, []),
+    "p5": (800, [{"post_date": _date(days), "likes": 30 + days, "comments": days % 3, "post_type": "video"}
+                 for days in range(0, 60, 7)]),
+}
+
+
+@pytest.fixture
+def profile_store(memory_db, monkeypatch):
+    monkeypatch.setattr(profile_analytics, "db", memory_db)
+    memory_db.seed("prospect_social_profiles", [
+        {"id": pid, "lead_id": f"lead-{pid}", "platform": "instagram", "followers": followers,
+         "raw_data": {"bio": f"bio {pid}"}}
+        for pid, (followers, _) in PROFILES.items()
+    ])
+    memory_db.seed("prospect_posts", [
+        {**post, "social_profile_id": pid} for pid, (_, posts) in PROFILES.items() for post in posts
+    ])
+    return memory_db
+
+
+def _expected(pid: str) -> tuple[dict, dict]:
+    """What scrape_profile() computes for the same posts."""
+    followers, rows = PROFILES[pid]
+    posts = [{"post_date": r["post_date"], "likes": r["likes"] or 0, "comments": r["comments"] or 0,
+              "post_type": r["post_type"] or "photo"} for r in rows]
+    if any(r["post_date"] is None for r in rows):
+        posts.sort(key=lambda p: p["post_date"] is not None)  # NULL dates read first (DESC)
+    return (InstagramScraper._calculate_engagement(posts, followers or 0),
+            InstagramScraper._analyze_posting_patterns(posts, NOW))
+
+
+def _stored(store) -> dict[str, dict]:
+    return {row["id"]: row for row in store.tables["prospect_social_profiles"]}
+
+
+@pytest.mark.parametrize("page_size, ids_per_query", [(1000, 100), (2, 2)], ids=["one-page", "paged"])
+def test_reanalysis_matches_per_profile_methods(profile_store, monkeypatch, page_size, ids_per_query):
+    monkeypatch.setattr(profile_analytics, "PAGE_SIZE", page_size)
+    monkeypatch.setattr(profile_analytics, "_IDS_PER_QUERY", ids_per_query)
+
+    assert reanalyze_stored_profiles(now=NOW) == len(PROFILES)
+
+    rows = _stored(profile_store)
+    for pid in PROFILES:
+        engagement, patterns = _expected(pid)
+        row = rows[pid]
+        assert row["raw_data"]["engagement_details"] == engagement
+        assert row["raw_data"]["posting_patterns"] == patterns
+        assert row["raw_data"]["bio"] == f"bio {pid}"
+        assert row["engagement_rate"] == engagement["avg_engagement_rate"]
+        assert row["posts_last_30_days"] == patterns["posts_last_30_days"]
+        assert row["last_post_date"] == patterns.get("last_post_date")
+        assert row["posting_frequency"] == patterns["posts_per_month"]
+
+
+def test_failed_post_read_leaves_the_page_untouched(profile_store, monkeypatch):
+    def fail(profile_ids):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(profile_analytics, "_stored_posts", fail)
+
+    assert reanalyze_stored_profiles(now=NOW) == 0
+    assert all("engagement_details" not in row["raw_data"] for row in _stored(profile_store).values())
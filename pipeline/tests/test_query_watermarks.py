@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config.settings import settings
+from scrapers import outscraper_scraper
+from scrapers.outscraper_scraper import OutscraperScraper
+from utils import query_watermarks as watermarks_module
+from utils.query_watermarks import TABLE, QueryWatermarks, query_key
+
+QUERY = "Hair Salon in Munich, Germany"
+
+
+class FakeOutscraper:
+    """Stands in for OutscraperScraper._search over a fixed result list, honoring skip; records skips."""
+
+    def __init__(self, total: int):
+        self.places = [{"place_id": f"p{i}", "name": f"Salon {i}"} for i in range(total)]
+        self.skips: list[int] = []
+
+    def search(self, query: str, limit: int, skip: int = 0, coordinates: str = "") -> list[dict]:
+        self.skips.append(skip)
+        return self.places[skip:skip + limit]
+
+
+@pytest.fixture
+def harvest(store, monkeypatch):
+    """Runs _harvest as a fresh process would: watermarks start empty and are read from `store`."""
+    monkeypatch.setattr(watermarks_module, "db", store)
+    monkeypatch.setattr(settings, "outscraper_max_pages_per_query", 2)
+    monkeypatch.setattr(settings, "outscraper_recheck_days", 30)
+    outscraper = FakeOutscraper(7)
+
+    def run(limit: int) -> list[str]:
+        watermarks = QueryWatermarks()
+        monkeypatch.setattr(outscraper_scraper, "query_watermarks", watermarks)
+        scraper = OutscraperScraper()
+        monkeypatch.setattr(scraper, "_search", outscraper.search)
+        return [p["place_id"] for p in scraper._harvest(QUERY, limit)]
+
+    run.outscraper = outscraper
+    return run
+
+
+def _mark(store) -> dict:
+    return store.table(TABLE).select("*").eq("query_key", query_key(QUERY)).single().execute().data
+
+
+def test_runs_page_past_what_earlier_runs_paid_for(store, harvest):
+    assert harvest(3) == ["p0", "p1", "p2"]
+    assert harvest(3) == ["p3", "p4", "p5"]
+    assert harvest.outscraper.skips == [0, 3]
+
+    mark = _mark(store)
+    assert mark["next_skip"] == 6
+    assert mark["place_ids"] == ["p0", "p1", "p2", "p3", "p4", "p5"]
+    assert not mark["exhausted"]
+
+
+def test_short_page_marks_the_query_exhausted(store, harvest):
+    harvest(5)
+
+    assert harvest(5) == ["p5", "p6"]
+    assert _mark(store)["exhausted"]
+    # Nothing left to pay for until the recheck
+    assert harvest(5) == []
+    assert harvest.outscraper.skips == [0, 5]
+
+
+def test_stale_exhausted_query_reopens_and_skips_known_places(store, harvest):
+    harvest(10)
+    long_ago = (datetime.now(timezone.utc) - timedelta(days=31)).isoformat()
+    store.table(TABLE).update({"exhausted_at": long_ago}).eq("query_key", query_key(QUERY)).execute()
+    harvest.outscraper.places.append({"place_id": "p7", "name": "New Salon"})
+
+    assert harvest(10) == ["p7"]
+    assert harvest.outscraper.skips == [0, 0]
+    assert _mark(store)["next_skip"] == 8
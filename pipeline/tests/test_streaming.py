@@ -0,0 +1,59 @@
+import queue
+import threading
+
+from orchestrator import streaming
+from orchestrator.streaming import StreamingPipeline, _DONE
+from tests.conftest import seed_leads
+from utils.write_buffer import LeadWriteBuffer
+
+
+class _Orchestrator:
+    STAGE_LIMITS: dict = {}
+
+
+class _Outbox(queue.Queue):
+    def __init__(self):
+        super().__init__()
+        self.forwarded = threading.Event()
+
+    def put(self, item, *args, **kwargs):
+        super().put(item, *args, **kwargs)
+        if item is not _DONE:
+            self.forwarded.set()
+
+
+def test_each_worker_only_drops_its_own_rejected_leads(memory_db, monkeypatch):
+    buffer = LeadWriteBuffer(client=memory_db, max_rows=100, max_seconds=60)
+    monkeypatch.setattr(streaming, "write_buffer", buffer)
+    stale, fresh = (lead["id"] for lead in seed_leads(memory_db, 2, pipeline_status="enriched"))
+    stale_queued = threading.Event()
+    outbox = _Outbox()
+
+    def score(batch):
+        lead_id = batch[0]
+        if lead_id == stale:
+            # Another worker already moved this lead on: the transition is rejected
+            buffer.update(stale, {"pipeline_status": "scored"}, expect={"pipeline_status": "scraped"})
+            stale_queued.set()
+            outbox.forwarded.wait(2)  # the sibling flushes (and forwards) first
+        else:
+            stale_queued.wait(2)
+            buffer.update(fresh, {"pipeline_status": "scored"}, expect={"pipeline_status": "enriched"})
+        return [lead_id]
+
+    inbox: queue.Queue = queue.Queue()
+    for item in (stale, fresh, _DONE):
+        inbox.put(item)
+    pipeline = StreamingPipeline(_Orchestrator())
+    pipeline._results = {"errors": []}
+    stage = pipeline._stage("score", inbox, outbox, score, 2, 1)
+    stage.start()
+    stage.join(5)
+
+    forwarded = []
+    while not outbox.empty():
+        forwarded.append(outbox.get())
+    assert forwarded == [fresh, _DONE]
+    assert pipeline._results["errors"] == []
+    rows = {r["id"]: r["pipeline_status"] for r in memory_db.tables["outreach_leads"]}
+    assert rows == {stale: "enriched", fresh: "scored"}
@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import database
+from config.database import PoolStats
+from config.settings import settings
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    counter = PoolStats()
+    monkeypatch.setattr(database, "_pool_counter", counter)
+    monkeypatch.setattr(settings, "supabase_http2", False)
+    return counter
+
+
+def test_sequential_requests_reuse_one_connection(server, counter):
+    with database._http_client() as client:
+        for _ in range(5):
+            assert client.get(f"{server}/rest/v1/outreach_leads").status_code == 200
+
+    assert counter.snapshot() == {"requests": 5, "connections_opened": 1, "reuse_rate": 0.8}
+
+
+def test_pool_stats_on_a_local_store(store, counter, monkeypatch):
+    """SQLite (and the memory store) have no HTTP pool: only the configuration is reported."""
+    monkeypatch.setattr(database._shared, "_client", store)
+
+    database.db.table("outreach_leads").select("id").execute()
+    stats = database.pool_stats()
+
+    assert stats["requests"] == 0
+    assert stats["reuse_rate"] is None
+    assert "open" not in stats
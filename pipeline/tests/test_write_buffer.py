@@ -0,0 +1,99 @@
+import time
+
+from orchestrator import main_orchestrator
+from orchestrator.main_orchestrator import MainOrchestrator
+from tests.conftest import seed_leads
+from utils.write_buffer import LeadWriteBuffer
+
+
+def status(store, lead_id: str) -> str:
+    return store.table("outreach_leads").select("pipeline_status").eq("id", lead_id).single().execute().data["pipeline_status"]
+
+
+def test_patches_merge_and_land_in_one_round_trip(store):
+    leads = seed_leads(store, 3)
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=60)
+    for lead in leads:
+        buffer.update(lead["id"], {"enrichment_status": "in_progress"})
+        buffer.update(lead["id"], {"pipeline_status": "enriched"}, {"pipeline_status": "scraped"})
+
+    assert buffer.pending() == 3
+    assert buffer.flush() == set()
+    assert buffer.stats["round_trips"] == 1
+    rows = store.table("outreach_leads").select("pipeline_status, enrichment_status").execute().data
+    assert {(r["pipeline_status"], r["enrichment_status"]) for r in rows} == {("enriched", "in_progress")}
+
+
+def test_stale_expectation_is_rejected(store):
+    fresh, stale = seed_leads(store, 2)
+    store.table("outreach_leads").update({"pipeline_status": "enriched"}).eq("id", stale["id"]).execute()
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=60)
+    for lead in (fresh, stale):
+        buffer.update(lead["id"], {"pipeline_status": "scored"}, {"pipeline_status": "scraped"})
+
+    assert buffer.flush() == {stale["id"]}
+    assert status(store, fresh["id"]) == "scored"
+    assert status(store, stale["id"]) == "enriched"
+
+
+def test_failed_rpc_is_requeued_and_not_reported_as_landed(store, monkeypatch):
+    lead = seed_leads(store, 1)[0]
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=60)
+    buffer.update(lead["id"], {"pipeline_status": "enriched"}, {"pipeline_status": "scraped"})
+    rpc = store.rpc
+
+    def failing_rpc(name, params=None):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(store, "rpc", failing_rpc)
+    assert buffer.flush() == {lead["id"]}
+    assert buffer.pending() == 1
+    assert status(store, lead["id"]) == "scraped"
+
+    monkeypatch.setattr(store, "rpc", rpc)
+    assert buffer.flush() == set()
+    assert status(store, lead["id"]) == "enriched"
+
+
+def test_size_flush_rejections_reach_the_next_flush(store):
+    fresh, stale = seed_leads(store, 2)
+    store.table("outreach_leads").update({"pipeline_status": "enriched"}).eq("id", stale["id"]).execute()
+    buffer = LeadWriteBuffer(client=store, max_rows=2, max_seconds=60)
+    buffer.update(fresh["id"], {"pipeline_status": "scored"}, {"pipeline_status": "scraped"})
+    buffer.update(stale["id"], {"pipeline_status": "scored"}, {"pipeline_status": "scraped"})
+
+    assert buffer.pending() == 0  # flushed by size inside update()
+    assert buffer.flush([fresh["id"]]) == set()
+    assert buffer.flush() == {stale["id"]}
+    assert buffer.flush() == set()
+
+
+def test_timer_flushes_without_further_updates(store):
+    lead = seed_leads(store, 1)[0]
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=0.05)
+    buffer.update(lead["id"], {"pipeline_status": "enriched"}, {"pipeline_status": "scraped"})
+
+    deadline = time.monotonic() + 2
+    while not buffer.stats["flushes"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert buffer.pending() == 0
+    assert status(store, lead["id"]) == "enriched"
+
+
+def test_batch_step_counts_only_its_own_unlanded_writes(store, monkeypatch):
+    earlier, lead = seed_leads(store, 2, pipeline_status="enriched")
+    buffer = LeadWriteBuffer(client=store, max_rows=100, max_seconds=60)
+    monkeypatch.setattr(main_orchestrator, "write_buffer", buffer)
+    # An earlier step's stale transition is still buffered when this step ends
+    buffer.update(earlier["id"], {"pipeline_status": "enriched"}, {"pipeline_status": "scraped"})
+    buffer.update(lead["id"], {"pipeline_status": "scored"}, {"pipeline_status": "enriched"})
+    orchestrator = MainOrchestrator()
+    orchestrator._stage_lead_ids = [lead["id"]]
+
+    assert orchestrator._flush_stage() == 0
+    assert buffer.pending() == 0  # the next step sees every write
+    assert status(store, lead["id"]) == "scored"
+
+    buffer.update(lead["id"], {"pipeline_status": "emailed"}, {"pipeline_status": "insights_generated"})
+    assert orchestrator._flush_stage() == 1
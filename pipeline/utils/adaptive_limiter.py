@@ -0,0 +1,124 @@
+"""
+Adaptive (AIMD) rate limiter for Instagram.
+Each Instagram exit IP has one limiter (per proxy in utils/proxy_pool.py;
+instagram_limiter for direct connections). It paces InstagramScraper's
+profile API calls and the Instaloader queries made by EngagementScraper (via
+its rate controller). The request rate rises additively with each success and
+is cut multiplicatively on a 429, a timeout or a server error, like TCP
+congestion control, so it settles near what Instagram tolerates right now.
+
+A 429 (or several failures in a row) starts a cooldown instead of switching
+Instagram off for the rest of the run. Requests wait until the resume time,
+and cooldowns double while Instagram keeps refusing. Callers that can't wait
+that long pass max_wait and skip the request.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from config.settings import settings
+from utils.logger import logger
+
+# Failures in a row (timeouts, 5xx, connection errors) treated like a 429
+FAILURE_STREAK_COOLDOWN = 3
+
+
+class CoolingDown(RuntimeError):
+    """Raised when a request would have to wait longer than the caller allows."""
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self):
+        """(Re)read the limits from settings and start over at the initial rate."""
+        with self._lock:
+            self.rate = settings.instagram_rate_per_min
+            self._next_at = 0.0
+            self._resume_at = 0.0
+            self._failure_streak = 0
+            self._cooldown_streak = 0
+            self.stats = {
+                "requests": 0, "successes": 0, "failures": 0, "throttled": 0,
+                "cooldowns": 0, "skipped": 0, "waited_seconds": 0.0,
+            }
+
+    # ── Pacing ──
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        """Wait for the next request slot; False (without waiting) if it's more than max_wait away."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at, self._resume_at)
+            if max_wait is not None and start - now > max_wait:
+                self.stats["skipped"] += 1
+                return False
+            self._next_at = start + 60.0 / self.rate
+            self.stats["requests"] += 1
+            self.stats["waited_seconds"] += start - now
+        if start > now:
+            time.sleep(start - now)
+        return True
+
+    def resume_in(self) -> float:
+        """Seconds until the current cooldown ends (0 if none)."""
+        with self._lock:
+            return max(0.0, self._resume_at - time.monotonic())
+
+    # ── Feedback ──
+
+    def success(self):
+        with self._lock:
+            self.rate = min(settings.instagram_max_rate_per_min, self.rate + settings.instagram_rate_increase)
+            self._failure_streak = 0
+            self._cooldown_streak = 0
+            self.stats["successes"] += 1
+
+    def failure(self, reason: str = "error"):
+        """Timeout, connection error or 5xx: back off, and cool down if it keeps happening."""
+        with self._lock:
+            self._decrease()
+            self._failure_streak += 1
+            self.stats["failures"] += 1
+            if self._failure_streak >= FAILURE_STREAK_COOLDOWN:
+                self._failure_streak = 0
+                self._cool_down(f"{FAILURE_STREAK_COOLDOWN} failures in a row ({reason})")
+
+    def throttled(self, retry_after: float | None = None):
+        """429 Too Many Requests."""
+        with self._lock:
+            self._decrease()
+            self.stats["throttled"] += 1
+            self._cool_down("429 Too Many Requests", retry_after)
+
+    def _decrease(self):
+        self.rate = max(settings.instagram_min_rate_per_min, self.rate * settings.instagram_rate_decrease)
+
+    def _cool_down(self, reason: str, retry_after: float | None = None):
+        seconds = min(
+            settings.instagram_max_cooldown_seconds,
+            settings.instagram_cooldown_seconds * 2 ** self._cooldown_streak,
+        )
+        seconds = max(seconds, retry_after or 0)
+        self._cooldown_streak += 1
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        self.stats["cooldowns"] += 1
+        resume = datetime.now() + timedelta(seconds=seconds)
+        logger.warning(
+            f"{self.name}: {reason} — cooling down {seconds:.0f}s (until {resume:%H:%M:%S}), "
+            f"then {self.rate:.1f} req/min"
+        )
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["rate_per_min"] = round(self.rate, 2)
+            stats["resume_in_seconds"] = round(max(0.0, self._resume_at - time.monotonic()), 1)
+        stats["waited_seconds"] = round(stats["waited_seconds"], 1)
+        return stats
+
+
+instagram_limiter = AdaptiveLimiter("Instagram")
@@ -0,0 +1,86 @@
+"""
+Per-destination concurrency caps.
+Worker pools fan out across leads; each outbound destination (Instagram,
+websites, Yelp, Outscraper, LLM) keeps its own ceiling on in-flight requests.
+Multi-market runs can also install cross-process semaphores and a shared
+request budget so all market processes stay under one global quota.
+"""
+
+import threading
+from contextlib import contextmanager
+from config.settings import settings
+from utils.proxy_pool import proxy_urls
+
+_lock = threading.Lock()
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+# Installed by install_shared_limits() in market worker processes
+_shared_semaphores: dict = {}
+_shared_budget = None
+_shared_budget_lock = None
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised when a destination's shared request budget for the run is used up."""
+
+
+def destination_cap(destination: str) -> int:
+    caps = settings.destination_concurrency
+    cap = max(1, int(caps.get(destination, caps.get("default", 4))))
+    if destination == "instagram":
+        # Instagram limits per exit IP, so each proxy adds its own slots
+        cap *= max(1, len(proxy_urls()))
+    return cap
+
+
+def _semaphore(destination: str) -> threading.BoundedSemaphore:
+    sem = _semaphores.get(destination)
+    if sem is None:
+        with _lock:
+            sem = _semaphores.get(destination)
+            if sem is None:
+                sem = threading.BoundedSemaphore(destination_cap(destination))
+                _semaphores[destination] = sem
+    return sem
+
+
+def configure():
+    """Drop the local caps so each is re-read from settings (and the proxy count) on next use."""
+    with _lock:
+        _semaphores.clear()
+
+
+def install_shared_limits(semaphores: dict, budget=None, budget_lock=None):
+    """Use cross-process semaphores/budget (multiprocessing.Manager proxies) on top of local caps."""
+    global _shared_semaphores, _shared_budget, _shared_budget_lock
+    _shared_semaphores = semaphores or {}
+    _shared_budget = budget
+    _shared_budget_lock = budget_lock
+
+
+def _charge(destination: str):
+    if _shared_budget is None:
+        return
+    with _shared_budget_lock:
+        remaining = _shared_budget.get(destination)
+        if remaining is None:
+            return
+        if remaining <= 0:
+            raise QuotaExceeded(f"Global {destination} quota exhausted for this run")
+        _shared_budget[destination] = remaining - 1
+
+
+@contextmanager
+def destination_slot(destination: str):
+    """Hold one of the destination's concurrency slots for the duration of the block."""
+    _charge(destination)
+    shared = _shared_semaphores.get(destination)
+    with _semaphore(destination):
+        if shared is None:
+            yield
+            return
+        shared.acquire()
+        try:
+            yield
+        finally:
+            shared.release()
@@ -0,0 +1,151 @@
+"""
+Per-run dedup index for prospects.
+Loaded once at the start of the scrape step from outreach_leads (the same
+scan fills the entity resolver, see utils.lead_scan), it holds
+normalized keys — Google place_id, name+city, Instagram handle, website domain
+(within a city: chain branches share the corporate site) and phone — so every scraper can drop businesses we already hold with a local
+lookup, before paying for saves, Instagram profile checks or enrichment.
+Tables past dedup_bloom_min_rows are loaded into a Bloom filter instead of a
+set (a few MB instead of hundreds; dedup_bloom_error_rate of new businesses
+may be skipped as false positives). Keys added during the run stay exact.
+"""
+
+import hashlib
+import math
+import threading
+from config.settings import settings
+from utils.logger import logger
+from utils.helpers import business_domain, extract_instagram_username, phone_key
+from utils.lead_ingest import lead_dedup_key
+from utils.entity_resolution import normalize_text
+from utils.lead_scan import load_stored_leads
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def prospect_keys(biz: dict) -> list[str]:
+    """Normalized identity keys for a prospect/lead dict (any match = same business)."""
+    keys = []
+    place_id = biz.get("google_place_id")
+    if place_id:
+        keys.append(f"place:{place_id}")
+    if biz.get("business_name"):
+        keys.append(f"name:{biz.get('dedup_key') or lead_dedup_key(biz['business_name'], biz.get('city'))}")
+    handle = extract_instagram_username(biz.get("instagram_url"))
+    if handle:
+        keys.append(f"ig:{handle}")
+    domain = business_domain(biz.get("website"))
+    if domain:
+        # A chain's branches share one domain; only the same city makes it the same business
+        city = normalize_text((biz.get("city") or "").split(",")[0])
+        keys.append(f"domain:{city}:{domain}")
+    phone = phone_key(biz.get("contact_phone"))
+    if phone:
+        keys.append(f"phone:{phone}")
+    return keys
+
+
+class LeadDedupIndex:
+    # outreach_leads columns read by the stored-lead scan (utils.lead_scan)
+    COLUMNS = ("dedup_key", "google_place_id", "business_name", "city", "instagram_url", "website", "contact_phone")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: set[str] = set()
+        self._bloom: BloomFilter | None = None
+        self._loading: set[str] = set()
+        self.loaded = False
+        self.stats = {"rows": 0, "keys": 0, "hits": 0, "added": 0}
+
+    def load(self, client=None) -> bool:
+        """(Re)load every stored lead's keys. Returns False (and stays empty) on failure."""
+        return load_stored_leads(self, client=client)
+
+    def add_stored(self, rows: list[dict]):
+        for row in rows:
+            self._loading.update(prospect_keys(row))
+
+    def finish_load(self, rows: int):
+        keys, self._loading = self._loading, set()
+        bloom = None
+        if settings.dedup_bloom_min_rows and rows >= settings.dedup_bloom_min_rows:
+            bloom = BloomFilter(len(keys), settings.dedup_bloom_error_rate)
+            for key in keys:
+                bloom.add(key)
+            keys = set()
+
+        with self._lock:
+            self._keys, self._bloom, self.loaded = keys, bloom, True
+            self.stats.update(rows=rows, keys=len(keys) if bloom is None else 0)
+        kind = f"Bloom filter ({len(bloom.bits) // 1024} KB)" if bloom else f"{len(keys)} keys"
+        logger.info(f"Dedup index: {rows} stored leads → {kind}")
+
+    def reset(self):
+        with self._lock:
+            self._keys, self._bloom, self._loading, self.loaded = set(), None, set(), False
+            self.stats = {"rows": 0, "keys": 0, "hits": 0, "added": 0}
+
+    def _known(self, key: str) -> bool:
+        return key in self._keys or (self._bloom is not None and key in self._bloom)
+
+    def seen(self, biz: dict) -> bool:
+        if not self.loaded:
+            return False
+        with self._lock:
+            hit = any(self._known(k) for k in prospect_keys(biz))
+            if hit:
+                self.stats["hits"] += 1
+            return hit
+
+    def holds_place(self, place_id: str | None) -> bool:
+        """Whether a Google place_id is already held (no hit counted)."""
+        if not self.loaded or not place_id:
+            return False
+        with self._lock:
+            return self._known(f"place:{place_id}")
+
+    def add(self, biz: dict):
+        if not self.loaded:
+            return
+        keys = prospect_keys(biz)
+        with self._lock:
+            self._keys.update(keys)
+            self.stats["added"] += 1
+
+    def filter_new(self, prospects: list[dict]) -> list[dict]:
+        """Prospects not held yet, also dropping repeats within `prospects` (index is updated)."""
+        if not self.loaded:
+            return prospects
+        fresh = []
+        with self._lock:
+            for biz in prospects:
+                keys = prospect_keys(biz)
+                if any(self._known(k) for k in keys):
+                    self.stats["hits"] += 1
+                    continue
+                self._keys.update(keys)
+                self.stats["added"] += 1
+                fresh.append(biz)
+        return fresh
+
+
+dedup_index = LeadDedupIndex()
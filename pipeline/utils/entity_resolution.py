@@ -0,0 +1,226 @@
+"""
+Cross-source entity resolution for new leads.
+Outscraper, Yelp and Instagram name the same business differently
+("Salon Anna GmbH", "Salon Anna", "@salonanna"). Before a batch is inserted,
+each prospect is compared with stored leads and with the rest of the batch:
+
+- normalize: names (legal forms, umlauts, accents, punctuation), domains,
+  phones and Instagram handles
+- block: candidates come only from the same city and a shared name token
+  prefix or compact-name prefix/suffix, or from an exact identifier
+  (place_id, domain, phone, handle) — never all pairs
+- score: a shared identifier decides; a conflicting place_id, domain or handle
+  vetoes (a different phone only lowers the score); otherwise name similarity.
+  A name inside a longer one only counts when the extra words are category
+  words ("Friseur Salon Anna"), not "Hair Studio" vs "Hair Studio Maria"
+- merge: a matched prospect isn't inserted; its contact/social fields fill
+  the canonical lead's empty ones
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from config.settings import settings
+from utils.logger import logger
+from utils.helpers import business_domain, extract_instagram_username, phone_key
+
+# Blocks bigger than this are too generic to produce useful candidates
+MAX_BLOCK = 500
+
+# Fields a duplicate may contribute to the canonical lead (only where it has none)
+MERGE_FIELDS = (
+    "website", "contact_email", "contact_phone", "address", "instagram_url",
+    "facebook_url", "yelp_url", "google_place_id",
+)
+
+
+LEGAL_FORMS = {
+    "gmbh", "mbh", "ug", "ag", "kg", "ohg", "gbr", "ek", "e", "k", "co", "inh", "inhaber",
+    "ltd", "llc", "inc", "corp", "plc", "sarl", "srl", "bv",
+}
+STOPWORDS = {"the", "and", "und", "der", "die", "das", "by", "von", "am", "im", "in", "de", "la", "le"}
+# Business-type words listings add to a name; a prospect's own category counts too
+CATEGORY_WORDS = {
+    "salon", "friseur", "friseursalon", "frisor", "coiffeur", "hair", "haar", "hairdresser",
+    "hairstylist", "barber", "barbershop", "beauty", "kosmetik", "cosmetics", "nails", "nail",
+    "studio", "spa", "wellness", "massage",
+}
+
+# A conflicting phone (landline vs mobile is common) lowers a name match instead of vetoing it
+PHONE_CONFLICT_PENALTY = 0.05
+
+_UMLAUTS = str.maketrans({"ß": "ss", "&": " and "})
+# "München" / "Muenchen" / "Munchen" all fold to "munchen"
+_UMLAUT_SPELLINGS = re.compile(r"(?<=[aou])e")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value: str | None) -> str:
+    text = (value or "").lower().translate(_UMLAUTS)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_ALNUM.sub(" ", _UMLAUT_SPELLINGS.sub("", text)).strip()
+
+
+def name_tokens(name: str | None) -> list[str]:
+    return [t for t in normalize_text(name).split() if t not in LEGAL_FORMS and t not in STOPWORDS]
+
+
+def normalize_handle(value: str | None) -> str | None:
+    if not value:
+        return None
+    handle = extract_instagram_username(value) if "instagram.com" in value else value.lstrip("@").lower()
+    return handle or None
+
+
+class _Entity:
+    __slots__ = ("lead_id", "row", "city", "tokens", "compact", "category", "ids")
+
+    def __init__(self, row: dict, lead_id: str | None = None):
+        self.lead_id = lead_id
+        self.row = row
+        self.city = normalize_text((row.get("city") or "").split(",")[0])
+        tokens = name_tokens(row.get("business_name"))
+        self.tokens = frozenset(tokens)
+        # Handles have no spaces, so names are also compared with spaces removed
+        self.compact = "".join(tokens)
+        self.category = CATEGORY_WORDS.union(name_tokens(row.get("category") or row.get("industry")))
+        self.ids = {
+            "place": row.get("google_place_id") or None,
+            "domain": business_domain(row.get("website")),
+            "phone": phone_key(row.get("contact_phone")),
+            "ig": normalize_handle(row.get("instagram_url")),
+        }
+
+    def block_keys(self) -> list[str]:
+        keys = [f"{kind}:{value}" for kind, value in self.ids.items() if value]
+        keys.extend(f"{self.city}|t:{t[:4]}" for t in self.tokens if len(t) >= 3)
+        if len(self.compact) >= 6:
+            keys.append(f"{self.city}|p:{self.compact[:6]}")
+            keys.append(f"{self.city}|s:{self.compact[-6:]}")
+        return keys
+
+
+def similarity(a: _Entity, b: _Entity) -> float:
+    """0..1 match score; shared identifiers win, conflicting ones veto or lower a name match."""
+    same_city = a.city == b.city
+    penalty = 0.0
+    for kind in ("place", "domain", "phone", "ig"):
+        x, y = a.ids[kind], b.ids[kind]
+        if x and y:
+            # Chains share a website across cities, so a domain only counts locally
+            if x == y and (kind != "domain" or same_city):
+                return 1.0
+            if x != y:
+                if kind != "phone":
+                    return 0.0
+                penalty = PHONE_CONFLICT_PENALTY
+    if not same_city or not a.compact or not b.compact:
+        return 0.0
+    return max(0.0, _name_score(a, b) - penalty)
+
+
+def _name_score(a: _Entity, b: _Entity) -> float:
+    if a.compact == b.compact:
+        return 0.97
+    shorter, longer = (a, b) if len(a.tokens) <= len(b.tokens) else (b, a)
+    if len(shorter.tokens) >= 2 and shorter.tokens < longer.tokens:
+        # "Salon Anna" inside "Friseur Salon Anna" (listings often carry the category),
+        # but "Hair Studio Maria" / "Beauty Lounge Munich" are other businesses
+        extra = longer.tokens - shorter.tokens
+        return 0.92 if extra <= a.category | b.category else 0.5
+    # Cheap upper bounds first; the full ratio only runs for plausible pairs
+    matcher = SequenceMatcher(None, a.compact, b.compact)
+    if matcher.real_quick_ratio() < settings.entity_match_threshold:
+        return 0.0
+    if matcher.quick_ratio() < settings.entity_match_threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+class EntityResolver:
+    # outreach_leads columns read by the stored-lead scan (utils.lead_scan)
+    COLUMNS = ("id", "business_name", "city", "industry", *MERGE_FIELDS)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entities: list[_Entity] = []
+        self._blocks: dict[str, list[int]] = defaultdict(list)
+        self.loaded = False
+        self.stats = {"stored": 0, "matched": 0, "merged_fields": 0, "comparisons": 0}
+
+    def load(self, client=None) -> bool:
+        """(Re)load every stored lead. Returns False (and stays empty) on failure."""
+        from utils.lead_scan import load_stored_leads  # lead_scan imports lead_ingest, which imports us
+
+        return load_stored_leads(self, client=client)
+
+    def add_stored(self, rows: list[dict]):
+        with self._lock:
+            for row in rows:
+                self._add(_Entity(row, row["id"]))
+
+    def finish_load(self, rows: int):
+        with self._lock:
+            self.loaded = True
+            self.stats["stored"] = rows
+        logger.info(f"Entity resolution: {rows} stored leads in {len(self._blocks)} blocks")
+
+    def reset(self):
+        with self._lock:
+            self._entities, self._blocks, self.loaded = [], defaultdict(list), False
+            self.stats = {"stored": 0, "matched": 0, "merged_fields": 0, "comparisons": 0}
+
+    def _add(self, entity: _Entity):
+        self._entities.append(entity)
+        idx = len(self._entities) - 1
+        for key in entity.block_keys():
+            self._blocks[key].append(idx)
+
+    def _best_match(self, entity: _Entity) -> _Entity | None:
+        seen: set[int] = set()
+        best, best_score = None, settings.entity_match_threshold
+        for key in entity.block_keys():
+            block = self._blocks.get(key, ())
+            if len(block) > MAX_BLOCK and "|" in key:  # generic name block, not an identifier
+                continue
+            for idx in block:
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                score = similarity(entity, self._entities[idx])
+                if score >= best_score:
+                    best, best_score = self._entities[idx], score
+        self.stats["comparisons"] += len(seen)
+        return best
+
+    def resolve(self, rows: list[dict]) -> tuple[list[dict], dict[str, dict]]:
+        """
+        Split rows into (new rows to insert, {stored lead_id: fields to fill}).
+        Matches within `rows` are folded into the first row; later rows see earlier ones.
+        """
+        if not self.loaded:
+            return rows, {}
+        fresh: list[dict] = []
+        updates: dict[str, dict] = {}
+        with self._lock:
+            for row in rows:
+                entity = _Entity(row)
+                match = self._best_match(entity)
+                if match is None:
+                    self._add(entity)
+                    fresh.append(row)
+                    continue
+                self.stats["matched"] += 1
+                fill = {f: row[f] for f in MERGE_FIELDS if row.get(f) and not match.row.get(f)}
+                if not fill:
+                    continue
+                match.row.update(fill)
+                self.stats["merged_fields"] += len(fill)
+                if match.lead_id:
+                    updates.setdefault(match.lead_id, {}).update(fill)
+        return fresh, updates
+
+
+entity_resolver = EntityResolver()
@@ -0,0 +1,159 @@
+"""
+Geo-grid tiling for Google Maps searches.
+One "{category} in {city}" query stops at a few hundred results. To go
+further, the city's bounding box (taken from the coordinates of the base
+query's results) is split into a grid. The same query then runs once per
+tile, pinned to that tile with Outscraper's `coordinates` (@lat,lng,zoom):
+
+- fan-out: tile queries run concurrently, up to the outscraper concurrency cap
+- merge: results are deduplicated on place_id across tiles
+- refine: a tile that returns a full page of mostly new places is split into
+  four smaller tiles (up to outscraper_tile_max_depth)
+- prune: a tile whose new-place share is below outscraper_tile_min_new_ratio
+  isn't split or searched again
+"""
+
+import heapq
+import math
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import settings
+from utils.logger import logger
+from utils.concurrency import destination_cap
+
+# Degrees of longitude a ~1000px Maps viewport shows at zoom 0
+_ZOOM0_SPAN = 1400.0
+
+# Share of outlying results (businesses listed under the city but far outside it) ignored per side
+_OUTLIER_SHARE = 0.05
+
+
+class Tile:
+    __slots__ = ("south", "west", "north", "east", "depth")
+
+    def __init__(self, south: float, west: float, north: float, east: float, depth: int = 0):
+        self.south, self.west, self.north, self.east, self.depth = south, west, north, east, depth
+
+    @property
+    def center(self) -> tuple[float, float]:
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def zoom(self) -> float:
+        lat, _ = self.center
+        span = max(self.north - self.south, (self.east - self.west) * math.cos(math.radians(lat)), 1e-4)
+        return round(min(18.0, max(10.0, math.log2(_ZOOM0_SPAN / span))), 1)
+
+    @property
+    def coordinates(self) -> str:
+        lat, lng = self.center
+        return f"@{lat:.5f},{lng:.5f},{self.zoom}z"
+
+    def split(self) -> list["Tile"]:
+        lat, lng = self.center
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, lat, lng, depth),
+            Tile(self.south, lng, lat, self.east, depth),
+            Tile(lat, self.west, self.north, lng, depth),
+            Tile(lat, lng, self.north, self.east, depth),
+        ]
+
+    def grid(self, size: int) -> list["Tile"]:
+        dlat = (self.north - self.south) / size
+        dlng = (self.east - self.west) / size
+        return [
+            Tile(self.south + i * dlat, self.west + j * dlng,
+                 self.south + (i + 1) * dlat, self.west + (j + 1) * dlng, self.depth)
+            for i in range(size)
+            for j in range(size)
+        ]
+
+
+def bounding_box(places: list[dict], pad: float = 0.1) -> Tile | None:
+    """Box around the places' latitude/longitude (trimmed of outliers, padded); None without coordinates."""
+    points = [
+        (float(p["latitude"]), float(p["longitude"]))
+        for p in places
+        if p.get("latitude") is not None and p.get("longitude") is not None
+    ]
+    if len(points) < 2:
+        return None
+    lats = sorted(lat for lat, _ in points)
+    lngs = sorted(lng for _, lng in points)
+    cut = int(len(points) * _OUTLIER_SHARE)
+    south, north = lats[cut], lats[-1 - cut]
+    west, east = lngs[cut], lngs[-1 - cut]
+    if north - south < 1e-3 or east - west < 1e-3:
+        return None
+    dlat, dlng = (north - south) * pad, (east - west) * pad
+    return Tile(south - dlat, west - dlng, north + dlat, east + dlng)
+
+
+def place_key(item: dict) -> str | None:
+    return item.get("place_id") or (
+        f"{item.get('name')}|{item.get('full_address') or item.get('address')}" if item.get("name") else None
+    )
+
+
+def harvest_tiles(box: Tile, search, limit: int, seen: set[str], skip=None) -> tuple[list[dict], dict]:
+    """
+    Run `search(tile, page_size) -> list[places]` over the tiles of `box` until `limit`
+    new places (not in `seen`, and not matched by `skip(place)`) are collected or the
+    query budget is spent. `seen` is updated. Returns (new places, stats).
+    """
+    page_size = settings.outscraper_tile_page_size
+    budget = settings.outscraper_tile_max_queries
+    workers = destination_cap("outscraper")
+    stats = {"queries": 0, "tiles_split": 0, "tiles_pruned": 0, "results": 0, "new": 0}
+
+    # Max-heap on the parent's new-place share, so productive areas are refined first
+    pending: list[tuple[float, int, Tile]] = []
+    order = 0
+    for tile in box.grid(settings.outscraper_tile_grid):
+        heapq.heappush(pending, (-1.0, order, tile))
+        order += 1
+
+    collected: list[dict] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tiles") as pool:
+        while pending and len(collected) < limit and stats["queries"] < budget:
+            need = limit - len(collected)
+            size = min(len(pending), budget - stats["queries"], max(workers, math.ceil(need / page_size)))
+            batch = [heapq.heappop(pending)[2] for _ in range(size)]
+            # Outscraper bills per result, so near the target only ask for what's missing
+            per_tile = min(page_size, max(20, math.ceil(need / size)))
+            pages = list(pool.map(lambda t: _search_tile(search, t, per_tile), batch))
+            stats["queries"] += len(batch)
+
+            # Merged in tile order so results don't depend on thread timing
+            for tile, page in zip(batch, pages):
+                new = 0
+                for item in page:
+                    key = place_key(item)
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    if skip and skip(item):
+                        continue
+                    collected.append(item)
+                    new += 1
+                stats["results"] += len(page)
+                stats["new"] += new
+                ratio = new / len(page) if page else 0.0
+                if ratio < settings.outscraper_tile_min_new_ratio:
+                    stats["tiles_pruned"] += 1
+                elif len(page) >= per_tile and tile.depth < settings.outscraper_tile_max_depth:
+                    # Saturated: the tile holds more than one page, so look closer
+                    stats["tiles_split"] += 1
+                    for child in tile.split():
+                        heapq.heappush(pending, (-ratio, order, child))
+                        order += 1
+
+    return collected[:limit], stats
+
+
+def _search_tile(search, tile: Tile, page_size: int) -> list[dict]:
+    try:
+        return search(tile, page_size) or []
+    except Exception as e:
+        logger.warning(f"Tile search {tile.coordinates} failed: {e}")
+        return []
@@ -37,6 +37,25 @@ def extract_domain(url: str | None) -> str | None:
     return match.group(1) if match else None
 
 
+# Domains that identify a platform rather than the business itself
+SHARED_DOMAINS = {
+    "instagram.com", "facebook.com", "m.facebook.com", "linktr.ee", "yelp.com", "yelp.de",
+    "google.com", "maps.google.com", "business.site", "wixsite.com", "tiktok.com",
+}
+
+
+def business_domain(url: str | None) -> str | None:
+    """Lowercased website domain, or None for platform pages (SHARED_DOMAINS)."""
+    domain = (extract_domain(url) or "").lower()
+    return domain if domain and domain not in SHARED_DOMAINS else None
+
+
+def phone_key(phone: str | None) -> str | None:
+    """Last 9 digits: the same number with or without country code / trunk prefix."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-9:] if len(digits) >= 9 else None
+
+
 def retry(max_attempts: int = 3, delay: float = 2.0, backoff: float = 2.0):
     """Decorator for retrying functions with exponential backoff."""
     def decorator(func):
@@ -0,0 +1,167 @@
+"""
+Multi-keyword matcher for caption, bio and review classification.
+Build one per keyword set (at import time), then find every keyword in a text
+in a single pass, instead of one substring scan per keyword:
+
+- Aho-Corasick automaton from pyahocorasick (C); without it, the keyword
+  trie compiled into one regex, so the scan still runs in C rather than a
+  Python loop over characters
+- every occurrence is found, including overlapping ones and keywords that
+  share a start ("slow" / "slow response")
+- each keyword belongs to one or more categories, with priorities for
+  "first matching category wins" classifiers
+- whole_words: a hit only counts if it isn't part of a longer word
+  (for all keywords, or just the ones listed)
+
+Matching is case-insensitive.
+"""
+
+import re
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class Hit(NamedTuple):
+    keyword: str
+    start: int
+    end: int
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    def __init__(
+        self,
+        groups: dict[str, Iterable[str]] | Iterable[str],
+        priorities: dict[str, int] | None = None,
+        whole_words: bool | Iterable[str] = False,
+    ):
+        """
+        groups: {category: keywords}, or a plain keyword list (each keyword its own category).
+        priorities: higher wins in top(); by default earlier groups win.
+        whole_words: True for all keywords, or the keywords that need word boundaries.
+        """
+        if not isinstance(groups, dict):
+            groups = {kw: [kw] for kw in groups}
+        self.order = list(groups)
+        self.priorities = priorities or {cat: -i for i, cat in enumerate(self.order)}
+        self._categories: dict[str, list[str]] = {}
+        for category, keywords in groups.items():
+            for kw in keywords:
+                kw = kw.lower()
+                if kw:
+                    self._categories.setdefault(kw, []).append(category)
+        if whole_words is True:
+            self._whole = set(self._categories)
+        else:
+            self._whole = {kw.lower() for kw in (whole_words or ())}
+
+        if ahocorasick is not None:
+            self.engine = "aho-corasick"
+            self._automaton = ahocorasick.Automaton()
+            for kw in self._categories:
+                self._automaton.add_word(kw, (kw, len(kw)))
+            self._automaton.make_automaton()
+        else:
+            self.engine = "regex"
+            trie: dict = {}
+            for kw in self._categories:
+                node = trie
+                for ch in kw:
+                    node = node.setdefault(ch, {})
+                node[""] = kw
+            self._pattern = re.compile(self._emit(trie))
+            # A regex match is the longest keyword at its start; shorter keywords there are its prefixes
+            self._expansions = {
+                kw: [(other, len(other)) for other in self._categories if kw.startswith(other)]
+                for kw in self._categories
+            }
+        self._rank = {cat: (self.priorities.get(cat, float("-inf")), -i) for i, cat in enumerate(self.order)}
+
+    @property
+    def vocabulary(self) -> list[str]:
+        """All keywords (lowercased)."""
+        return list(self._categories)
+
+    def _emit(self, node: dict) -> str:
+        """Regex for a trie node; optional tails are greedy, so the longest keyword is captured."""
+        branches = [re.escape(ch) + self._emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    # ── Scanning ──
+
+    def hits(self, text: str) -> list[Hit]:
+        """Every keyword occurrence in `text`, by start position."""
+        return [Hit(*match) for match in self._scan(text)]
+
+    def _scan(self, text: str):
+        """(keyword, start, end) for every occurrence, by start position."""
+        if not text or not self._categories:
+            return []
+        text = text.lower()
+        if self.engine == "aho-corasick":
+            # The automaton reports occurrences by end position
+            found = [(kw, end + 1 - size, end + 1) for end, (kw, size) in self._automaton.iter(text)]
+            found.sort(key=lambda hit: hit[1])
+        else:
+            found = []
+            search = self._pattern.search
+            match = search(text)
+            while match:
+                start = match.start()
+                for kw, size in self._expansions[match.group()]:
+                    found.append((kw, start, start + size))
+                # Resume one character on, not after the match, so overlapping keywords are found too
+                match = search(text, start + 1)
+        if self._whole:
+            found = [hit for hit in found if self._bounded(text, *hit)]
+        return found
+
+    def _bounded(self, text: str, kw: str, start: int, end: int) -> bool:
+        if kw not in self._whole:
+            return True
+        return (start == 0 or not _is_word_char(text[start - 1])) and (
+            end == len(text) or not _is_word_char(text[end])
+        )
+
+    def keywords(self, text: str) -> set[str]:
+        """Distinct keywords present."""
+        if self.engine == "aho-corasick" and not self._whole and text:
+            # Positions don't matter here; skip building and sorting hits
+            return {kw for _, (kw, _) in self._automaton.iter(text.lower())}
+        return {kw for kw, _, _ in self._scan(text)}
+
+    def categories(self, text: str) -> set[str]:
+        """Categories with at least one keyword present."""
+        categories = self._categories
+        return {cat for kw in self.keywords(text) for cat in categories[kw]}
+
+    def counts(self, text: str) -> Counter:
+        """
+        Occurrences per category. Like summing str.count() over the keywords:
+        a keyword's own occurrences don't overlap, different keywords may.
+        """
+        counts: Counter = Counter()
+        last_end: dict[str, int] = {}
+        for kw, start, end in self._scan(text):
+            if start < last_end.get(kw, 0):
+                continue
+            last_end[kw] = end
+            for cat in self._categories[kw]:
+                counts[cat] += 1
+        return counts
+
+    def top(self, text: str) -> str | None:
+        """The highest-priority category present (None if no keyword matches)."""
+        categories = self.categories(text)
+        return max(categories, key=self._rank.__getitem__) if categories else None
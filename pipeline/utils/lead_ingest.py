@@ -0,0 +1,146 @@
+"""
+Bulk, idempotent lead ingest shared by the scrapers.
+Rows are keyed by a normalized business name + city (outreach_leads.dedup_key,
+unique) and written with chunked upserts that ignore existing keys, so a batch
+costs one request per INGEST_CHUNK rows and concurrent scrapers can't insert
+the same business twice. Saved/skipped counts come from the rows returned.
+Fuzzy cross-source matches are folded into stored leads first (utils.entity_resolution).
+In a multi-market run new leads are stamped with the run's market key.
+
+Without migration 20260304000000 (LEAD_DEDUP_KEY=false) stored name + city
+pairs are looked up first and the rest are plain inserts, without the
+dedup_key / google_place_id columns.
+"""
+
+import re
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.entity_resolution import entity_resolver
+from utils.write_buffer import write_buffer
+
+# Rows per upsert / IN lookup request
+INGEST_CHUNK = 250
+
+# Columns added by migration 20260304000000_outreach_leads_dedup_key.sql
+KEY_COLUMNS = ("dedup_key", "google_place_id")
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize_key_part(value) -> str:
+    """Lowercase, collapse punctuation/whitespace runs (mirrors the SQL backfill)."""
+    return _NON_ALNUM.sub(" ", str(value or "").lower()).strip()
+
+
+def lead_dedup_key(business_name: str | None, city: str | None) -> str:
+    return f"{normalize_key_part(business_name)}|{normalize_key_part(city)}"
+
+
+def existing_values(column: str, values: list) -> set:
+    """Which of `values` already appear in outreach_leads.<column> (chunked IN lookups)."""
+    values = list({v for v in values if v})
+    found = set()
+    for i in range(0, len(values), INGEST_CHUNK):
+        result = (
+            db.table("outreach_leads")
+            .select(column)
+            .in_(column, values[i:i + INGEST_CHUNK])
+            .execute()
+        )
+        found.update(row[column] for row in result.data or [])
+    return found
+
+
+def without_key_columns(row: dict) -> dict:
+    """`row` minus the migration's columns when LEAD_DEDUP_KEY is off."""
+    if settings.lead_dedup_key:
+        return row
+    return {k: v for k, v in row.items() if k not in KEY_COLUMNS}
+
+
+def _upsert(rows: list[dict]) -> list[dict]:
+    if not settings.lead_dedup_key:
+        return _insert_new(rows)
+    result = (
+        db.table("outreach_leads")
+        .upsert(rows, on_conflict="dedup_key", ignore_duplicates=True)
+        .execute()
+    )
+    return result.data or []
+
+
+def _insert_new(rows: list[dict]) -> list[dict]:
+    """Plain inserts of the rows whose name + city isn't stored yet (no dedup_key column)."""
+    names = list({row["business_name"] for row in rows})
+    stored = set()
+    for i in range(0, len(names), INGEST_CHUNK):
+        result = (
+            db.table("outreach_leads")
+            .select("business_name, city")
+            .in_("business_name", names[i:i + INGEST_CHUNK])
+            .execute()
+        )
+        stored.update(lead_dedup_key(r["business_name"], r.get("city")) for r in result.data or [])
+
+    new = [without_key_columns(row) for row in rows if row["dedup_key"] not in stored]
+    if not new:
+        return []
+    result = db.table("outreach_leads").insert(new).execute()
+    # Callers match inserted rows back to their prospects by key
+    return [{**r, "dedup_key": lead_dedup_key(r["business_name"], r.get("city"))} for r in result.data or []]
+
+
+def ingest_leads(rows: list[dict], source: str) -> dict:
+    """
+    Insert outreach_leads rows that aren't stored yet.
+    Returns {"saved", "skipped", "errors", "inserted"} where "inserted" holds the
+    new rows as returned by the database (with id and dedup_key).
+    """
+    skipped = errors = 0
+    batch: dict[str, dict] = {}
+    for row in rows:
+        if not row.get("business_name"):
+            errors += 1
+            continue
+        key = lead_dedup_key(row["business_name"], row.get("city"))
+        if key in batch:
+            skipped += 1
+            continue
+        batch[key] = {**row, "dedup_key": key}
+        if settings.market:
+            batch[key]["market"] = settings.market
+
+    # Same business under another name/source: fill the stored lead instead of inserting
+    pending, merges = entity_resolver.resolve(list(batch.values()))
+    skipped += len(batch) - len(pending)
+    for lead_id, fields in merges.items():
+        try:
+            write_buffer.update(lead_id, without_key_columns(fields))
+        except Exception as e:
+            logger.warning(f"Merging {source} data into lead {lead_id} failed: {e}")
+    if len(pending) < len(batch):
+        logger.info(f"{source}: {len(batch) - len(pending)} prospects matched existing leads "
+                    f"({len(merges)} leads gained fields)")
+
+    inserted: list[dict] = []
+    for i in range(0, len(pending), INGEST_CHUNK):
+        chunk = pending[i:i + INGEST_CHUNK]
+        failed = 0
+        try:
+            new = _upsert(chunk)
+        except Exception as e:
+            # One bad row fails the whole statement — retry row by row to isolate it
+            logger.warning(f"{source} bulk save of {len(chunk)} leads failed ({e}) — retrying per row")
+            new = []
+            for row in chunk:
+                try:
+                    new.extend(_upsert([row]))
+                except Exception as row_error:
+                    logger.error(f"Failed to save {row.get('business_name')}: {row_error}")
+                    failed += 1
+        inserted.extend(new)
+        errors += failed
+        skipped += len(chunk) - len(new) - failed
+
+    return {"saved": len(inserted), "skipped": skipped, "errors": errors, "inserted": inserted}
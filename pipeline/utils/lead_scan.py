@@ -0,0 +1,60 @@
+"""
+One paged scan of outreach_leads for the per-run lead indexes.
+The dedup index and the entity resolver both hold every stored lead; they
+declare the columns they need (COLUMNS) and are filled from the same pages,
+so a run reads the table once instead of once per index.
+"""
+
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.lead_ingest import KEY_COLUMNS
+
+# Rows per page (PostgREST caps a response at 1000 rows)
+PAGE_SIZE = 1000
+
+
+def scan_leads(columns, on_page, client=None) -> int:
+    """Page through outreach_leads by id, calling on_page(rows) per page. Returns the row count."""
+    client = client or db
+    select = ", ".join(sorted(c for c in set(columns) if settings.lead_dedup_key or c not in KEY_COLUMNS))
+    rows = 0
+    while True:
+        page = (
+            client.table("outreach_leads")
+            .select(select)
+            .order("id")
+            .range(rows, rows + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        on_page(page)
+        rows += len(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def load_stored_leads(*indexes, client=None) -> bool:
+    """
+    (Re)load every index from one scan. An index implements reset(), COLUMNS,
+    add_stored(rows) and finish_load(rows); on failure all of them stay empty.
+    """
+    for index in indexes:
+        index.reset()
+    if not indexes:
+        return True
+
+    def on_page(page: list[dict]):
+        for index in indexes:
+            index.add_stored(page)
+
+    try:
+        rows = scan_leads(set().union(*(index.COLUMNS for index in indexes)), on_page, client)
+    except Exception as e:
+        logger.warning(f"Loading stored leads failed (dedup index / entity resolution off for this run): {e}")
+        for index in indexes:
+            index.reset()
+        return False
+
+    for index in indexes:
+        index.finish_load(rows)
+    return True
@@ -0,0 +1,143 @@
+"""
+Lease-based lead claiming.
+Workers claim leads for a stage through the claim_pipeline_leads() RPC (atomic,
+owner + expiry), and every stage transition is a compare-and-set on the previous
+pipeline_status, so several pipeline processes can run side by side without
+double-processing. Expired leases (crashed workers) are reclaimed automatically.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.write_buffer import write_buffer as default_buffer
+
+LEASE_FIELDS = {"lease_owner": None, "lease_stage": None, "lease_expires_at": None}
+
+# stage → claim_pipeline_leads() filter parameters
+STAGE_CLAIMS = {
+    "enrich": {
+        "p_pipeline_status": "scraped",
+        "p_enrichment_status": "pending",
+        "p_set_enrichment_status": "in_progress",
+    },
+    "score": {"p_pipeline_status": "enriched"},
+    "insights": {"p_pipeline_status": "scored", "p_score_tiers": ["TIER_1", "TIER_2", "TIER_3"]},
+    "emails": {"p_pipeline_status": "insights_generated", "p_require_email": True},
+    "upload": {"p_pipeline_status": "emails_generated"},
+}
+
+# pipeline_status a lead has while it waits for the given stage
+STATUS_STAGE = {params["p_pipeline_status"]: stage for stage, params in STAGE_CLAIMS.items()}
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseManager:
+    def __init__(self, owner: str | None = None, client=None, lease_seconds: int | None = None, buffer=None):
+        self.owner = owner or default_owner()
+        self._client = client
+        self._lease_seconds = lease_seconds
+        # Write-behind buffer for stage transitions (None = write immediately)
+        self.buffer = buffer
+        # Streaming mode hands a lead's lease on to its next stage instead of dropping it
+        self.hand_off = False
+
+    @property
+    def db(self):
+        return self._client or db
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None or settings.lead_leases
+
+    @property
+    def lease_seconds(self) -> int:
+        return self._lease_seconds or settings.lead_lease_seconds
+
+    def claim(self, stage: str, limit: int, scope: dict | None = None) -> list[dict]:
+        """
+        Atomically lease up to `limit` leads waiting for `stage`.
+        `scope` restricts the claim to one market ({"market": ...}).
+        """
+        params = {
+            "p_stage": stage,
+            "p_owner": self.owner,
+            "p_limit": limit,
+            "p_lease_seconds": self.lease_seconds,
+            **STAGE_CLAIMS[stage],
+            **{f"p_{col}": value for col, value in (scope or {}).items()},
+        }
+        result = self.db.rpc("claim_pipeline_leads", params).execute()
+        leads = result.data or []
+        if leads:
+            logger.info(f"Leased {len(leads)} leads for '{stage}' (owner={self.owner})")
+        return leads
+
+    def advance(self, lead_id: str, from_status: str, updates: dict) -> bool:
+        """
+        Compare-and-set transition out of `from_status`. With leases enabled the
+        write only lands if this worker still holds the lead's lease.
+        Returns False if another worker got there first. With write-behind on, the
+        transition is buffered and a lost race is reported by the buffer's flush().
+        """
+        if self.enabled:
+            next_stage = STATUS_STAGE.get(updates.get("pipeline_status"))
+            if self.hand_off and next_stage:
+                expires = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+                updates = {**updates, "lease_stage": next_stage, "lease_expires_at": expires.isoformat()}
+            else:
+                updates = {**updates, **LEASE_FIELDS}
+
+        if self.buffer is not None and self.buffer.enabled:
+            expect = {"pipeline_status": from_status}
+            if self.enabled:
+                expect["lease_owner"] = self.owner
+            return self.buffer.update(lead_id, updates, expect)
+
+        query = (
+            self.db.table("outreach_leads")
+            .update(updates)
+            .eq("id", lead_id)
+            .eq("pipeline_status", from_status)
+        )
+        if self.enabled:
+            query = query.eq("lease_owner", self.owner)
+
+        result = query.execute()
+        if not result.data:
+            logger.warning(f"Lead {lead_id} left '{from_status}' elsewhere — skipping stale write")
+            return False
+        return True
+
+    def release(self, lead_ids: list[str], updates: dict | None = None):
+        """Drop this worker's lease on leads (optionally writing other fields at the same time)."""
+        if self.buffer is not None and lead_ids:
+            self.buffer.flush(lead_ids)  # buffered changes must land before the lease goes
+        if not self.enabled or not lead_ids:
+            if updates and lead_ids:
+                self.db.table("outreach_leads").update(updates).in_("id", lead_ids).execute()
+            return
+        (
+            self.db.table("outreach_leads")
+            .update({**(updates or {}), **LEASE_FIELDS})
+            .in_("id", lead_ids)
+            .eq("lease_owner", self.owner)
+            .execute()
+        )
+
+    def release_all(self):
+        """Release every lease this worker still holds (end of run)."""
+        if self.buffer is not None:
+            self.buffer.flush()
+        if not self.enabled:
+            return
+        self.db.table("outreach_leads").update(LEASE_FIELDS).eq("lease_owner", self.owner).execute()
+
+
+leases = LeaseManager(buffer=default_buffer)
@@ -0,0 +1,209 @@
+"""
+Shared LLM request scheduler.
+Enforces the provider's requests-per-minute and tokens-per-minute budgets with
+token buckets, caps in-flight calls, and backs off adaptively on 429s
+(honoring Retry-After) instead of sleeping a fixed interval between calls.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from config.settings import settings
+from utils.logger import logger
+from utils.concurrency import destination_slot
+from utils.metrics import metrics
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate_per_minute = float(rate_per_minute)
+        self.capacity = float(capacity or rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        rate = self.rate_per_minute / 60.0
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens (going into debt if needed) and return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / (self.rate_per_minute / 60.0)
+
+    def adjust(self, delta: float):
+        """Refund (positive) or charge (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+    def set_rate(self, rate_per_minute: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate_per_minute = float(rate_per_minute)
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int) -> int:
+    """Rough prompt+completion estimate (~4 chars per token) used to reserve TPM budget."""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    return getattr(e, "status_code", None) == 429 or type(e).__name__ == "RateLimitError"
+
+
+def _retry_after_seconds(e: Exception) -> float | None:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    MIN_RATE_FACTOR = 0.1
+    RECOVERY_STEP = 0.05
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._lock = threading.Lock()
+        self._rate_factor = 1.0
+        self._cooldown_until = 0.0
+        self._backoff = 2.0
+        self._stats = {
+            "requests": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "in_flight": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "tokens_used": 0,
+        }
+
+    def configure(self, requests_per_minute: int, tokens_per_minute: int):
+        """Apply updated limits (e.g. after remote settings reload)."""
+        with self._lock:
+            self.requests_per_minute = requests_per_minute
+            self.request_bucket.set_rate(requests_per_minute * self._rate_factor)
+            self.token_bucket.set_rate(tokens_per_minute)
+
+    def call(self, fn, est_tokens: int = 1000):
+        """Run `fn()` once budget allows; retries on 429 with adaptive backoff."""
+        for attempt in range(1, self.max_retries + 1):
+            self._wait_for_budget(est_tokens)
+            try:
+                with self._slots, destination_slot("llm"), metrics.call("openrouter"):
+                    self._bump("in_flight", 1)
+                    try:
+                        response = fn()
+                    finally:
+                        self._bump("in_flight", -1)
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == self.max_retries:
+                    self._bump("failures", 1)
+                    raise
+                self._on_rate_limited(e)
+                continue
+
+            self._on_success(response, est_tokens)
+            return response
+
+    def _wait_for_budget(self, est_tokens: int):
+        self._bump("queue_depth", 1)
+        start = time.monotonic()
+        try:
+            cooldown = self._cooldown_until - time.monotonic()
+            if cooldown > 0:
+                time.sleep(cooldown)
+            wait = max(
+                self.request_bucket.reserve(1),
+                self.token_bucket.reserve(est_tokens),
+            )
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                self._stats["queue_depth"] -= 1
+                self._stats["total_wait_seconds"] += waited
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def _on_rate_limited(self, e: Exception):
+        retry_after = _retry_after_seconds(e)
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            delay = retry_after if retry_after is not None else self._backoff
+            self._backoff = min(self._backoff * 2, 60.0)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            self._rate_factor = max(self.MIN_RATE_FACTOR, self._rate_factor * 0.5)
+            self.request_bucket.set_rate(self.requests_per_minute * self._rate_factor)
+        logger.warning(
+            f"LLM rate-limited (429) — cooling down {delay:.1f}s, "
+            f"effective RPM now {self.request_bucket.rate_per_minute:.1f}"
+        )
+
+    def _on_success(self, response, est_tokens: int):
+        usage = getattr(response, "usage", None)
+        used = getattr(usage, "total_tokens", None) if usage else None
+        if used is not None:
+            self.token_bucket.adjust(est_tokens - used)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["tokens_used"] += used or est_tokens
+            self._backoff = 2.0
+            if self._rate_factor < 1.0:
+                self._rate_factor = min(1.0, self._rate_factor + self.RECOVERY_STEP)
+                self.request_bucket.set_rate(self.requests_per_minute * self._rate_factor)
+
+    def _bump(self, key: str, delta: int):
+        with self._lock:
+            self._stats[key] += delta
+            if key == "queue_depth":
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats[key])
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        done = s["requests"] + s["failures"] + s["rate_limited"]
+        s["avg_wait_seconds"] = round(s["total_wait_seconds"] / done, 3) if done else 0.0
+        s["total_wait_seconds"] = round(s["total_wait_seconds"], 3)
+        s["max_wait_seconds"] = round(s["max_wait_seconds"], 3)
+        s["effective_rpm"] = round(self.request_bucket.rate_per_minute, 1)
+        return s
+
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.claude_requests_per_minute,
+    tokens_per_minute=settings.claude_tokens_per_minute,
+    max_concurrency=settings.llm_concurrency,
+)
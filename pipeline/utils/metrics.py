@@ -0,0 +1,182 @@
+"""
+Run instrumentation.
+Timers and counters around every pipeline stage and every outbound call
+(Supabase, Outscraper, Instagram, Yelp, websites, OpenRouter, Instantly).
+The summary (count, errors, bytes, p50/p95/max latency per stage and per
+dependency) is stored in pipeline_runs.metrics and can be exported as JSON
+or Prometheus text.
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency samples kept per name; beyond this we keep a uniform reservoir sample
+MAX_SAMPLES = 5000
+
+
+class _Series:
+    __slots__ = ("count", "errors", "bytes", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: list[float] = []
+
+    def add(self, seconds: float, nbytes: int, error: bool):
+        self.count += 1
+        self.errors += int(error)
+        self.bytes += nbytes
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "total_seconds": round(self.total, 3),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CallTimer:
+    """Handle yielded by Metrics.call(); lets the caller attach bytes/status."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.error = False
+
+    def response(self, resp):
+        """Record size and status of an HTTP response (requests/curl_cffi/httpx)."""
+        content = getattr(resp, "content", None) or b""
+        self.bytes += len(content)
+        status = getattr(resp, "status_code", 200)
+        if status >= 400 and status != 404:
+            self.error = True
+        return resp
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self._started = time.time()
+
+    def record(self, kind: str, name: str, seconds: float, nbytes: int = 0, error: bool = False):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = _Series()
+            series.add(seconds, nbytes, error)
+
+    @contextmanager
+    def call(self, dependency: str):
+        """Time one outbound call; exceptions count as errors and are re-raised."""
+        timer = CallTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.error = True
+            raise
+        finally:
+            self.record("call", dependency, time.perf_counter() - start, timer.bytes, timer.error)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one pipeline stage (or one streaming micro-batch of it)."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record("stage", name, time.perf_counter() - start, error=failed)
+
+    def summary(self) -> dict:
+        with self._lock:
+            items = list(self._series.items())
+            elapsed = time.time() - self._started
+        out: dict = {"elapsed_seconds": round(elapsed, 1), "stages": {}, "calls": {}}
+        for (kind, name), series in sorted(items):
+            out["stages" if kind == "stage" else "calls"][name] = series.summary()
+        return out
+
+    def to_prometheus(self, labels: dict | None = None) -> str:
+        summary = self.summary()
+        extra = "".join(f',{k}="{v}"' for k, v in (labels or {}).items())
+        lines = []
+        for kind, prefix in (("stages", "geospark_stage"), ("calls", "geospark_call")):
+            label = "stage" if kind == "stages" else "dependency"
+            for metric, field, help_text in (
+                ("count", "count", "Number of timed executions"),
+                ("errors", "errors", "Executions that failed"),
+                ("bytes", "bytes", "Response bytes received"),
+                ("seconds_total", "total_seconds", "Total time spent"),
+            ):
+                if kind == "stages" and field == "bytes":
+                    continue
+                lines.append(f"# HELP {prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, s in summary[kind].items():
+                    lines.append(f'{prefix}_{metric}{{{label}="{name}"{extra}}} {s[field]}')
+            lines.append(f"# HELP {prefix}_latency_seconds Latency quantiles")
+            lines.append(f"# TYPE {prefix}_latency_seconds summary")
+            for name, s in summary[kind].items():
+                for q, field in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("1", "max_ms")):
+                    value = round(s[field] / 1000, 4)
+                    lines.append(f'{prefix}_latency_seconds{{{label}="{name}",quantile="{q}"{extra}}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, labels: dict | None = None):
+        """Write the summary to `path` — Prometheus text for *.prom, JSON otherwise."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus(labels))
+            else:
+                json.dump({**(labels or {}), **self.summary()}, f, indent=2)
+
+
+def instrument_supabase(client):
+    """Time every PostgREST request (including connection failures) made through a supabase-py client."""
+    session = client.postgrest.session
+    send = session.send
+
+    def timed_send(request, **kwargs):
+        with metrics.call("supabase") as call:
+            response = send(request, **kwargs)
+            response.read()
+            return call.response(response)
+
+    session.send = timed_send
+
+
+metrics = Metrics()
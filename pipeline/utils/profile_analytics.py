@@ -0,0 +1,131 @@
+"""
+Bulk re-analysis of stored Instagram profiles (daily_workflow.py --reanalyze-profiles).
+Recomputes engagement and posting figures for every stored profile from its
+prospect_posts with InstagramScraper's own per-profile methods, so stored and
+freshly scraped figures can't drift apart. The speedup is in the database
+work: a page of profiles per query, their posts read concurrently in chunks,
+and one upsert per page, instead of a read and a write per profile.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from scrapers.instagram_scraper import InstagramScraper
+
+# Rows per page; PostgREST caps every response (1000 rows by default)
+PAGE_SIZE = 1000
+# Profile ids per prospect_posts IN (...) query, keeping the URL short
+_IDS_PER_QUERY = 100
+
+_POST_COLUMNS = "social_profile_id, post_date, likes, comments, post_type"
+
+
+def _stored_posts(profile_ids: list) -> list[dict]:
+    """
+    prospect_posts rows for the given profiles, newest first as scrape_profile()
+    sees them (tied post types rank by first appearance), paged under PostgREST's row cap.
+    """
+    rows = 0
+    posts: list[dict] = []
+    while True:
+        page = (
+            db.table("prospect_posts")
+            .select(_POST_COLUMNS)
+            .in_("social_profile_id", profile_ids)
+            .order("post_date", desc=True)
+            .order("id")
+            .range(rows, rows + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        posts.extend(page)
+        rows += len(page)
+        if len(page) < PAGE_SIZE:
+            return posts
+
+
+def _post(row: dict) -> dict:
+    """A prospect_posts row in the shape scrape_profile() posts have (NULL counts are 0)."""
+    return {
+        "post_date": row.get("post_date"),
+        "likes": row.get("likes") or 0,
+        "comments": row.get("comments") or 0,
+        "post_type": row.get("post_type") or "photo",
+    }
+
+
+def analyze_profile(posts: list[dict], followers: int | None, now: datetime | None = None) -> dict:
+    """prospect_social_profiles figures for one profile's posts."""
+    engagement = InstagramScraper._calculate_engagement(posts, followers or 0)
+    patterns = InstagramScraper._analyze_posting_patterns(posts, now)
+    return {
+        "engagement_rate": engagement.get("avg_engagement_rate"),
+        "posts_last_30_days": patterns.get("posts_last_30_days", 0),
+        "last_post_date": patterns.get("last_post_date"),
+        "posting_frequency": patterns.get("posts_per_month"),
+        "posting_patterns": patterns,
+        "engagement_details": engagement,
+    }
+
+
+def reanalyze_stored_profiles(now: datetime | None = None) -> int:
+    """
+    Recompute engagement and posting figures for every stored Instagram profile
+    from its prospect_posts, and write them back a page of profiles at a time.
+    Returns profiles updated.
+    """
+    now = now or datetime.now(timezone.utc)
+    updated = 0
+    offset = 0
+    while True:
+        try:
+            profiles = (
+                db.table("prospect_social_profiles")
+                .select("id, lead_id, platform, followers, raw_data")
+                .eq("platform", "instagram")
+                .order("id")
+                .range(offset, offset + PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+        except Exception as e:
+            logger.error(f"Profile re-analysis: reading profiles at offset {offset} failed: {e}")
+            break
+        if not profiles:
+            break
+        offset += len(profiles)
+
+        posts: dict[str, list[dict]] = {p["id"]: [] for p in profiles}
+        ids = list(posts)
+        chunks = [ids[start:start + _IDS_PER_QUERY] for start in range(0, len(ids), _IDS_PER_QUERY)]
+        try:
+            with ThreadPoolExecutor(max_workers=settings.supabase_pool_size, thread_name_prefix="posts") as pool:
+                for chunk in pool.map(_stored_posts, chunks):
+                    for row in chunk:
+                        posts[row["social_profile_id"]].append(_post(row))
+        except Exception as e:
+            # Skip the page rather than overwrite its figures from partial posts
+            logger.warning(f"Profile re-analysis: reading posts for {len(profiles)} profiles failed: {e}")
+            continue
+
+        updates = []
+        for p in profiles:
+            figures = analyze_profile(posts[p["id"]], p.get("followers"), now)
+            details = {k: figures.pop(k) for k in ("posting_patterns", "engagement_details")}
+            updates.append({
+                "lead_id": p["lead_id"],
+                "platform": p["platform"],
+                **figures,
+                "raw_data": {**(p.get("raw_data") or {}), **details},
+                "updated_at": now.isoformat(),
+            })
+        try:
+            db.table("prospect_social_profiles").upsert(updates, on_conflict="lead_id,platform").execute()
+            updated += len(updates)
+        except Exception as e:
+            logger.error(f"Profile re-analysis: saving {len(updates)} profiles failed: {e}")
+        if updated % (10 * PAGE_SIZE) == 0 or len(profiles) < PAGE_SIZE:
+            logger.info(f"Profile re-analysis: {updated} profiles updated")
+        if len(profiles) < PAGE_SIZE:
+            break
+    return updated
@@ -0,0 +1,249 @@
+"""
+Instagram profile cache shared by prospect enrichment and competitor analysis.
+Popular competitor accounts come up again for every lead in a category, and each
+live lookup spends the scarce Instagram budget. Profiles are looked up by
+username, in this order:
+
+1. in-process memory (the instagram_cache_memory_entries most recently used)
+2. a local SQLite store (a ResponseCache, shared across processes and runs)
+3. prospect_social_profiles plus prospect_posts, by username; only rows a full
+   scrape wrote count (raw_data.profile_scraped_at), not the partial rows other
+   sources pre-save
+
+How an entry is used depends on its age:
+- younger than the caller's freshness (instagram_cache_fresh_hours by default):
+  served as-is
+- younger than instagram_cache_stale_hours: served, and refetched in the
+  background (stale-while-revalidate)
+- older, or not cached: fetched live
+Profiles that don't exist (404) are remembered for the freshness window too.
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.response_cache import ResponseCache, KeyLocks
+
+# Stored for usernames Instagram answered 404 for
+_MISSING = {"missing": True}
+# prospect_social_profiles rows read per username (one per lead that has the account)
+_DB_CANDIDATES = 5
+
+_PROFILE_COLUMNS = (
+    "id, username, profile_url, followers, following, posts_count, engagement_rate, "
+    "posts_last_30_days, last_post_date, posting_frequency, bio, is_business_account, "
+    "is_private, content_breakdown, tools_detected, raw_data, scraped_at"
+)
+
+
+def _epoch(value) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def profile_from_rows(row: dict, posts: list[dict]) -> dict:
+    """Rebuild a scrape_profile() result from its prospect_social_profiles / prospect_posts rows."""
+    raw = row.get("raw_data") or {}
+    return {
+        "username": row["username"],
+        "profile_url": row.get("profile_url") or f"https://instagram.com/{row['username']}",
+        "followers": row.get("followers"),
+        "following": row.get("following"),
+        "posts_count": row.get("posts_count"),
+        "bio": row.get("bio"),
+        "is_business_account": row.get("is_business_account"),
+        "is_private": bool(row.get("is_private")),
+        "engagement_rate": row.get("engagement_rate"),
+        "posts_last_30_days": row.get("posts_last_30_days"),
+        "last_post_date": row.get("last_post_date"),
+        "posting_frequency": row.get("posting_frequency"),
+        "posts": [
+            {
+                "post_url": p.get("post_url"),
+                "post_date": p.get("post_date"),
+                "caption": p.get("caption"),
+                "likes": p.get("likes") or 0,
+                "comments": p.get("comments") or 0,
+                "post_type": p.get("post_type") or "photo",
+                "is_video": p.get("post_type") == "video",
+                "video_view_count": p.get("views"),
+            }
+            for p in posts
+        ],
+        "posting_patterns": raw.get("posting_patterns", {}),
+        "content_breakdown": row.get("content_breakdown") or {},
+        "tools_detected": row.get("tools_detected") or [],
+        "engagement_details": raw.get("engagement_details", {}),
+        "scraped_at": raw.get("profile_scraped_at") or row.get("scraped_at"),
+    }
+
+
+class ProfileCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gates = KeyLocks()
+        self._memory: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._store = ResponseCache(settings.instagram_cache_path, settings.instagram_cache_max_mb * 1024 * 1024)
+        self._pending: set[str] = set()
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self.stats = {"fresh": 0, "stale": 0, "misses": 0, "db_hits": 0, "revalidated": 0, "revalidate_dropped": 0}
+
+    def configure(self, path: str | None = None):
+        """Point the local tier at another file and forget what's in memory."""
+        self._store.configure(path)
+        with self._lock:
+            self._memory = OrderedDict()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {k: 0 for k in self.stats}
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["fresh"] + stats["stale"] + stats["misses"]
+        stats["hit_rate"] = round((stats["fresh"] + stats["stale"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    # ── Tiers ──
+
+    def lookup(self, username: str) -> tuple[dict, float] | None:
+        """(profile, age in seconds) from the fastest tier that has it."""
+        with self._lock:
+            entry = self._memory.get(username)
+            if entry:
+                self._memory.move_to_end(username)
+        if entry:
+            return entry[0], time.time() - entry[1]
+        try:
+            stored = self._store.lookup(username)
+        except Exception as e:
+            logger.warning(f"Instagram cache read failed for @{username}: {e}")
+            stored = None
+        if stored:
+            profile, age = stored
+            self._remember(username, profile, time.time() - age)
+            return profile, age
+        return self._lookup_db(username)
+
+    def _lookup_db(self, username: str) -> tuple[dict, float] | None:
+        try:
+            rows = (
+                db.table("prospect_social_profiles")
+                .select(_PROFILE_COLUMNS)
+                .eq("platform", "instagram")
+                .eq("username", username)
+                .order("scraped_at", desc=True)
+                .limit(_DB_CANDIDATES)
+                .execute()
+            ).data or []
+            # scraped_at defaults to NOW() on any insert; only a full scrape stamps raw_data
+            scraped, row = max(
+                ((_epoch((r.get("raw_data") or {}).get("profile_scraped_at")), r) for r in rows),
+                key=lambda entry: entry[0] or 0,
+                default=(None, None),
+            )
+            if not scraped:
+                return None
+            posts = (
+                db.table("prospect_posts")
+                .select("post_url, post_date, caption, likes, comments, views, post_type")
+                .eq("social_profile_id", row["id"])
+                .execute()
+            ).data or []
+        except Exception as e:
+            logger.warning(f"Instagram cache DB lookup failed for @{username}: {e}")
+            return None
+        self._count("db_hits")
+        profile = profile_from_rows(row, posts)
+        self.put(username, profile, fetched_at=scraped)
+        return profile, time.time() - scraped
+
+    def _remember(self, username: str, profile: dict, fetched_at: float):
+        with self._lock:
+            self._memory[username] = (profile, fetched_at)
+            self._memory.move_to_end(username)
+            while len(self._memory) > settings.instagram_cache_memory_entries:
+                self._memory.popitem(last=False)
+
+    def put(self, username: str, profile: dict, fetched_at: float | None = None):
+        fetched_at = fetched_at or time.time()
+        self._remember(username, profile, fetched_at)
+        try:
+            self._store.put(username, "instagram_profile", profile, created_at=fetched_at)
+        except Exception as e:
+            logger.warning(f"Instagram cache write failed for @{username}: {e}")
+
+    def put_missing(self, username: str):
+        self.put(username, _MISSING)
+
+    # ── Reads ──
+
+    def get(self, username: str, fetch, fresh_hours: float | None = None) -> dict | None:
+        """Profile for `username`, calling `fetch(username)` only when the cache can't serve it."""
+        if not settings.instagram_cache:
+            return fetch(username)
+        fresh = (fresh_hours if fresh_hours is not None else settings.instagram_cache_fresh_hours) * 3600
+        # One lookup/fetch per username at a time; the second caller then finds it cached
+        with self._gates.hold(username):
+            entry = self.lookup(username)
+            if entry:
+                profile, age = entry
+                if age <= fresh:
+                    self._count("fresh")
+                    return None if profile == _MISSING else profile
+                if age <= settings.instagram_cache_stale_hours * 3600:
+                    self._count("stale")
+                    self._revalidate(username, fetch)
+                    return None if profile == _MISSING else profile
+            self._count("misses")
+            profile = fetch(username)
+            if profile:
+                self.put(username, profile)
+            return profile
+
+    # ── Background refresh ──
+
+    def _revalidate(self, username: str, fetch):
+        with self._lock:
+            if username in self._pending:
+                return
+            if len(self._pending) >= settings.instagram_revalidate_queue:
+                self.stats["revalidate_dropped"] += 1
+                return
+            self._pending.add(username)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._revalidate_loop, name="ig-revalidate", daemon=True)
+                self._worker.start()
+        self._queue.put((username, fetch))
+
+    def _revalidate_loop(self):
+        while True:
+            username, fetch = self._queue.get()
+            try:
+                profile = fetch(username)
+                if profile:
+                    self.put(username, profile)
+                    self._count("revalidated")
+            except Exception as e:
+                logger.warning(f"Instagram revalidation failed for @{username}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(username)
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,181 @@
+"""
+Proxy pool for Instagram scraping.
+Instagram throttles per exit IP, so one proxy caps Instagram throughput. With
+several (SOCIAL_PROXIES), each proxy gets:
+
+- its own adaptive limiter (utils/adaptive_limiter.py) and one request in flight
+- a health score: success rate and latency, both smoothed (EWMA)
+- quarantine: the limiter's cooldown after a 429 or repeated failures, or
+  proxy_quarantine_seconds when its success rate drops below proxy_min_success
+- sticky usernames: a username keeps its proxy while that proxy is healthy,
+  so Instagram sees each profile fetched from one IP
+
+Enrichment runs one worker per healthy proxy, so throughput grows with the
+number of proxies.
+"""
+
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from config.settings import settings
+from utils.logger import logger
+from utils.adaptive_limiter import AdaptiveLimiter
+
+# Smoothing factor for the success-rate and latency averages
+_ALPHA = 0.2
+
+
+def proxy_urls() -> list[str]:
+    """SOCIAL_PROXIES (comma/whitespace separated) plus SOCIAL_PROXY, deduplicated in order."""
+    urls = re.split(r"[\s,]+", settings.social_proxies or "") + [settings.social_proxy or ""]
+    return list(dict.fromkeys(u for u in urls if u))
+
+
+class Proxy:
+    def __init__(self, url: str):
+        self.url = url
+        parsed = urlparse(url)
+        # host:port only, so credentials never reach the logs
+        self.label = f"{parsed.hostname}:{parsed.port}" if parsed.port else (parsed.hostname or url)
+        self.limiter = AdaptiveLimiter(f"Instagram via {self.label}")
+        self.slot = threading.Lock()
+        self._lock = threading.Lock()
+        self.success_rate = 1.0
+        self.latency: float | None = None
+        self.quarantined_until = 0.0
+        self.stats = {"requests": 0, "successes": 0, "failures": 0, "throttled": 0, "quarantines": 0}
+
+    @property
+    def proxies(self) -> dict:
+        return {"http": self.url, "https": self.url}
+
+    def quarantined_for(self) -> float:
+        return max(self.limiter.resume_in(), self.quarantined_until - time.monotonic(), 0.0)
+
+    def score(self) -> float:
+        """Higher is better: success rate, discounted by latency over the target."""
+        latency = self.latency or 0.0
+        return self.success_rate / (1.0 + latency / settings.proxy_latency_target_seconds)
+
+    # ── Feedback (also drives the proxy's limiter) ──
+
+    def success(self, latency: float | None = None):
+        self.limiter.success()
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["successes"] += 1
+            self.success_rate += _ALPHA * (1.0 - self.success_rate)
+            if latency is not None:
+                self.latency = latency if self.latency is None else self.latency + _ALPHA * (latency - self.latency)
+
+    def failure(self, reason: str = "error"):
+        self.limiter.failure(reason)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["failures"] += 1
+            self.success_rate -= _ALPHA * self.success_rate
+            if self.success_rate < settings.proxy_min_success:
+                self._quarantine(f"success rate {self.success_rate:.0%} ({reason})")
+
+    def throttled(self, retry_after: float | None = None):
+        self.limiter.throttled(retry_after)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["throttled"] += 1
+            self.success_rate -= _ALPHA * self.success_rate
+
+    def _quarantine(self, reason: str):
+        self.quarantined_until = time.monotonic() + settings.proxy_quarantine_seconds
+        self.stats["quarantines"] += 1
+        # Back on probation afterwards rather than straight back to "unhealthy"
+        self.success_rate = max(self.success_rate, settings.proxy_min_success * 2)
+        logger.warning(f"Proxy {self.label} quarantined for {settings.proxy_quarantine_seconds:.0f}s: {reason}")
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["success_rate"] = round(self.success_rate, 3)
+            stats["latency_seconds"] = round(self.latency, 3) if self.latency is not None else None
+        stats["score"] = round(self.score(), 3)
+        stats["quarantined_seconds"] = round(self.quarantined_for(), 1)
+        stats["rate_per_min"] = self.limiter.summary()["rate_per_min"]
+        return stats
+
+
+class ProxyPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.proxies: list[Proxy] = []
+        self._sticky: dict[str, Proxy] = {}
+        self._load: dict[str, int] = {}
+        self.stats = {"assigned": 0, "sticky": 0, "reassigned": 0}
+        self.configure()
+
+    def configure(self):
+        """(Re)build the pool from settings; health, limiters and sticky assignments start over."""
+        with self._lock:
+            self.proxies = [Proxy(url) for url in proxy_urls()]
+            # Rotating-session proxies often share host:port; keep labels unique
+            seen: dict[str, int] = {}
+            for proxy in self.proxies:
+                seen[proxy.label] = seen.get(proxy.label, 0) + 1
+                if seen[proxy.label] > 1:
+                    proxy.label = f"{proxy.label}#{seen[proxy.label]}"
+                    proxy.limiter.name = f"Instagram via {proxy.label}"
+            self._sticky = {}
+            self._load = {p.url: 0 for p in self.proxies}
+            self.stats = {k: 0 for k in self.stats}
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def healthy(self) -> list[Proxy]:
+        return [p for p in self.proxies if not p.quarantined_for()]
+
+    def assign(self, username: str) -> Proxy | None:
+        """The username's proxy: its sticky one while healthy, else the best healthy one (None if no proxies)."""
+        with self._lock:
+            if not self.proxies:
+                return None
+            current = self._sticky.get(username)
+            if current and not current.quarantined_for():
+                self.stats["sticky"] += 1
+                return current
+            healthy = [p for p in self.proxies if not p.quarantined_for()]
+            if healthy:
+                # Spread usernames across proxies, then prefer the healthier one
+                proxy = min(healthy, key=lambda p: (self._load[p.url], -p.score()))
+            else:
+                # All quarantined: the one back soonest (its limiter decides whether to wait)
+                proxy = min(self.proxies, key=lambda p: p.quarantined_for())
+            if current and current is not proxy:
+                self._load[current.url] -= 1
+                self.stats["reassigned"] += 1
+            if current is not proxy:
+                self._load[proxy.url] += 1
+                self._sticky[username] = proxy
+            self.stats["assigned"] += 1
+            return proxy
+
+    def best(self) -> Proxy | None:
+        """Healthiest available proxy, for callers without a username (e.g. Instaloader sessions)."""
+        with self._lock:
+            if not self.proxies:
+                return None
+            healthy = [p for p in self.proxies if not p.quarantined_for()]
+            if healthy:
+                return max(healthy, key=lambda p: p.score())
+            return min(self.proxies, key=lambda p: p.quarantined_for())
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            proxies = list(self.proxies)
+        stats["size"] = len(proxies)
+        stats["healthy"] = sum(1 for p in proxies if not p.quarantined_for())
+        stats["proxies"] = {p.label: p.summary() for p in proxies}
+        return stats
+
+
+proxy_pool = ProxyPool()
@@ -0,0 +1,83 @@
+"""
+Per-query harvesting watermarks for Outscraper.
+For each "category in location" query we remember the next `skip` offset,
+the place_ids it has yielded, and whether it has run dry. Daily runs can then
+page past results they already paid for, and the scheduler can move on from
+exhausted queries. Exhausted queries are re-opened from offset 0 after
+outscraper_recheck_days to pick up businesses that opened since.
+Stored in pipeline_query_watermarks (migration 20260305000000).
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+from utils.response_cache import normalize_query
+
+TABLE = "pipeline_query_watermarks"
+
+
+def query_key(query: str, language: str = "en") -> str:
+    return f"{normalize_query(query)}|{language}"
+
+
+class QueryWatermarks:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict[str, dict] = {}
+
+    def reset(self):
+        with self._lock:
+            self._rows = {}
+
+    def get(self, query: str, language: str = "en") -> dict | None:
+        """Watermark for a query (a fresh one if never run); None if the table can't be read."""
+        key = query_key(query, language)
+        with self._lock:
+            if key in self._rows:
+                return self._rows[key]
+        try:
+            result = db.table(TABLE).select("*").eq("query_key", key).limit(1).execute()
+        except Exception as e:
+            logger.warning(f"Query watermark lookup failed for '{query}' (full search instead): {e}")
+            return None
+        row = result.data[0] if result.data else {
+            "query_key": key,
+            "query": query,
+            "language": language,
+            "next_skip": 0,
+            "place_ids": [],
+            "results_seen": 0,
+            "new_places": 0,
+            "exhausted": False,
+            "exhausted_at": None,
+        }
+        row["place_ids"] = list(row.get("place_ids") or [])
+        self._reopen_if_stale(row)
+        with self._lock:
+            return self._rows.setdefault(key, row)
+
+    def _reopen_if_stale(self, row: dict):
+        if not row.get("exhausted") or not row.get("exhausted_at"):
+            return
+        exhausted_at = datetime.fromisoformat(str(row["exhausted_at"]).replace("Z", "+00:00"))
+        if datetime.now(timezone.utc) - exhausted_at >= timedelta(days=settings.outscraper_recheck_days):
+            logger.info(f"Re-opening exhausted query '{row['query']}' (last run dry {exhausted_at:%Y-%m-%d})")
+            row.update(next_skip=0, exhausted=False, exhausted_at=None)
+
+    def is_exhausted(self, query: str, language: str = "en") -> bool:
+        mark = self.get(query, language)
+        return bool(mark and mark.get("exhausted"))
+
+    def save(self, mark: dict):
+        now = datetime.now(timezone.utc).isoformat()
+        row = {**mark, "last_run_at": now, "updated_at": now}
+        row.pop("created_at", None)
+        try:
+            db.table(TABLE).upsert(row, on_conflict="query_key").execute()
+        except Exception as e:
+            logger.error(f"Failed to save query watermark for '{mark['query']}': {e}")
+
+
+query_watermarks = QueryWatermarks()
@@ -0,0 +1,218 @@
+"""
+Persistent response cache for Outscraper google_maps_search (its ResponseCache
+store is also the local tier of utils/profile_cache.py).
+Responses are stored in a local SQLite file (WAL, shared by market worker
+processes). Each one is keyed by a hash of the normalized request: query,
+limit and language. The competitor finder repeats "{category} in {city}" for
+every lead in a market, and the first lead's search answers all of them.
+
+- TTL: each caller passes its own max age, and older entries count as misses
+- size bound: past outscraper_cache_max_mb the least recently used entries go
+- single flight: concurrent misses for one key make one API call (the
+  per-key lock is dropped once nobody holds or waits for it)
+- bypass: OUTSCRAPER_CACHE=false, or refresh=True for a single call
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from config.settings import settings
+from utils.logger import logger
+from utils.concurrency import destination_slot
+from utils.metrics import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+# Fraction of max size to shrink to on eviction, so we don't evict on every write
+EVICT_TO = 0.9
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def request_key(kind: str, **params) -> tuple[str, str]:
+    """(content hash, canonical request JSON) for a request."""
+    request = json.dumps({"kind": kind, **params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(request.encode("utf-8")).hexdigest(), request
+
+
+class KeyLocks:
+    """A lock per key, kept only while some thread holds or waits for it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: dict[str, list] = {}  # key → [lock, holders + waiters]
+
+    @contextmanager
+    def hold(self, key: str):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locks)
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inflight = KeyLocks()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0, "bypassed": 0}
+
+    def configure(self, path: str | None = None, max_bytes: int | None = None):
+        """Point the cache at another file (connections are reopened per thread)."""
+        self.path = path or self.path
+        self.max_bytes = max_bytes or self.max_bytes
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def lookup(self, key: str) -> tuple[object, float] | None:
+        """(response, age in seconds) for a key, whatever its age."""
+        row = self._conn().execute(
+            "SELECT body, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        self._conn().execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), now - row[1]
+
+    def get(self, key: str, ttl_seconds: float):
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        if entry[1] > ttl_seconds:
+            self._count("expired")
+            return None
+        return entry[0]
+
+    def put(self, key: str, request: str, response, created_at: float | None = None):
+        body = json.dumps(response, separators=(",", ":"), default=str)
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, request, body, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, request, body, len(body), created_at or now, now),
+        )
+        self._count("stores")
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * EVICT_TO)
+        freed = evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if freed >= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        with self._lock:
+            self.stats["evictions"] += evicted
+        logger.debug(f"Response cache: evicted {evicted} entries ({freed // 1024} KB)")
+
+    def fetch(self, kind: str, params: dict, ttl_seconds: float, call, refresh: bool = False):
+        """Cached result of `call()` for this request, calling it (once per key) on a miss."""
+        if not settings.outscraper_cache or ttl_seconds <= 0:
+            self._count("bypassed")
+            return call()
+        key, request = request_key(kind, **params)
+        with self._inflight.hold(key):
+            if not refresh:
+                try:
+                    cached = self.get(key, ttl_seconds)
+                except sqlite3.Error as e:
+                    logger.warning(f"Response cache read failed ({self.path}): {e}")
+                    cached = None
+                if cached is not None:
+                    self._count("hits")
+                    return cached
+            self._count("misses")
+            response = call()
+            # Empty results are usually transient (quota, outage); don't pin them for the TTL
+            if response and response[0]:
+                try:
+                    self.put(key, request, response)
+                except sqlite3.Error as e:
+                    logger.warning(f"Response cache write failed ({self.path}): {e}")
+            return response
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {k: 0 for k in self.stats}
+
+
+outscraper_cache = ResponseCache(
+    settings.outscraper_cache_path,
+    settings.outscraper_cache_max_mb * 1024 * 1024,
+)
+
+
+def google_maps_search(
+    client, query: str, limit: int, language: str, ttl_hours: float,
+    skip: int = 0, coordinates: str = "", refresh: bool = False,
+):
+    """ApiClient.google_maps_search through outscraper_cache (only misses count as outscraper calls)."""
+
+    def call():
+        with destination_slot("outscraper"), metrics.call("outscraper"):
+            return client.google_maps_search(
+                query, limit=limit, language=language, skip=skip, coordinates=coordinates,
+            )
+
+    params = {
+        "query": normalize_query(query), "limit": limit, "language": language,
+        "skip": skip, "coordinates": coordinates,
+    }
+    return outscraper_cache.fetch("google_maps_search", params, ttl_hours * 3600, call, refresh=refresh)
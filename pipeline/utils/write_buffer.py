@@ -0,0 +1,188 @@
+"""
+Write-behind buffer for outreach_leads.
+Per-lead field changes made during a stage are merged in memory and written
+with one apply_lead_patches() RPC per batch — at stage boundaries, when the
+buffer holds write_buffer_size leads, on a timer once its oldest change is
+write_buffer_seconds old, and at interpreter exit. Compare-and-set conditions
+(expected pipeline_status / lease_owner) travel with each patch, so stale
+writes are still rejected by the database. flush() reports every lead whose
+write has not landed (rejected, or re-queued after a failed RPC), including
+those found by the size/age flushes in between.
+"""
+
+import atexit
+import threading
+import time
+from config.settings import settings
+from config.database import db
+from utils.logger import logger
+
+# Patches per apply_lead_patches() call
+RPC_CHUNK = 500
+
+
+class LeadWriteBuffer:
+    def __init__(self, client=None, max_rows: int | None = None, max_seconds: float | None = None):
+        self._client = client
+        self._max_rows = max_rows
+        self._max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[str, dict] = {}  # lead_id → {"fields": {...}, "expect": {...}}
+        self._oldest: float | None = None
+        self._timer: threading.Timer | None = None
+        self._unlanded: set[str] = set()  # found by size/age flushes, reported by the next flush()
+        self.stats = {"updates": 0, "flushes": 0, "round_trips": 0, "rejected": 0}
+
+    @property
+    def db(self):
+        return self._client or db
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None or settings.write_behind
+
+    @property
+    def max_rows(self) -> int:
+        return self._max_rows or settings.write_buffer_size
+
+    @property
+    def max_seconds(self) -> float:
+        return self._max_seconds or settings.write_buffer_seconds
+
+    def update(self, lead_id: str, fields: dict, expect: dict | None = None) -> bool:
+        """
+        Queue a field change for one lead (applied immediately when write-behind is off).
+        `expect` holds column values the row must still have for the write to land.
+        Buffered writes return True optimistically; rejections surface from flush().
+        """
+        if not self.enabled:
+            query = self.db.table("outreach_leads").update(fields).eq("id", lead_id)
+            for col, value in (expect or {}).items():
+                query = query.is_(col, "null") if value is None else query.eq(col, value)
+            result = query.execute()
+            return bool(result.data) if expect else True
+
+        with self._lock:
+            entry = self._pending.setdefault(lead_id, {"fields": {}, "expect": {}})
+            entry["fields"].update(fields)
+            # Conditions refer to the row as stored, i.e. before the first buffered change
+            for col, value in (expect or {}).items():
+                entry["expect"].setdefault(col, value)
+            now = time.monotonic()
+            if self._oldest is None:
+                self._oldest = now
+                self._arm_timer(self.max_seconds)
+            self.stats["updates"] += 1
+            due = len(self._pending) >= self.max_rows or now - self._oldest >= self.max_seconds
+
+        if due:
+            self._flush_due()
+        return True
+
+    def flush(self, lead_ids: list[str] | None = None) -> set[str]:
+        """
+        Write buffered changes (all, or only `lead_ids`). Returns the IDs whose write
+        has not landed: rejected by their expect conditions, or re-queued after a failed RPC.
+        """
+        unlanded = self._write(lead_ids)
+        with self._lock:
+            earlier = self._unlanded & set(lead_ids) if lead_ids is not None else self._unlanded
+            self._unlanded = self._unlanded - earlier
+        return unlanded | earlier
+
+    def _flush_due(self):
+        """
+        Size/age flush, on the thread that found it due (an update() or the timer).
+        Nobody waits on its result: unlanded IDs go to the next flush().
+        """
+        unlanded = self._write(None)
+        with self._lock:
+            self._unlanded |= unlanded
+
+    def _arm_timer(self, delay: float):
+        """Age-based flush even when no further update() arrives (caller holds _lock)."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            age = time.monotonic() - self._oldest if self._oldest is not None else None
+            if age is not None and age < self.max_seconds:
+                self._arm_timer(self.max_seconds - age)  # flushed since; wait for the new oldest
+                return
+        if age is None:
+            return
+        try:
+            self._flush_due()
+        except Exception as e:
+            logger.error(f"Write-behind timed flush failed: {e}")
+
+    def _write(self, lead_ids: list[str] | None) -> set[str]:
+        with self._flush_lock:
+            with self._lock:
+                if lead_ids is None:
+                    batch, self._pending, self._oldest = self._pending, {}, None
+                else:
+                    batch = {i: self._pending.pop(i) for i in lead_ids if i in self._pending}
+                    if not self._pending:
+                        self._oldest = None
+            if not batch:
+                return set()
+
+            patches = [{"id": lead_id, **entry} for lead_id, entry in batch.items()]
+            applied: set[str] = set()
+            requeued: set[str] = set()
+            for i in range(0, len(patches), RPC_CHUNK):
+                chunk = patches[i:i + RPC_CHUNK]
+                try:
+                    result = self.db.rpc("apply_lead_patches", {"p_patches": chunk}).execute()
+                except Exception as e:
+                    logger.error(f"Write-behind flush of {len(chunk)} leads failed: {e} — re-queued")
+                    self._requeue(chunk)
+                    requeued.update(p["id"] for p in chunk)
+                    continue
+                applied.update(str(row["id"]) for row in result.data or [])
+                self.stats["round_trips"] += 1
+
+            rejected = set(batch) - applied - requeued
+            with self._lock:
+                self._unlanded -= applied  # re-queued earlier, landed now
+            self.stats["flushes"] += 1
+            self.stats["rejected"] += len(rejected)
+            if rejected:
+                logger.warning(f"Write-behind: {len(rejected)} lead updates rejected (left their stage elsewhere)")
+            return rejected | requeued
+
+    def _requeue(self, patches: list[dict]):
+        with self._lock:
+            for p in patches:
+                entry = self._pending.setdefault(p["id"], {"fields": {}, "expect": {}})
+                # Changes queued since the failed flush are newer and win
+                entry["fields"] = {**p["fields"], **entry["fields"]}
+                entry["expect"] = {**entry["expect"], **p["expect"]}
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._arm_timer(self.max_seconds)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+write_buffer = LeadWriteBuffer()
+
+
+def _flush_at_exit():
+    if not write_buffer.pending():
+        return
+    try:
+        write_buffer.flush()
+    except Exception as e:
+        logger.error(f"Write-behind flush at exit failed: {e}")
+
+
+atexit.register(_flush_at_exit)
@@ -131,7 +131,7 @@ def main():
             print(f"  Pain Points: {', '.join(pain_points) if pain_points else 'None'}")
             print(f"  Strengths: {', '.join(strengths) if strengths else 'None'}\n")
 
-    print("--- Summarized Insights ---\")
+    print("--- Summarized Insights ---")
     print("\nOverall Sentiment Distribution:")
     for sentiment_type, count in sentiments.items():
         print(f"  {sentiment_type.capitalize()}: {count}")
@@ -0,0 +1,56 @@
+-- PIPELINE LEAD LEASES
+-- Lets several pipeline workers (processes or machines) share the stages safely.
+-- A worker atomically claims N leads for a stage with an owner ID and an expiry;
+-- expired leases are reclaimed after crashes, and completion is a compare-and-set
+-- on the previous pipeline_status (see pipeline/utils/leases.py).
+
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS lease_owner TEXT;
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS lease_stage TEXT;
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_lease ON outreach_leads(pipeline_status, lease_expires_at);
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_lease_owner ON outreach_leads(lease_owner);
+
+-- Claim up to p_limit leads in p_pipeline_status whose lease is free or expired.
+-- FOR UPDATE SKIP LOCKED makes concurrent claims hand out disjoint sets.
+-- Leads stuck in a transitional enrichment_status by a crashed worker of the
+-- same stage are reclaimable once their lease expires.
+CREATE OR REPLACE FUNCTION claim_pipeline_leads(
+  p_stage TEXT,
+  p_owner TEXT,
+  p_limit INTEGER,
+  p_lease_seconds INTEGER,
+  p_pipeline_status TEXT,
+  p_enrichment_status TEXT DEFAULT NULL,
+  p_set_enrichment_status TEXT DEFAULT NULL,
+  p_score_tiers TEXT[] DEFAULT NULL,
+  p_require_email BOOLEAN DEFAULT FALSE
+)
+RETURNS SETOF outreach_leads
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE outreach_leads l
+  SET lease_owner = p_owner,
+      lease_stage = p_stage,
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+      enrichment_status = COALESCE(p_set_enrichment_status, l.enrichment_status)
+  WHERE l.id IN (
+    SELECT c.id FROM outreach_leads c
+    WHERE c.pipeline_status = p_pipeline_status
+      AND (c.lease_owner IS NULL OR c.lease_expires_at < NOW())
+      AND (
+        p_enrichment_status IS NULL
+        OR c.enrichment_status = p_enrichment_status
+        OR (c.lease_stage = p_stage AND c.lease_expires_at < NOW())
+      )
+      AND (p_score_tiers IS NULL OR c.score_tier = ANY(p_score_tiers))
+      AND (NOT p_require_email OR c.contact_email IS NOT NULL OR c.owner_email IS NOT NULL)
+    ORDER BY c.created_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING l.*;
+END;
+$$;
@@ -0,0 +1,5 @@
+-- PIPELINE RUN METRICS
+-- Per-stage and per-dependency timing summary for each run
+-- (count, errors, bytes, p50/p95/max latency), written by pipeline/utils/metrics.py.
+
+ALTER TABLE pipeline_runs ADD COLUMN IF NOT EXISTS metrics JSONB DEFAULT '{}';
@@ -0,0 +1,46 @@
+-- APPLY LEAD PATCHES
+-- Bulk partial update of outreach_leads used by the pipeline's write-behind buffer
+-- (pipeline/utils/write_buffer.py). Each patch is
+--   {"id": <uuid>, "fields": {col: value, ...}, "expect": {col: value, ...}}
+-- and only lands if every "expect" column still holds the given value
+-- (compare-and-set on pipeline_status / lease_owner). Returns the IDs applied.
+
+CREATE OR REPLACE FUNCTION apply_lead_patches(p_patches JSONB)
+RETURNS TABLE(id UUID)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  patch JSONB;
+  sets TEXT;
+  conds TEXT;
+  applied UUID;
+BEGIN
+  FOR patch IN SELECT * FROM jsonb_array_elements(p_patches) LOOP
+    SELECT string_agg(format('%I = f.%I', k, k), ', ')
+      INTO sets
+      FROM jsonb_object_keys(patch->'fields') k;
+    CONTINUE WHEN sets IS NULL;
+
+    SELECT COALESCE(string_agg(format(' AND l.%I IS NOT DISTINCT FROM e.%I', k, k), ''), '')
+      INTO conds
+      FROM jsonb_object_keys(COALESCE(patch->'expect', '{}'::jsonb)) k;
+
+    applied := NULL;
+    EXECUTE format(
+      'UPDATE outreach_leads l SET %s
+         FROM jsonb_populate_record(NULL::outreach_leads, $1) f,
+              jsonb_populate_record(NULL::outreach_leads, $2) e
+        WHERE l.id = $3%s
+        RETURNING l.id',
+      sets, conds
+    )
+    INTO applied
+    USING patch->'fields', COALESCE(patch->'expect', '{}'::jsonb), (patch->>'id')::uuid;
+
+    IF applied IS NOT NULL THEN
+      id := applied;
+      RETURN NEXT;
+    END IF;
+  END LOOP;
+END;
+$$;
@@ -0,0 +1,33 @@
+-- ============================================
+-- LEAD DEDUP KEY
+-- Normalized business name + city used by the pipeline's bulk ingest
+-- (pipeline/utils/lead_ingest.py) as the upsert conflict target, so scrapers
+-- insert a batch with ON CONFLICT DO NOTHING instead of select-then-insert.
+-- Normalization must match lead_dedup_key(): lowercase, runs of
+-- non-alphanumerics collapsed to one space, trimmed, joined with '|'.
+-- ============================================
+
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS dedup_key TEXT;
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS google_place_id TEXT;
+
+-- Backfill: the oldest row per key owns it; later duplicates keep NULL
+UPDATE outreach_leads o
+SET dedup_key = k.dedup_key
+FROM (
+  SELECT DISTINCT ON (dedup_key) id, dedup_key
+  FROM (
+    SELECT
+      id,
+      created_at,
+      btrim(regexp_replace(lower(coalesce(business_name, '')), '[^[:alnum:]]+', ' ', 'g'))
+        || '|' ||
+      btrim(regexp_replace(lower(coalesce(city, '')), '[^[:alnum:]]+', ' ', 'g')) AS dedup_key
+    FROM outreach_leads
+  ) keyed
+  ORDER BY dedup_key, created_at, id
+) k
+WHERE o.id = k.id AND o.dedup_key IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_outreach_leads_dedup_key ON outreach_leads(dedup_key);
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_google_place_id ON outreach_leads(google_place_id);
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_instagram_url ON outreach_leads(instagram_url);
@@ -0,0 +1,28 @@
+-- OUTSCRAPER QUERY WATERMARKS
+-- Incremental harvesting: per "category in location" query, how far into
+-- Outscraper's results we've paged (next skip), which place_ids it has yielded,
+-- and whether it has run dry (see pipeline/utils/query_watermarks.py).
+
+CREATE TABLE IF NOT EXISTS pipeline_query_watermarks (
+  query_key TEXT PRIMARY KEY,
+  query TEXT NOT NULL,
+  language TEXT NOT NULL DEFAULT 'en',
+
+  next_skip INTEGER NOT NULL DEFAULT 0,
+  place_ids JSONB DEFAULT '[]',
+  results_seen INTEGER DEFAULT 0,
+  new_places INTEGER DEFAULT 0,
+
+  exhausted BOOLEAN DEFAULT FALSE,
+  exhausted_at TIMESTAMPTZ,
+  last_run_at TIMESTAMPTZ,
+
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_query_watermarks_exhausted ON pipeline_query_watermarks(exhausted);
+
+ALTER TABLE pipeline_query_watermarks ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access" ON pipeline_query_watermarks FOR ALL USING (true);
+CREATE POLICY "Authenticated read access" ON pipeline_query_watermarks FOR SELECT USING (auth.role() = 'authenticated');
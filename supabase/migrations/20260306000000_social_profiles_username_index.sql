@@ -0,0 +1,5 @@
+-- SOCIAL PROFILE LOOKUP BY USERNAME
+-- The Instagram profile cache (pipeline/utils/profile_cache.py) looks up the
+-- latest scrape of an account by username, whichever lead it was saved for.
+
+CREATE INDEX IF NOT EXISTS idx_social_profiles_username ON prospect_social_profiles(platform, username, scraped_at DESC);
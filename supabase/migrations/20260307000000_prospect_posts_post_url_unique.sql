@@ -0,0 +1,15 @@
+-- ============================================
+-- PROSPECT POSTS: ONE ROW PER POST
+-- Incremental Instagram post refresh (INSTAGRAM_INCREMENTAL_POSTS, see
+-- pipeline/scrapers/instagram_scraper.py) upserts posts on
+-- (social_profile_id, post_url) instead of deleting and re-inserting them.
+-- ============================================
+
+-- Drop duplicates first: the newest row per profile and post URL stays
+DELETE FROM prospect_posts p
+USING prospect_posts newer
+WHERE p.social_profile_id = newer.social_profile_id
+  AND p.post_url = newer.post_url
+  AND (p.created_at, p.id) < (newer.created_at, newer.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_prospect_posts_profile_url ON prospect_posts(social_profile_id, post_url);
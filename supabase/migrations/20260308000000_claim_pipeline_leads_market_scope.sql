@@ -0,0 +1,55 @@
+-- CLAIM PIPELINE LEADS: MARKET SCOPE
+-- Multi-market runs share outreach_leads, so each market process claims only
+-- its own leads. Leads are stamped at ingest with the market key of the run
+-- that found them (see pipeline/orchestrator/markets.py); scraped city and
+-- category can't be matched reliably (localized city names, "All Categories").
+-- NULL keeps the previous behaviour (any lead in the status).
+
+ALTER TABLE outreach_leads ADD COLUMN IF NOT EXISTS market TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_market ON outreach_leads(market, pipeline_status);
+
+-- The signature changes, so drop the old function instead of adding an overload
+DROP FUNCTION IF EXISTS claim_pipeline_leads(TEXT, TEXT, INTEGER, INTEGER, TEXT, TEXT, TEXT, TEXT[], BOOLEAN);
+
+CREATE OR REPLACE FUNCTION claim_pipeline_leads(
+  p_stage TEXT,
+  p_owner TEXT,
+  p_limit INTEGER,
+  p_lease_seconds INTEGER,
+  p_pipeline_status TEXT,
+  p_enrichment_status TEXT DEFAULT NULL,
+  p_set_enrichment_status TEXT DEFAULT NULL,
+  p_score_tiers TEXT[] DEFAULT NULL,
+  p_require_email BOOLEAN DEFAULT FALSE,
+  p_market TEXT DEFAULT NULL
+)
+RETURNS SETOF outreach_leads
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE outreach_leads l
+  SET lease_owner = p_owner,
+      lease_stage = p_stage,
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+      enrichment_status = COALESCE(p_set_enrichment_status, l.enrichment_status)
+  WHERE l.id IN (
+    SELECT c.id FROM outreach_leads c
+    WHERE c.pipeline_status = p_pipeline_status
+      AND (c.lease_owner IS NULL OR c.lease_expires_at < NOW())
+      AND (
+        p_enrichment_status IS NULL
+        OR c.enrichment_status = p_enrichment_status
+        OR (c.lease_stage = p_stage AND c.lease_expires_at < NOW())
+      )
+      AND (p_score_tiers IS NULL OR c.score_tier = ANY(p_score_tiers))
+      AND (NOT p_require_email OR c.contact_email IS NOT NULL OR c.owner_email IS NOT NULL)
+      AND (p_market IS NULL OR c.market = p_market)
+    ORDER BY c.created_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING l.*;
+END;
+$$;